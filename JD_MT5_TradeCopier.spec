@@ -40,17 +40,6 @@ except:
 
 hiddenimports += ['MetaTrader5']
 
-# Collect pandas
-try:
-    pandas_ret = collect_all('pandas')
-    datas += pandas_ret[0]
-    binaries += pandas_ret[1]
-    hiddenimports += pandas_ret[2]
-except:
-    pass
-
-hiddenimports += ['pandas', 'pandas.core', 'pandas.io']
-
 # Additional hidden imports for the app
 hiddenimports += [
     'flask',
@@ -58,6 +47,8 @@ hiddenimports += [
     'werkzeug',
     'cryptography',
     'cryptography.fernet',
+    'launcher_new',
+    'node_agent',
     'master_watcher_new',
     'child_executor_new',
     'dashboard_new',
@@ -67,7 +58,7 @@ hiddenimports += [
 ]
 
 a = Analysis(
-    ['launcher_new.py'],
+    ['app_entry.py'],  # Dispatches workers before the launcher side is imported
     pathex=[],
     binaries=binaries,
     datas=datas,
@@ -75,7 +66,7 @@ a = Analysis(
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    excludes=['pandas'],  # Not used by the app; MetaTrader5 only needs numpy
     noarchive=False,
     optimize=0,
 )
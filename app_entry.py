@@ -0,0 +1,111 @@
+"""
+JD MT5 Trade Copier - executable entry point
+The frozen build is a single exe for every process: the launcher/dashboard,
+and the master watchers and child executors it starts with --master/--child.
+Workers used to be dispatched from launcher_new.main, so each one first
+imported the whole launcher side (storage and license with cryptography and
+tkinter, the supervisor, webbrowser, ...) and kept it resident.
+
+Workers are dispatched here before anything else is imported and load only
+their own module (MetaTrader5, the segment codecs, the trade log). The
+license is verified once by the launcher, which is the only process that
+starts workers.
+
+With --headless (how the launcher starts workers by default) a worker has
+no console: stdout/stderr go to its console log (see
+ProcessManager.open_console_log) with the text-log timestamp prefix, and it
+exits with status 0, or 1 if it failed, instead of waiting at "Press Enter".
+
+--agent runs a node agent (see node_agent) instead of the dashboard.
+"""
+
+import sys
+from datetime import datetime
+
+
+class TimestampedOutput:
+    """stdout/stderr of a headless worker: prefixes every line like the text logs do"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.partial = ''
+
+    def write(self, text):
+        lines = (self.partial + text).split('\n')
+        self.partial = lines.pop()
+        if lines:
+            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+            self.stream.write(''.join(f"[{timestamp}] {line}\n" for line in lines))
+        return len(text)
+
+    def flush(self):
+        if self.partial:
+            self.write('\n')
+        self.stream.flush()
+
+    def isatty(self):
+        return False
+
+
+def get_arg(argv, name):
+    return argv[argv.index(name) + 1] if name in argv and argv.index(name) + 1 < len(argv) else None
+
+
+def is_worker(argv):
+    return '--master' in argv or '--child' in argv
+
+
+def run_worker(argv):
+    """
+    Run a master watcher or child executor. Returns the exit status (1 if it failed);
+    without --headless it keeps the console open after the worker exits.
+    """
+    headless = '--headless' in argv
+    if headless:
+        sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+        sys.stdout = sys.stderr = TimestampedOutput(sys.stdout)
+    status = 1
+    try:
+        if '--master' in argv:
+            import master_watcher_new as worker
+            worker.main(get_arg(argv, '--pair-id'), get_arg(argv, '--max-loop-hz'))
+        elif '--executor' in argv:
+            import child_executor_new as worker
+            worker.main_executor(get_arg(argv, '--executor'), get_arg(argv, '--max-loop-hz'))
+        else:
+            import child_executor_new as worker
+            worker.main(get_arg(argv, '--pair-id'), get_arg(argv, '--child-id'), get_arg(argv, '--max-loop-hz'))
+        # The worker status segment knows whether it ever got ready
+        from worker_status import FAILED
+        status = 1 if worker.worker_status and worker.worker_status.state == FAILED else 0
+    except SystemExit as e:
+        status = e.code if isinstance(e.code, int) else 1
+    except Exception as e:
+        print(f"\n[FATAL ERROR] {e}")
+    finally:
+        if headless:
+            sys.stdout.flush()
+        else:
+            print("\n" + "=" * 60)
+            input("Press Enter to close this window...")
+    return status
+
+
+def main():
+    if is_worker(sys.argv):
+        sys.exit(run_worker(sys.argv))
+    if '--agent' in sys.argv:
+        import node_agent
+        node_agent.main(sys.argv)
+        return
+
+    # Needed in the frozen exe so fetcher pool workers start as workers, not a second launcher
+    import multiprocessing
+    multiprocessing.freeze_support()
+
+    import launcher_new
+    launcher_new.main()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""
+Benchmark streaming exports
+Fills a scratch trade database and streams every row through the JSON and
+CSV exporters used by /api/pairs/<id>/trades/export, reporting throughput
+and peak process memory (RSS high-water mark, POSIX only). Peak memory
+should stay flat as rows grow: the script exits with status 1 when a
+streamed export grows it by more than MAX_GROWTH_MB over the baseline.
+
+With --compare the list-based path (get_closed_trades + json.dumps, as the
+dashboard endpoints did before streaming) is measured last - keep rows small.
+With --trace peak Python allocations are measured with tracemalloc instead
+(exact, but several times slower).
+
+Usage: python bench_export.py [rows] [--compare] [--trace]
+"""
+
+import os
+import sys
+import time
+import json
+import random
+import tempfile
+import tracemalloc
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+from datetime import datetime, timedelta
+
+from storage_db import MT5DataStorage
+from stream_export import iter_json, iter_csv
+
+args = [a for a in sys.argv[1:] if not a.startswith('--')]
+ROWS = int(args[0]) if args else 5000000
+COMPARE = '--compare' in sys.argv
+TRACE = '--trace' in sys.argv
+INSERT_BATCH = 50000
+MAX_GROWTH_MB = 64  # Peak memory a streamed export may add (RSS over the baseline, or traced allocations)
+COLUMNS = ['close_time', 'account_type', 'ticket', 'symbol', 'type', 'volume', 'price_open', 'price_close', 'profit']
+
+
+def fill(storage):
+    """Insert ROWS closed trades directly (bypasses the write-behind queue)"""
+    conn = storage._connect()
+    start = datetime(2020, 1, 1)
+    symbols = ['EURUSD', 'GBPUSD', 'XAUUSD', 'US30', 'USDJPY']
+    for first in range(0, ROWS, INSERT_BATCH):
+        batch = []
+        for i in range(first, min(first + INSERT_BATCH, ROWS)):
+            close_time = (start + timedelta(seconds=i * 30)).strftime('%Y-%m-%d %H:%M:%S')
+            batch.append((i, 'bench', 1000 + i % 5, 'CHILD' if i % 5 else 'MASTER', symbols[i % 5],
+                          i % 2, 0.01 * (1 + i % 100), 1.1, 1.1 + random.random() / 100,
+                          round(random.uniform(-50, 50), 2), close_time, close_time))
+        conn.executemany('''
+            INSERT INTO trade_history (ticket, pair_id, account_id, account_type, symbol, type,
+                                       volume, price_open, price_close, profit, open_time, close_time)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', batch)
+        conn.commit()
+    conn.close()
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+
+def measure(name, produce):
+    """Consume a chunk generator (or one prebuilt string), print throughput and peak memory
+
+    Returns the peak in MB (traced allocations with --trace, else RSS; None where unavailable).
+    """
+    if TRACE:
+        tracemalloc.start()
+    start = time.perf_counter()
+    size = 0
+    for chunk in produce():
+        size += len(chunk)
+    elapsed = time.perf_counter() - start
+    if TRACE:
+        peak_mb = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+        peak = f"{peak_mb:.1f} MB traced"
+        tracemalloc.stop()
+    else:
+        peak_mb = peak_rss_mb()
+        peak = f"{peak_mb:.1f} MB RSS" if peak_mb is not None else 'n/a'
+    print(f"{name:<22} {elapsed:8.2f}s  {ROWS / elapsed:>10,.0f} rows/sec  "
+          f"{size / 1024 / 1024:8.1f} MB out  peak {peak}")
+    return peak_mb
+
+
+def rows(storage):
+    return ({c: row[c] for c in COLUMNS} for row in storage.iter_closed_trades('bench'))
+
+
+if __name__ == '__main__':
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        storage = MT5DataStorage(os.path.join(tmp_dir, 'export.db'))
+        t = time.perf_counter()
+        fill(storage)
+        rss = peak_rss_mb()
+        print(f"Rows: {ROWS:,} (inserted in {time.perf_counter() - t:.1f}s"
+              + (f", baseline peak {rss:.1f} MB RSS)" if rss is not None else ')'))
+        baseline = 0 if TRACE else rss
+        failed = []
+        for name, produce in [('Streamed JSON', lambda: iter_json(rows(storage), 'trades')),
+                              ('Streamed CSV', lambda: iter_csv(rows(storage), COLUMNS))]:
+            peak = measure(name, produce)
+            if peak is not None and baseline is not None and peak - baseline > MAX_GROWTH_MB:
+                failed.append(f"{name} grew peak memory by {peak - baseline:.1f} MB (limit {MAX_GROWTH_MB} MB)")
+        if COMPARE:
+            measure('List + json.dumps', lambda: [json.dumps({'trades': [{c: r[c] for c in COLUMNS}
+                                                                        for r in storage.get_closed_trades('bench')]})])
+        storage.close()
+    for message in failed:
+        print(f"[FAIL] {message}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,82 @@
+"""
+Page-load benchmark for the dashboard pages
+Signs in to a running dashboard and loads each page the way a browser does:
+the HTML, then every same-origin stylesheet/script it references. Reports
+bytes transferred and server time for a cold load (empty cache) and for
+repeat navigations (fingerprinted /assets/ files are cached as immutable,
+plain /static/ files are revalidated).
+
+Run it against a build before and after a change to compare.
+
+Usage: python bench_pages.py [rounds] [base_url]
+"""
+
+import re
+import sys
+import gzip
+import time
+import urllib.request
+from urllib.error import HTTPError
+from http.cookiejar import CookieJar
+
+ROUNDS = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+BASE_URL = sys.argv[2] if len(sys.argv) > 2 else 'http://127.0.0.1:5000'
+PAGES = ['/', '/accounts', '/history', '/settings']
+ASSET_RE = re.compile(r'<(?:link[^>]+href|script[^>]+src)="(/[^"/][^"]*)"')
+
+
+class Browser:
+    """Minimal client cache: immutable assets are kept, others revalidated by ETag"""
+
+    def __init__(self):
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(CookieJar()))
+        self.opener.open(BASE_URL + '/login', timeout=10).read()
+        self.cache = {}  # url -> (etag, immutable)
+
+    def get(self, path):
+        """Returns (bytes on the wire, seconds, body or None)"""
+        cached = self.cache.get(path)
+        if cached and cached[1]:
+            return 0, 0.0, None
+        request = urllib.request.Request(BASE_URL + path, headers={'Accept-Encoding': 'gzip, br'})
+        if cached and cached[0]:
+            request.add_header('If-None-Match', cached[0])
+        start = time.perf_counter()
+        try:
+            response = self.opener.open(request, timeout=30)
+            body = response.read()
+        except HTTPError as e:
+            if e.code != 304:
+                raise
+            return 0, time.perf_counter() - start, None
+        elapsed = time.perf_counter() - start
+        cache_control = response.headers.get('Cache-Control', '')
+        if response.headers.get('ETag') or 'immutable' in cache_control:
+            self.cache[path] = (response.headers.get('ETag'), 'immutable' in cache_control)
+        if response.headers.get('Content-Encoding') == 'gzip':
+            return len(body), elapsed, gzip.decompress(body)
+        return len(body), elapsed, body
+
+    def load(self, page):
+        """Load a page and its assets; returns (total bytes, html seconds)"""
+        size, elapsed, body = self.get(page)
+        total = size
+        html = body.decode('utf-8', errors='ignore') if body else ''
+        for asset in ASSET_RE.findall(html):
+            total += self.get(asset)[0]
+        return total, elapsed
+
+
+if __name__ == '__main__':
+    browser = Browser()
+    print(f"{'page':<12} {'cold bytes':>12} {'warm bytes':>12} {'html ms (avg)':>14}")
+    for page in PAGES:
+        browser.cache.clear()
+        cold, _ = browser.load(page)
+        warm_sizes, times = [], []
+        for _ in range(ROUNDS):
+            size, elapsed = browser.load(page)
+            warm_sizes.append(size)
+            times.append(elapsed)
+        print(f"{page:<12} {cold:>12,} {sum(warm_sizes) // len(warm_sizes):>12,} "
+              f"{sum(times) / len(times) * 1000:>14.1f}")
@@ -0,0 +1,115 @@
+"""
+Benchmark process start-up imports
+Imports what each process mode loads in a fresh interpreter under
+python -X importtime and reports total import time, module count, the
+slowest top-level imports and the process RSS after importing:
+
+    master     app_entry worker path -> master_watcher_new
+    child      app_entry worker path -> child_executor_new
+    dashboard  launcher_new + dashboard_new
+
+With --compare the old worker path (launcher_new imported first, as the
+frozen exe did before app_entry) is measured too.
+
+Modules whose dependencies are missing (e.g. MetaTrader5 off Windows) are
+reported as failed; their numbers cover only what imported before the error.
+
+Usage: python bench_startup.py [rounds] [--compare]
+"""
+
+import os
+import sys
+import json
+import subprocess
+
+args = [a for a in sys.argv[1:] if not a.startswith('--')]
+ROUNDS = int(args[0]) if args else 3
+COMPARE = '--compare' in sys.argv
+TOP = 5
+
+MODES = [
+    ('master', ['app_entry', 'master_watcher_new']),
+    ('child', ['app_entry', 'child_executor_new']),
+    ('dashboard', ['launcher_new', 'dashboard_new']),
+]
+LEGACY_MODES = [
+    ('master (via launcher)', ['launcher_new', 'master_watcher_new']),
+    ('child (via launcher)', ['launcher_new', 'child_executor_new']),
+]
+
+# Runs in the measured interpreter: import the modules, then report RSS (json last, so it is not counted)
+PROBE = r'''
+import sys
+error = None
+for name in sys.argv[1].split(','):
+    try:
+        __import__(name)
+    except BaseException as e:
+        error = f"{name}: {type(e).__name__}: {e}"
+        break
+rss = None
+try:
+    import psutil
+    rss = psutil.Process().memory_info().rss / 1048576
+except ImportError:
+    try:
+        import resource
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1048576 if sys.platform == 'darwin' else 1024)
+    except ImportError:
+        pass
+import json
+print(json.dumps({'rss_mb': rss, 'error': error}))
+'''
+
+
+def parse_importtime(stderr):
+    """(total self time ms, module count, [(cumulative ms, top-level module)])"""
+    total_us = 0
+    count = 0
+    top_level = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = [p for p in line[len('import time:'):].split('|')]
+        total_us += int(self_us)
+        count += 1
+        if not name[1:].startswith(' '):  # No extra indent = imported directly by the probe
+            top_level.append((int(cumulative_us) / 1000, name.strip()))
+    return total_us / 1000, count, sorted(top_level, reverse=True)[:TOP]
+
+
+def measure(modules):
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE='')
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', PROBE, ','.join(modules)],
+                          capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+                          env=env, timeout=120, stdin=subprocess.DEVNULL)
+    total_ms, count, top = parse_importtime(proc.stderr)
+    try:
+        probe = json.loads(proc.stdout.strip().splitlines()[-1])
+    except (IndexError, ValueError):
+        probe = {'rss_mb': None, 'error': proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else 'no output'}
+    return total_ms, count, top, probe
+
+
+def report(label, modules):
+    runs = [measure(modules) for _ in range(ROUNDS)]
+    best = min(runs, key=lambda r: r[0])
+    total_ms, count, top, probe = best
+    rss = f"{probe['rss_mb']:.1f} MB" if probe['rss_mb'] is not None else 'n/a'
+    print(f"{label:24} {total_ms:8.1f} ms  {count:4d} modules  RSS {rss}")
+    for cumulative_ms, name in top:
+        print(f"{'':26}{cumulative_ms:8.1f} ms  {name}")
+    if probe['error']:
+        print(f"{'':26}FAILED {probe['error']}")
+
+
+def main():
+    print(f"Import time (best of {ROUNDS}, python -X importtime) and RSS after import")
+    print()
+    for label, modules in MODES + (LEGACY_MODES if COMPARE else []):
+        report(label, modules)
+        print()
+
+
+if __name__ == '__main__':
+    main()
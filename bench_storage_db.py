@@ -0,0 +1,67 @@
+"""
+Benchmark storage_db write throughput
+Compares the old connection-per-call pattern against the pooled,
+write-behind MT5DataStorage on a scratch database.
+
+Usage: python bench_storage_db.py [rows]
+"""
+
+import os
+import sys
+import time
+import sqlite3
+import tempfile
+
+from storage_db import MT5DataStorage
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+
+
+def legacy_add_log(db_path, pair_id, component, level, message, account_id=None):
+    """add_log as it was before pooling: connect, insert, commit, close"""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute('''
+        INSERT INTO system_logs (pair_id, account_id, component, level, message)
+        VALUES (?, ?, ?, ?, ?)
+    ''', (pair_id, account_id, component, level, message))
+    conn.commit()
+    conn.close()
+
+
+def bench_legacy(tmp_dir):
+    db_path = os.path.join(tmp_dir, 'legacy.db')
+    storage = MT5DataStorage(db_path)
+    storage.close()
+    # Legacy databases used the default rollback journal
+    conn = sqlite3.connect(db_path)
+    conn.execute('PRAGMA journal_mode=DELETE')
+    conn.close()
+    start = time.perf_counter()
+    for i in range(ROWS):
+        legacy_add_log(db_path, 'pair_1', 'MASTER_WATCHER', 'INFO', f'Benchmark message {i}', 12345)
+    return time.perf_counter() - start
+
+
+def bench_pooled(tmp_dir):
+    storage = MT5DataStorage(os.path.join(tmp_dir, 'pooled.db'))
+    start = time.perf_counter()
+    for i in range(ROWS):
+        storage.add_log('pair_1', 'MASTER_WATCHER', 'INFO', f'Benchmark message {i}', 12345)
+    enqueued = time.perf_counter() - start
+    storage.flush()
+    total = time.perf_counter() - start
+    count = len(storage.get_logs(limit=ROWS))
+    storage.close()
+    return enqueued, total, count
+
+
+if __name__ == '__main__':
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        legacy = bench_legacy(tmp_dir)
+        enqueued, pooled, count = bench_pooled(tmp_dir)
+    print(f"Rows: {ROWS}")
+    print(f"Connection per call: {legacy:.3f}s  {ROWS / legacy:,.0f} inserts/sec")
+    print(f"Pooled + batched:    {pooled:.3f}s  {ROWS / pooled:,.0f} inserts/sec "
+          f"(caller blocked {enqueued:.3f}s, {count} rows committed)")
+    print(f"Speedup: {legacy / pooled:.1f}x")
@@ -48,37 +48,14 @@ except ImportError:
 # Constants
 POSITION_SIZE = 64
 CONFIG_FILE = os.path.join(DATA_DIR, "config.json")
-STATS_FILE = os.path.join(DATA_DIR, "pair_stats.json")
-
-def load_stats():
-    """Load stats from file"""
-    try:
-        if os.path.exists(STATS_FILE):
-            with open(STATS_FILE, 'r', encoding='utf-8-sig') as f:
-                return json.load(f)
-    except:
-        pass
-    return {}
-
-def save_stats(stats):
-    """Save stats to file"""
-    try:
-        with open(STATS_FILE, 'w') as f:
-            json.dump(stats, f, indent=2)
-    except:
-        pass
 
 def update_trade_stats(pair_id, success=True):
-    """Update trade statistics for a pair"""
-    stats = load_stats()
-    if pair_id not in stats:
-        stats[pair_id] = {'total': 0, 'success': 0, 'failed': 0}
-    stats[pair_id]['total'] += 1
-    if success:
-        stats[pair_id]['success'] += 1
-    else:
-        stats[pair_id]['failed'] += 1
-    save_stats(stats)
+    """Update trade statistics for a pair (atomic increment in the trade database)"""
+    if USE_DATABASE:
+        try:
+            db.increment_trade_stats(pair_id, success)
+        except Exception as e:
+            print(f"[WARN] Error updating trade stats: {e}")
 
 class TradeLog:
     """Enhanced logger with database integration"""
@@ -2,6 +2,14 @@
 """
 MT5 Trade Copier - Child Executor (New Version)
 Copies trades from master to child account using shared memory
+
+Each pair this child account follows is a PairFollower (master segment,
+ticket maps, pending order tracking, the child's copy settings). Normally
+a process runs one follower (--pair-id/--child-id). In executor mode
+(--executor KEY, see executor_group) one process holds the single MT5
+session of an account that is a child of several pairs and runs one
+follower per pair; a SignalArbiter keeps their signals from working
+against each other on that account.
 """
 
 import os
@@ -12,6 +20,13 @@ import struct
 import mmap
 import subprocess
 from datetime import datetime
+from log_archive import rotate_text_log
+from storage_db import db
+from stats_segment import StatsWriter
+from price_segment import PriceReader
+from child_state import open_child_state
+from worker_status import open_worker_status, loop_budget, CHILD_LOOP_HZ
+from executor_group import load_members, get_members_path
 
 # Determine the base directory
 if getattr(sys, 'frozen', False):
@@ -79,6 +94,13 @@ ORDER_SIZE = 64       # Pending order size
 HEADER_SIZE = 32      # timestamp(8) + balance(8) + equity(8) + pos_count(4) + order_count(4)
 MAX_POSITIONS = 50    # Max positions from master
 CONFIG_FILE = os.path.join(DATA_DIR, "config.json")
+MEMBERS_CHECK_INTERVAL = 1.0  # Seconds between executor membership checks
+DEFAULT_CONFLICT_POLICY = 'allow'  # Executor mode: 'allow' or 'skip_opposite' (always on netting accounts)
+
+# PairFollower.step results
+ACTIVE = 1
+WAITING = 2    # No config or outside the copy period - skipped until idle_until
+DISABLED = 3   # Pair or child switched off
 
 
 def to_bool(value, default=True):
@@ -93,7 +115,6 @@ def to_bool(value, default=True):
 
 # Log rotation settings
 MAX_LOG_SIZE_MB = 50  # Rotate when log exceeds 50MB
-MAX_ROTATED_FILES = 5  # Keep 5 archived logs
 
 def rotate_log_if_needed(log_file):
     """Rotate log file if it exceeds MAX_LOG_SIZE_MB"""
@@ -105,59 +126,48 @@ def rotate_log_if_needed(log_file):
         if size_mb < MAX_LOG_SIZE_MB:
             return
         
-        # Rotate existing archives
-        for i in range(MAX_ROTATED_FILES - 1, 0, -1):
-            old_file = f"{log_file}.{i}"
-            new_file = f"{log_file}.{i+1}"
-            if os.path.exists(old_file):
-                if i + 1 > MAX_ROTATED_FILES:
-                    os.remove(old_file)
-                else:
-                    os.rename(old_file, new_file)
-        
-        # Rotate current log to .1
-        os.rename(log_file, f"{log_file}.1")
-        print(f"[INFO] Rotated log file: {os.path.basename(log_file)} ({size_mb:.1f}MB)")
+        # Rename only - compressed into the block archive in the background (retention in log_archive)
+        rotate_text_log(log_file)
+        print(f"[INFO] Rotated log file: {os.path.basename(log_file)} ({size_mb:.1f}MB), archiving in background")
     except Exception as e:
         print(f"[WARN] Log rotation failed: {e}")
 
-STATS_FILE = os.path.join(DATA_DIR, "pair_stats.json")
+# Result of the last order_send in open_trade: retcode (-1 = no response) for reject
+# stats, fill price and side for the slippage check against the master's signal price
+last_order = {'retcode': 0, 'price': 0.0, 'type': 0}
+# Readiness reported to the launcher (set in main; in executor mode the first member's)
+worker_status = None
 
-def load_stats():
-    """Load stats from file"""
-    try:
-        if os.path.exists(STATS_FILE):
-            with open(STATS_FILE, 'r', encoding='utf-8-sig') as f:
-                return json.load(f)
-    except:
-        pass
-    return {}
+def log_signal_slippage(log, master_symbol, signal_price):
+    """Log the child's fill price against the master's price at signal time"""
+    if not signal_price or not last_order['price']:
+        return
+    # Compare like with like: a child BUY fills at the ask, a SELL at the bid
+    reference = signal_price['ask'] if last_order['type'] == 0 else signal_price['bid']
+    if reference <= 0:
+        return
+    diff = last_order['price'] - reference
+    points = diff / signal_price['point'] if signal_price['point'] > 0 else 0
+    log.log(f"Fill vs master signal price: {last_order['price']:.5f} vs {reference:.5f} {master_symbol} "
+            f"({points:+.1f} pts)", "INFO")
 
-def save_stats(stats):
-    """Save stats to file"""
+def update_trade_stats(stats_writer, success=True, retcode=0, latency_ms=0.0):
+    """Update trade statistics in this child's slot of the pair stats segment (no locks, no file rewrite)"""
+    if stats_writer is None:
+        return
     try:
-        with open(STATS_FILE, 'w') as f:
-            json.dump(stats, f, indent=2)
-    except:
-        pass
-
-def update_trade_stats(pair_id, success=True):
-    """Update trade statistics for a pair"""
-    stats = load_stats()
-    if pair_id not in stats:
-        stats[pair_id] = {'total': 0, 'success': 0, 'failed': 0}
-    stats[pair_id]['total'] += 1
-    if success:
-        stats[pair_id]['success'] += 1
-    else:
-        stats[pair_id]['failed'] += 1
-    save_stats(stats)
+        stats_writer.record(success, retcode, latency_ms)
+    except Exception as e:
+        print(f"[WARN] Error updating trade stats: {e}")
 
 class TradeLog:
     """Logger for trade activities"""
     def __init__(self, pair_id, child_id):
         self.pair_id = pair_id
         self.child_id = child_id
+        self.account_id = None  # Set once the child account is known from config
+        self.status = None  # Worker status writer the last error is reported to
+        self.state = None  # Child state writer the last error is published to
         self.log_dir = os.path.join(DATA_DIR, "logs")
         os.makedirs(self.log_dir, exist_ok=True)
         self.log_file = os.path.join(self.log_dir, f"child_{pair_id}_{child_id}.log")
@@ -172,34 +182,17 @@ class TradeLog:
                 f.write(line + "\n")
         except:
             pass
-        # Also save to JSON for dashboard
-        self._save_activity(message, level)
-    
-    def _save_activity(self, message, level):
-        """Save activity to JSON file for dashboard"""
+        # Also record in the event database (batched, no per-line file rewrite; DEBUG stays in the text log)
         try:
-            json_file = os.path.join(self.log_dir, f"child_activity_{self.pair_id}_{self.child_id}.json")
-            activities = []
-            if os.path.exists(json_file):
-                try:
-                    with open(json_file, 'r', encoding='utf-8') as f:
-                        activities = json.load(f)
-                except:
-                    activities = []
-            
-            activity = {
-                "time": datetime.now().strftime("%H:%M:%S"),
-                "date": datetime.now().strftime("%Y-%m-%d"),
-                "message": message,
-                "type": level
-            }
-            activities.insert(0, activity)
-            activities = activities[:10000]  # Keep last 10000 entries
-            
-            with open(json_file, 'w', encoding='utf-8') as f:
-                json.dump(activities, f)
+            if level != "DEBUG":
+                db.add_log(self.pair_id, 'CHILD_EXECUTOR', level, message, self.account_id)
         except:
             pass
+        
+        if self.status and level == "ERROR":
+            self.status.note_error(message)
+        if self.state and level == "ERROR":
+            self.state.note_error(message)
 
 def load_config(pair_id, child_id):
     """Load configuration for the specified pair and child"""
@@ -219,39 +212,13 @@ def load_config(pair_id, child_id):
         print(f"Error loading config: {e}")
         return None, None
 
-def write_child_data(pair_id, child_id, balance, equity, positions):
-    """Write child account data to binary file for dashboard"""
+def load_settings():
+    """Global settings from config.json ({} if unreadable)"""
     try:
-        data_dir = os.path.join(DATA_DIR, "data")
-        
-        filename = os.path.join(data_dir, f"child_data_{pair_id}_{child_id}.bin")
-        
-        # Header: timestamp(8) + balance(8) + equity(8) + count(4) = 28 bytes
-        timestamp = int(time.time() * 1000)
-        count = len(positions) if positions else 0
-        
-        with open(filename, 'wb') as f:
-            # Write header
-            f.write(struct.pack('<Q', timestamp))
-            f.write(struct.pack('<d', balance))
-            f.write(struct.pack('<d', equity))
-            f.write(struct.pack('<I', count))
-            
-            # Write positions (64 bytes each)
-            for pos in positions:
-                # ticket(8) + type(1) + volume(8) + sl(8) + tp(8) + symbol(15) + price_open(8) + profit(8) = 64
-                symbol_bytes = pos.symbol.encode('utf-8')[:15].ljust(15, b'\x00')
-                f.write(struct.pack('<Q', pos.ticket))
-                f.write(struct.pack('<B', pos.type))
-                f.write(struct.pack('<d', pos.volume))
-                f.write(struct.pack('<d', pos.sl))
-                f.write(struct.pack('<d', pos.tp))
-                f.write(symbol_bytes)
-                f.write(struct.pack('<d', pos.price_open))
-                f.write(struct.pack('<d', pos.profit))
-    except Exception as e:
-        pass
-
+        with open(CONFIG_FILE, 'r', encoding='utf-8-sig') as f:
+            return json.load(f).get('settings', {})
+    except:
+        return {}
 
 def map_symbol(master_symbol, child_config, pair_config=None):
     """
@@ -390,6 +357,7 @@ def open_trade(symbol, trade_type, volume, sl, tp, magic, comment, log, copy_mod
             log.log(f"SENDING REQUEST: type={type_str}, price={price:.5f}, SL={request.get('sl', 0)}, TP={request.get('tp', 0)}", "DEBUG")
             
             result = mt5.order_send(request)
+            last_order['retcode'] = result.retcode if result is not None else -1
             
             if result is None:
                 log.log(f"FAILED {type_str} {volume} {symbol}: No response, attempt {attempt+1}/{max_retries}", "ERROR")
@@ -399,6 +367,8 @@ def open_trade(symbol, trade_type, volume, sl, tp, magic, comment, log, copy_mod
                 return False
             
             if result.retcode == mt5.TRADE_RETCODE_DONE:
+                last_order['price'] = result.price or price
+                last_order['type'] = trade_type
                 sl_str = f" SL:{sl:.5f}" if sl > 0 else ""
                 tp_str = f" TP:{tp:.5f}" if tp > 0 else ""
                 mode_str = f" [{copy_mode.upper()}]" if copy_mode != 'normal' else ""
@@ -449,24 +419,24 @@ def open_trade(symbol, trade_type, volume, sl, tp, magic, comment, log, copy_mod
     
     return False
 
-def save_child_closed_trade(pair_id, child_id, trade_data):
-    """Save closed trade to JSON file for dashboard"""
+def save_child_closed_trade(pair_id, child_id, account_id, trade_data):
+    """Save closed trade to the trade database for dashboard"""
     try:
-        data_dir = os.path.join(os.getenv('LOCALAPPDATA'), 'JD_MT5_TradeCopier', 'data')
-        closed_file = os.path.join(data_dir, f"closed_trades_{pair_id}_{child_id}.json")
-        closed_trades = []
-        if os.path.exists(closed_file):
-            try:
-                with open(closed_file, 'r') as f:
-                    closed_trades = json.load(f)
-            except:
-                closed_trades = []
-        
-        closed_trades.insert(0, trade_data)
-        closed_trades = closed_trades[:50]  # Keep last 50
-        
-        with open(closed_file, 'w') as f:
-            json.dump(closed_trades, f)
+        db.add_trade_history(
+            ticket=trade_data.get('ticket', 0),
+            pair_id=pair_id,
+            account_id=account_id,
+            account_type='CHILD',
+            symbol=trade_data.get('symbol', ''),
+            trade_type=trade_data.get('type', 0),
+            volume=trade_data.get('volume', 0.0),
+            price_open=trade_data.get('price_open', 0.0),
+            price_close=trade_data.get('close_price', 0.0),
+            profit=trade_data.get('profit', 0.0),
+            open_time=trade_data.get('open_time', ''),
+            close_time=trade_data.get('close_time'),
+            child_id=child_id
+        )
     except Exception as e:
         print(f"[WARN] Error saving child closed trade: {e}")
 
@@ -828,679 +798,834 @@ def find_child_position(master_ticket, symbol, log):
     except:
         return None
 
-def main(pair_id, child_id):
-    """Main function for child executor"""
+def open_follower_status(pair_id, child_id, pair):
+    """Worker status writer for a pair-child (slot hint = child index + 1, the master has slot 0)"""
+    slot = next((i for i, c in enumerate((pair or {}).get('children', [])) if c.get('id') == child_id), 0) + 1
+    return open_worker_status(os.path.join(DATA_DIR, "data"), pair_id, child_id, slot)
+
+def main(pair_id, child_id, max_loop_hz=None):
+    """Main function for child executor (reports ready/failed to the launcher)"""
+    global worker_status
     if not pair_id or not child_id:
         print("ERROR: --pair-id and --child-id arguments required!")
         return
     
-    log = TradeLog(pair_id, child_id)
-    
-    log.log("=" * 50, "INFO")
-    log.log(f"CHILD EXECUTOR STARTED - Pair: {pair_id}, Child: {child_id}", "INFO")
-    log.log("=" * 50, "INFO")
-    
     pair, child = load_config(pair_id, child_id)
-    if not pair or not child:
-        log.log("ERROR: Configuration not found!", "ERROR")
-        return
-    
-    # Get terminal path and strip whitespace, newlines, and quotes
-    child_terminal = child.get('terminal', '').strip().strip('"').strip("'")
-    child_account = int(child.get('account', 0))
-    child_password = child.get('password', '')
-    child_server = child.get('server', '')
-    
-    log.log(f"Child Account: {child_account}", "INFO")
-    log.log(f"Server: {child_server}", "INFO")
-    
-    
-    # Validate symbols are configured  
-    has_symbols = False
-    
-    # NEW FORMAT: Check child's own symbols list first
-    child_symbols = child.get('symbols', [])
-    if child_symbols and isinstance(child_symbols, list):
-        for mapping in child_symbols:
-            if isinstance(mapping, dict):
-                m_sym = mapping.get('master', '').strip()
-                c_sym = mapping.get('child', '').strip()
-                if m_sym and c_sym:
-                    has_symbols = True
-                    log.log(f"Symbol mapping: {m_sym} -> {c_sym}", "INFO")
-        log.log(f"Total symbol mappings configured: {len([m for m in child_symbols if isinstance(m, dict) and m.get('master') and m.get('child')])}", "INFO")
-    
-    # OLD FORMAT (backward compat): Check numbered slots
-    if not has_symbols:
-        for i in range(1, 21):
-            master_sym = pair.get(f'master_symbol_{i}', '').strip().upper()
-            child_sym = child.get(f'child_symbol_{i}', '').strip().upper()
-            if master_sym and child_sym:
-                has_symbols = True
-                log.log(f"Symbol slot {i}: {master_sym} -> {child_sym}", "INFO")
+    worker_status = open_follower_status(pair_id, child_id, pair)
+    try:
+        run_executor(pair_id, child_id, loop_budget(max_loop_hz, CHILD_LOOP_HZ))
+    finally:
+        if worker_status:
+            worker_status.close()
 
-    if not has_symbols:
-        log.log('ERROR: No symbols configured for this child account!', 'ERROR')
-        log.log('Please add at least one symbol mapping in the child account settings.', 'ERROR')
-        log.log('Go to Accounts -> Edit Child -> Add Symbol (set both Master and Child symbols)', 'ERROR')
-        return
-    # Initialize MT5
+def connect_session(child, log):
+    """Initialize MT5 on the child's terminal and log in; returns account info or None (logged)"""
+    child_terminal = child.get('terminal', '').strip().strip('"').strip("'")
     init_args = {}
     if child_terminal:
         init_args['path'] = child_terminal
     
     if not mt5.initialize(**init_args):
         log.log(f"MT5 init failed: {mt5.last_error()}", "ERROR")
-        return
+        return None
     
     # Login
-    if not mt5.login(child_account, password=child_password, server=child_server):
+    if not mt5.login(int(child.get('account', 0)), password=child.get('password', ''), server=child.get('server', '')):
         log.log(f"Login failed: {mt5.last_error()}", "ERROR")
         mt5.shutdown()
-        return
+        return None
     
     acc = mt5.account_info()
     if not acc:
         log.log("Cannot get account info!", "ERROR")
         mt5.shutdown()
-        return
+        return None
     
     log.log(f"Connected: {acc.login} @ {acc.server}", "INFO")
     log.log(f"Balance: ${acc.balance:.2f}", "INFO")
-    
-    # Write initial child data
+    return acc
+
+def reconnect_session(child, log):
+    """Restart the MT5 connection after repeated loop errors"""
+    log.log("Too many errors, restarting connection...", "ERROR")
     try:
-        child_positions = mt5.positions_get() or []
-        write_child_data(pair_id, child_id, acc.balance, acc.equity, child_positions)
+        mt5.shutdown()
+        time.sleep(1)
+        mt5.initialize(path=child.get('terminal', '').strip().strip('"').strip("'"), login=int(child.get('account', 0)),
+                       password=child.get('password', ''), server=child.get('server', ''))
     except:
         pass
-    
-    log.log("Waiting for signals...", "INFO")
-    
-    # Shared memory file
-    SHARED_FILE = os.path.join(DATA_DIR, "data", f"shared_positions_{pair_id}.bin")
-    
-    f = None
-    mm = None
-    
-    try:
-        f = open(SHARED_FILE, 'r+b')
-        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
-    except Exception as e:
-        log.log(f"ERROR opening shared file: {e}", "ERROR")
-        return
-    
-    tracked_master = {}  # master_ticket -> child_ticket
-    pending_track = {}   # master_ticket -> {'symbol': ..., 'attempts': 0, 'time': ...}
-    copied_pending_orders = {}  # master_ticket -> True (tracks which pending orders have been copied)
-    last_log = 0
-    error_count = 0
-    first_run = True  # Flag to track first iteration
-    
-    try:
-        while True:
-            try:
-                # Reload config for live changes
-                pair, child = load_config(pair_id, child_id)
-                if not pair or not child:
-                    time.sleep(0.5)
+
+class PairFollower:
+    """
+    Follows one pair's master for this child account: its master segment,
+    stats slot, price reader, ticket maps and pending order tracking. step()
+    is one pass of the copy loop; the MT5 session belongs to the caller.
+    """
+
+    def __init__(self, pair_id, child_id, status=None, exclusive=True, arbiter=None):
+        self.pair_id = pair_id
+        self.child_id = child_id
+        self.status = status
+        self.exclusive = exclusive  # Only follower on this account - may claim positions by comment
+        self.arbiter = arbiter
+        self.log = TradeLog(pair_id, child_id)
+        self.log.status = status
+        self.child = None
+        self.child_account = None
+        self.stats_writer = None
+        self.state = None  # Slot in the pair's child state segment (balance, equity, positions, loop health)
+        self.price_reader = None
+        self.f = None
+        self.mm = None
+        self.tracked_master = {}  # master_ticket -> child_ticket
+        self.pending_track = {}   # master_ticket -> {'symbol': ..., 'attempts': 0, 'time': ...}
+        self.copied_pending_orders = {}  # master_ticket -> True (tracks which pending orders have been copied)
+        self.last_log = 0
+        self.first_run = True  # Flag to track first iteration
+        self.idle_until = 0
+        self.error_count = 0  # Consecutive failed passes (executor mode: counted per follower)
+
+    def setup(self):
+        """Load config, check symbol mappings, claim the stats slot. False if this pair-child cannot copy (logged)."""
+        pair_id, child_id, log = self.pair_id, self.child_id, self.log
+        log.log("=" * 50, "INFO")
+        log.log(f"CHILD EXECUTOR STARTED - Pair: {pair_id}, Child: {child_id}", "INFO")
+        log.log("=" * 50, "INFO")
+        
+        pair, child = load_config(pair_id, child_id)
+        if not pair or not child:
+            log.log("ERROR: Configuration not found!", "ERROR")
+            return False
+        self.child = child
+        self.child_account = int(child.get('account', 0))
+        log.account_id = self.child_account
+        
+        # Claim this child's slot in the pair stats segment
+        try:
+            slot_hint = next((i for i, c in enumerate(pair.get('children', [])) if c.get('id') == child_id), 0)
+            self.stats_writer = StatsWriter(os.path.join(DATA_DIR, "data"), pair_id, child_id, slot_hint,
+                                            baseline=lambda: db.get_trade_stats().get(pair_id))
+        except Exception as e:
+            log.log(f"Stats segment unavailable: {e}", "WARN")
+        
+        # Claim the child state slot (same index) the dashboard reads balance, equity and positions from
+        self.state = open_child_state(os.path.join(DATA_DIR, "data"), pair_id, child_id, slot_hint,
+                                      load_settings().get('child_state_interval_ms'))
+        log.state = self.state
+        
+        self.price_reader = PriceReader(os.path.join(DATA_DIR, "data"), pair_id)
+        
+        log.log(f"Child Account: {self.child_account}", "INFO")
+        log.log(f"Server: {child.get('server', '')}", "INFO")
+        
+        
+        # Validate symbols are configured
+        has_symbols = False
+        
+        # NEW FORMAT: Check child's own symbols list first
+        child_symbols = child.get('symbols', [])
+        if child_symbols and isinstance(child_symbols, list):
+            for mapping in child_symbols:
+                if isinstance(mapping, dict):
+                    m_sym = mapping.get('master', '').strip()
+                    c_sym = mapping.get('child', '').strip()
+                    if m_sym and c_sym:
+                        has_symbols = True
+                        log.log(f"Symbol mapping: {m_sym} -> {c_sym}", "INFO")
+            log.log(f"Total symbol mappings configured: {len([m for m in child_symbols if isinstance(m, dict) and m.get('master') and m.get('child')])}", "INFO")
+        
+        # OLD FORMAT (backward compat): Check numbered slots
+        if not has_symbols:
+            for i in range(1, 21):
+                master_sym = pair.get(f'master_symbol_{i}', '').strip().upper()
+                child_sym = child.get(f'child_symbol_{i}', '').strip().upper()
+                if master_sym and child_sym:
+                    has_symbols = True
+                    log.log(f"Symbol slot {i}: {master_sym} -> {child_sym}", "INFO")
+        
+        if not has_symbols:
+            log.log('ERROR: No symbols configured for this child account!', 'ERROR')
+            log.log('Please add at least one symbol mapping in the child account settings.', 'ERROR')
+            log.log('Go to Accounts -> Edit Child -> Add Symbol (set both Master and Child symbols)', 'ERROR')
+            return False
+        return True
+
+    def attach(self, acc):
+        """Session is logged in: publish the initial child state, map the master segment and report ready"""
+        log = self.log
+        # Publish initial child state
+        try:
+            if self.state:
+                self.state.update(acc.balance, acc.equity, mt5.positions_get() or [])
+        except:
+            pass
+        
+        log.log("Waiting for signals...", "INFO")
+        
+        # Shared memory file
+        SHARED_FILE = os.path.join(DATA_DIR, "data", f"shared_positions_{self.pair_id}.bin")
+        
+        try:
+            self.f = open(SHARED_FILE, 'r+b')
+            self.mm = mmap.mmap(self.f.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception as e:
+            log.log(f"ERROR opening shared file: {e}", "ERROR")
+            return False
+        
+        # Logged in and the master's segment is mapped - ready to copy
+        if self.status:
+            self.status.ready(f"{acc.login} @ {acc.server}")
+        return True
+
+    def close(self):
+        if self.mm:
+            self.mm.close()
+        if self.f:
+            self.f.close()
+        if self.state:
+            self.state.close()
+
+    def step(self):
+        """
+        One copy pass: reload config, read the master segment, open/modify/close
+        positions and pending orders. Returns ACTIVE, WAITING or DISABLED.
+        """
+        if self.status:
+            self.status.heartbeat()
+        if self.state:
+            self.state.heartbeat()
+        if time.time() < self.idle_until:
+            return WAITING
+        log = self.log
+        pair_id, child_id, mm = self.pair_id, self.child_id, self.mm
+        tracked_master = self.tracked_master
+        pending_track = self.pending_track
+        copied_pending_orders = self.copied_pending_orders
+        
+        # Reload config for live changes
+        pair, child = load_config(pair_id, child_id)
+        if not pair or not child:
+            self.idle_until = time.time() + 0.5
+            return WAITING
+        
+        # Check if pair and child are enabled
+        if not pair.get('enabled', True) or not child.get('enabled', True):
+            return DISABLED
+        
+        # Check if we're within the active copy period
+        copy_period_enabled = child.get('copy_period_enabled', False)
+        active_from = child.get('active_from', '') or ''
+        active_to = child.get('active_to', '') or ''
+        
+        # Strip whitespace and validate dates
+        active_from = active_from.strip() if isinstance(active_from, str) else ''
+        active_to = active_to.strip() if isinstance(active_to, str) else ''
+        
+        # Check copy period if enabled OR if dates are explicitly set
+        if copy_period_enabled or (active_from and len(active_from) >= 10) or (active_to and len(active_to) >= 10):
+            from datetime import date
+            today = date.today().isoformat()  # Format: YYYY-MM-DD
+            
+            # Only check active_from if valid date string
+            if active_from and len(active_from) >= 10:
+                if today < active_from:
+                    if time.time() - self.last_log > 300:
+                        log.log(f"Copy period not started. From: {active_from}, Today: {today}", "INFO")
+                        self.last_log = time.time()
+                    self.idle_until = time.time() + 1
+                    return WAITING
+            
+            # Only check active_to if valid date string
+            if active_to and len(active_to) >= 10:
+                if today > active_to:
+                    if time.time() - self.last_log > 300:
+                        log.log(f"Copy period ended. Until: {active_to}, Today: {today}", "INFO")
+                        self.last_log = time.time()
+                    self.idle_until = time.time() + 1
+                    return WAITING
+        
+        # Update settings from config
+        lot_multiplier = child.get('lot_multiplier', 1.0)
+        copy_mode = child.get('copy_mode', 'normal')
+        copy_close = to_bool(child.get('copy_close'), True)
+        force_copy = to_bool(child.get('force_copy'), False)
+        
+        # Child copy settings (per-child account) - ensure proper boolean conversion
+        copy_sl = to_bool(child.get('copy_sl'), True)
+        copy_tp = to_bool(child.get('copy_tp'), True)
+        copy_pending = to_bool(child.get('copy_pending'), True)
+        
+        # Read shared memory - Header: timestamp(8) + balance(8) + equity(8) + count(4) = 28 bytes
+        mm.seek(0)
+        data = mm.read(HEADER_SIZE)
+        if len(data) < HEADER_SIZE:
+            return ACTIVE
+        
+        ts = struct.unpack("<Q", data[0:8])[0]
+        pos_count = struct.unpack("<I", data[24:28])[0]
+        ord_count = struct.unpack("<I", data[28:32])[0]
+        
+        master_now = {}
+        master_orders = {}  # Initialize here for pending exec detection
+        for i in range(pos_count):
+            pos_data = mm.read(POSITION_SIZE)
+            if len(pos_data) < POSITION_SIZE:
+                break
+            
+            # Use little-endian to match master_watcher_new.py
+            ticket = struct.unpack('<Q', pos_data[0:8])[0]
+            ptype = struct.unpack('<B', pos_data[8:9])[0]
+            volume = struct.unpack('<d', pos_data[9:17])[0]
+            sl = struct.unpack('<d', pos_data[17:25])[0]
+            tp = struct.unpack('<d', pos_data[25:33])[0]
+            symbol = pos_data[33:48].decode('utf-8').rstrip('\x00')
+            
+            master_now[ticket] = {
+                'symbol': symbol,
+                'type': ptype,
+                'volume': volume,
+                'sl': sl,
+                'tp': tp
+            }
+        
+        # Process pending tracking (positions that were opened but not yet mapped)
+        for master_ticket in list(pending_track.keys()):
+            info = pending_track[master_ticket]
+            # Skip pending order entries - they don't need position mapping
+            if info.get('is_pending_order', False):
+                continue
+            if info['attempts'] >= 10:
+                # Give up after 10 attempts
+                log.log(f"Could not map master {master_ticket}, giving up", "WARN")
+                tracked_master[master_ticket] = -1
+                del pending_track[master_ticket]
+                continue
+            
+            child_ticket = find_child_position(master_ticket, info['symbol'], log)
+            if child_ticket:
+                tracked_master[master_ticket] = child_ticket
+                log.log(f"Mapped master {master_ticket} -> child {child_ticket}", "INFO")
+                del pending_track[master_ticket]
+            else:
+                pending_track[master_ticket]['attempts'] += 1
+        
+        # Detect executed pending orders: if master_ticket is in copied_pending_orders
+        # but now appears as a POSITION (not pending order), it was executed
+        for master_ticket in list(copied_pending_orders.keys()):
+            if master_ticket in master_now and master_ticket not in master_orders:
+                # Pending order was executed and is now a position
+                log.log(f"PENDING EXECUTED: Master #{master_ticket} pending order now a position", "INFO")
+                del copied_pending_orders[master_ticket]
+                if master_ticket in pending_track:
+                    del pending_track[master_ticket]
+                # Find the child pending order and add to position tracking
+                child_orders = mt5.orders_get()
+                child_positions = mt5.positions_get()
+                # Try to find child position by comment
+                if child_positions:
+                    for cp in child_positions:
+                        if cp.comment and f"pending_{str(master_ticket)[:8]}" in cp.comment:
+                            tracked_master[master_ticket] = cp.ticket
+                            log.log(f"Mapped executed pending: master {master_ticket} -> child {cp.ticket}", "INFO")
+                            break
+        
+        # Open new positions
+        for master_ticket, pos in master_now.items():
+            # Skip if already tracked or pending
+            if master_ticket in tracked_master or master_ticket in pending_track or master_ticket in copied_pending_orders:
+                continue
+            
+            # CHECK: Is this symbol in our allowed list?
+            incoming_symbol = pos['symbol'].upper().strip()
+            symbol_allowed = False
+            
+            # NEW FORMAT: Check child's own symbols list first
+            child_symbols = child.get('symbols', [])
+            if child_symbols and isinstance(child_symbols, list):
+                for mapping in child_symbols:
+                    if isinstance(mapping, dict):
+                        m_sym = mapping.get('master', '').upper().strip()
+                        c_sym = mapping.get('child', '').strip()
+                        if m_sym == incoming_symbol and c_sym:
+                            symbol_allowed = True
+                            log.log(f"Symbol {incoming_symbol} ALLOWED (new format: {m_sym}->{c_sym})", "INFO")
+                            break
+            
+            # OLD FORMAT (backward compatibility): Check numbered slots
+            if not symbol_allowed:
+                for slot_i in range(1, 21):
+                    master_sym = pair.get(f'master_symbol_{slot_i}', '').strip().upper()
+                    child_sym = child.get(f'child_symbol_{slot_i}', '').strip().upper()
+                    if master_sym == incoming_symbol and child_sym:
+                        symbol_allowed = True
+                        log.log(f"Symbol {incoming_symbol} ALLOWED (slot {slot_i}: {master_sym}->{child_sym})", "INFO")
+                        break
+            
+            if not symbol_allowed:
+                log.log(f"Symbol {incoming_symbol} NOT CONFIGURED - SKIPPING trade #{master_ticket}", "WARN")
+                tracked_master[master_ticket] = -1  # Mark as skipped
+                continue
+            
+            # Process new trade (already verified not tracked above)
+            if True:
+                # On first run with force_copy disabled, skip existing positions
+                if self.first_run and not force_copy:
+                    tracked_master[master_ticket] = -1  # Mark as existed before start
+                    log.log(f"Skipping existing position {master_ticket} (force_copy disabled)", "INFO")
                     continue
                 
-                # Check if pair and child are enabled
-                if not pair.get('enabled', True) or not child.get('enabled', True):
-                    log.log("Child or pair disabled - shutting down and closing MT5 terminal", "INFO")
-                    print("Child or pair disabled - closing MT5 terminal...")
-                    close_mt5_terminal(child_terminal)  # Use the already-extracted variable
-                    log.log("MT5 terminal closed. Exiting.", "INFO")
-                    print("Exiting child executor.")
-                    return  # Exit the function completely
-                
-                # Check if we're within the active copy period
-                copy_period_enabled = child.get('copy_period_enabled', False)
-                active_from = child.get('active_from', '') or ''
-                active_to = child.get('active_to', '') or ''
-                
-                # Strip whitespace and validate dates
-                active_from = active_from.strip() if isinstance(active_from, str) else ''
-                active_to = active_to.strip() if isinstance(active_to, str) else ''
-                
-                # Check copy period if enabled OR if dates are explicitly set
-                if copy_period_enabled or (active_from and len(active_from) >= 10) or (active_to and len(active_to) >= 10):
-                    from datetime import date
-                    today = date.today().isoformat()  # Format: YYYY-MM-DD
-                    
-                    # Only check active_from if valid date string
-                    if active_from and len(active_from) >= 10:
-                        if today < active_from:
-                            if time.time() - last_log > 300:
-                                log.log(f"Copy period not started. From: {active_from}, Today: {today}", "INFO")
-                                last_log = time.time()
-                            time.sleep(1)
-                            continue
-                    
-                    # Only check active_to if valid date string
-                    if active_to and len(active_to) >= 10:
-                        if today > active_to:
-                            if time.time() - last_log > 300:
-                                log.log(f"Copy period ended. Until: {active_to}, Today: {today}", "INFO")
-                                last_log = time.time()
-                            time.sleep(1)
-                            continue
+                child_volume = round(pos['volume'] * lot_multiplier, 2)
+                if child_volume < 0.01:
+                    child_volume = 0.01
                 
-                # Update settings from config
-                lot_multiplier = child.get('lot_multiplier', 1.0)
-                copy_mode = child.get('copy_mode', 'normal')
-                copy_close = to_bool(child.get('copy_close'), True)
-                force_copy = to_bool(child.get('force_copy'), False)
+                log.log(f"NEW SIGNAL: {pos['symbol']} detected from master", "SIGNAL")
                 
-                # Child copy settings (per-child account) - ensure proper boolean conversion
-                copy_sl = to_bool(child.get('copy_sl'), True)
-                copy_tp = to_bool(child.get('copy_tp'), True)
-                copy_pending = to_bool(child.get('copy_pending'), True)
+                # DEBUG: Log raw position data from shared memory
+                raw_sl = pos['sl']
+                raw_tp = pos['tp']
+                log.log(f"RAW from shared mem: type={pos['type']}, sl={raw_sl}, tp={raw_tp}, copy_sl={copy_sl}, copy_tp={copy_tp}, copy_mode={copy_mode}", "DEBUG")
                 
-                # Read shared memory - Header: timestamp(8) + balance(8) + equity(8) + count(4) = 28 bytes
-                mm.seek(0)
-                data = mm.read(HEADER_SIZE)
-                if len(data) < HEADER_SIZE:
-                    time.sleep(0.01)
+                mapped_symbol = map_symbol(pos['symbol'], child, pair)
+                direction = (1 - pos['type']) if copy_mode == 'reverse' else pos['type']
+                if self.arbiter and not self.arbiter.allow(self, mapped_symbol, direction, child):
+                    tracked_master[master_ticket] = -1  # Conflicting signal - not copied
                     continue
+                final_sl = pos['sl'] if copy_sl else 0
+                final_tp = pos['tp'] if copy_tp else 0
+                log.log(f"PASSING to open_trade: sl={final_sl}, tp={final_tp}", "DEBUG")
                 
-                ts = struct.unpack("<Q", data[0:8])[0]
-                pos_count = struct.unpack("<I", data[24:28])[0]
-                ord_count = struct.unpack("<I", data[28:32])[0]
+                last_order['retcode'] = 0
+                last_order['price'] = 0.0
+                signal_price = self.price_reader.get(pos['symbol']) if self.price_reader else None
+                copy_start = time.perf_counter()
+                success = open_trade(
+                    mapped_symbol, 
+                    pos['type'], 
+                    child_volume,
+                    final_sl,
+                    final_tp,
+                    master_ticket,
+                    f"copy_{master_ticket}",
+                    log,
+                    copy_mode
+                )
                 
-                master_now = {}
-                master_orders = {}  # Initialize here for pending exec detection
-                for i in range(pos_count):
-                    pos_data = mm.read(POSITION_SIZE)
-                    if len(pos_data) < POSITION_SIZE:
-                        break
-                    
-                    # Use little-endian to match master_watcher_new.py
-                    ticket = struct.unpack('<Q', pos_data[0:8])[0]
-                    ptype = struct.unpack('<B', pos_data[8:9])[0]
-                    volume = struct.unpack('<d', pos_data[9:17])[0]
-                    sl = struct.unpack('<d', pos_data[17:25])[0]
-                    tp = struct.unpack('<d', pos_data[25:33])[0]
-                    symbol = pos_data[33:48].decode('utf-8').rstrip('\x00')
-                    
-                    master_now[ticket] = {
-                        'symbol': symbol,
-                        'type': ptype,
-                        'volume': volume,
-                        'sl': sl,
-                        'tp': tp
-                    }
+                # Update trade stats
+                copy_latency = (time.perf_counter() - copy_start) * 1000
+                update_trade_stats(self.stats_writer, success, last_order['retcode'], copy_latency)
+                if self.state:
+                    self.state.record_copy(copy_latency)
                 
-                # Process pending tracking (positions that were opened but not yet mapped)
-                for master_ticket in list(pending_track.keys()):
-                    info = pending_track[master_ticket]
-                    # Skip pending order entries - they don't need position mapping
-                    if info.get('is_pending_order', False):
-                        continue
-                    if info['attempts'] >= 10:
-                        # Give up after 10 attempts
-                        log.log(f"Could not map master {master_ticket}, giving up", "WARN")
-                        tracked_master[master_ticket] = -1
-                        del pending_track[master_ticket]
-                        continue
-                    
-                    child_ticket = find_child_position(master_ticket, info['symbol'], log)
+                if success:
+                    log_signal_slippage(log, pos['symbol'], signal_price)
+                    # Add to pending tracking
+                    pending_track[master_ticket] = {
+                        'symbol': pos['symbol'],
+                        'attempts': 0,
+                        'time': time.time()
+                    }
+                    # Try immediate lookup
+                    time.sleep(0.05)
+                    child_ticket = find_child_position(master_ticket, pos['symbol'], log)
                     if child_ticket:
                         tracked_master[master_ticket] = child_ticket
                         log.log(f"Mapped master {master_ticket} -> child {child_ticket}", "INFO")
                         del pending_track[master_ticket]
-                    else:
-                        pending_track[master_ticket]['attempts'] += 1
+                else:
+                    # Mark as failed to prevent retry spam
+                    tracked_master[master_ticket] = -1
+        
+        
+        # Update SL/TP on existing positions if changed on master
+        if copy_sl or copy_tp:
+            for master_ticket, child_ticket in tracked_master.items():
+                if child_ticket > 0 and master_ticket in master_now:
+                    # Skip if we recently failed to modify this position
+                    fail_key = f"sltp_fail_{child_ticket}"
+                    if fail_key in pending_track:
+                        if time.time() - pending_track[fail_key].get('time', 0) < 5:
+                            continue  # Wait 5 seconds before retrying
+                    
+                    master_pos = master_now[master_ticket]
+                    child_pos = mt5.positions_get(ticket=child_ticket)
+                    if child_pos:
+                        cp = child_pos[0]
+                        new_sl = master_pos['sl'] if copy_sl else cp.sl
+                        new_tp = master_pos['tp'] if copy_tp else cp.tp
+                        
+                        # REVERSE mode: Swap SL and TP for opposite positions
+                        if copy_mode == 'reverse':
+                            # SIMPLE SWAP: SL becomes TP and TP becomes SL
+                            if new_sl > 0 or new_tp > 0:
+                                old_sl, old_tp = new_sl, new_tp
+                                new_sl = old_tp  # New SL = Old TP
+                                new_tp = old_sl  # New TP = Old SL
+                                log.log(f"REVERSE SWAP (modify): Original SL={old_sl}, TP={old_tp} -> New SL={new_sl}, TP={new_tp}", "INFO")
+                        
+                        # Check if SL/TP changed
+                        if abs(cp.sl - new_sl) > 0.00001 or abs(cp.tp - new_tp) > 0.00001:
+                            result = modify_sltp(child_ticket, cp.symbol, new_sl, new_tp, log)
+                            if not result:
+                                pending_track[fail_key] = {'time': time.time()}
+        # Close positions (if copy_close enabled)
+        if copy_close:
+            closed_tickets = []
+            
+            # First, iterate over a copy of items to avoid modification during iteration
+            for master_ticket, child_ticket in list(tracked_master.items()):
+                if master_ticket not in master_now:
+                    if child_ticket > 0:
+                        child_pos = mt5.positions_get(ticket=child_ticket)
+                        if child_pos:
+                            cp = child_pos[0]
+                            log.log(f"CLOSE SIGNAL: Master closed {cp.symbol}", "SIGNAL")
+                            close_result = close_trade(cp.ticket, cp.symbol, cp.type, cp.volume, log)
+                            if close_result and close_result.get('success'):
+                                import datetime
+                                save_child_closed_trade(pair_id, child_id, self.child_account, {
+                                    'ticket': cp.ticket,
+                                    'symbol': cp.symbol,
+                                    'type': cp.type,
+                                    'volume': cp.volume,
+                                    'price_open': cp.price_open,
+                                    'close_price': close_result.get('price', 0),
+                                    'profit': cp.profit,
+                                    'close_time': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                                })
+                        else:
+                            # Position already closed on child side
+                            log.log(f"Child position {child_ticket} already closed", "DEBUG")
+                    closed_tickets.append(master_ticket)
+            
+            for t in closed_tickets:
+                if t in tracked_master:
+                    del tracked_master[t]
+                if t in pending_track:
+                    del pending_track[t]
+            
+            # BULK CLOSE DETECTION: Close all child positions if master has zero
+            tracked_count = len([t for t in tracked_master.values() if t > 0])
+            if len(master_now) == 0 and tracked_count > 0:
+                log.log(f"BULK CLOSE TRIGGERED: master has 0 positions, closing {tracked_count} tracked", "SIGNAL")
+            if len(master_now) == 0:
+                # Get all child positions that belong to our copy trades
+                all_child_positions = mt5.positions_get()
+                if all_child_positions:
+                    for cp in all_child_positions:
+                        # Check if this is one of our copied positions
+                        # Match by: comment contains 'copy_' OR 'pending_' OR magic number matches
+                        # (comments only when no other pair copies to this account)
+                        is_our_position = False
+                        if self.exclusive and cp.comment and ('copy_' in cp.comment or 'pending_' in cp.comment):
+                            is_our_position = True
+                        if cp.ticket in tracked_master.values():
+                            is_our_position = True
+                        if cp.magic in tracked_master.keys():
+                            is_our_position = True
+                        
+                        if is_our_position:
+                            log.log(f"BULK CLOSE: Closing position {cp.symbol} #{cp.ticket}", "SIGNAL")
+                            try:
+                                close_result = close_trade(cp.ticket, cp.symbol, cp.type, cp.volume, log)
+                                if close_result and close_result.get('success'):
+                                    import datetime
+                                    save_child_closed_trade(pair_id, child_id, self.child_account, {
+                                        'ticket': cp.ticket, 'symbol': cp.symbol, 'type': cp.type,
+                                        'volume': cp.volume, 'price_open': cp.price_open,
+                                        'close_price': close_result.get('price', 0), 'profit': cp.profit,
+                                        'close_time': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                                    })
+                            except Exception as e:
+                                log.log(f"BULK CLOSE ERROR: {e}", "ERROR")
                 
-                # Detect executed pending orders: if master_ticket is in copied_pending_orders
-                # but now appears as a POSITION (not pending order), it was executed
-                for master_ticket in list(copied_pending_orders.keys()):
-                    if master_ticket in master_now and master_ticket not in master_orders:
-                        # Pending order was executed and is now a position
-                        log.log(f"PENDING EXECUTED: Master #{master_ticket} pending order now a position", "INFO")
-                        del copied_pending_orders[master_ticket]
-                        if master_ticket in pending_track:
-                            del pending_track[master_ticket]
-                        # Find the child pending order and add to position tracking
-                        child_orders = mt5.orders_get()
-                        child_positions = mt5.positions_get()
-                        # Try to find child position by comment
-                        if child_positions:
-                            for cp in child_positions:
-                                if cp.comment and f"pending_{str(master_ticket)[:8]}" in cp.comment:
-                                    tracked_master[master_ticket] = cp.ticket
-                                    log.log(f"Mapped executed pending: master {master_ticket} -> child {cp.ticket}", "INFO")
-                                    break
+                # Clear tracked_master of any remaining entries with valid child tickets
+                remaining = [(mt, ct) for mt, ct in tracked_master.items() if ct > 0]
+                for master_ticket, child_ticket in remaining:
+                    del tracked_master[master_ticket]
+                    if master_ticket in pending_track:
+                        del pending_track[master_ticket]
                 
-                # Open new positions
-                for master_ticket, pos in master_now.items():
-                    # Skip if already tracked or pending
-                    if master_ticket in tracked_master or master_ticket in pending_track or master_ticket in copied_pending_orders:
-                        continue
+                if remaining:
+                    log.log(f"BULK CLOSE: Cleared {len(remaining)} tracked entries", "INFO")
+        
+        # Read and copy pending orders if enabled
+        if copy_pending:
+            master_orders = {}
+            
+            # Read orders from shared memory if any exist
+            if ord_count > 0:
+                log.log(f"Reading {ord_count} pending orders from master", "DEBUG")
+                mm.seek(HEADER_SIZE + MAX_POSITIONS * POSITION_SIZE)
+                for i in range(ord_count):
+                    ord_data = mm.read(ORDER_SIZE)
+                    if len(ord_data) < ORDER_SIZE:
+                        break
                     
-                    # CHECK: Is this symbol in our allowed list?
-                    incoming_symbol = pos['symbol'].upper().strip()
-                    symbol_allowed = False
+                    # Use little-endian to match master_watcher_new.py
+                    ticket = struct.unpack('<Q', ord_data[0:8])[0]
+                    otype = struct.unpack('<B', ord_data[8:9])[0]
+                    volume = struct.unpack('<d', ord_data[9:17])[0]
+                    price = struct.unpack('<d', ord_data[17:25])[0]
+                    o_sl = struct.unpack('<d', ord_data[25:33])[0]
+                    o_tp = struct.unpack('<d', ord_data[33:41])[0]
+                    symbol = ord_data[41:56].decode('utf-8').rstrip('\x00')
                     
-                    # NEW FORMAT: Check child's own symbols list first
-                    child_symbols = child.get('symbols', [])
-                    if child_symbols and isinstance(child_symbols, list):
-                        for mapping in child_symbols:
-                            if isinstance(mapping, dict):
-                                m_sym = mapping.get('master', '').upper().strip()
-                                c_sym = mapping.get('child', '').strip()
-                                if m_sym == incoming_symbol and c_sym:
+                    master_orders[ticket] = {
+                        'symbol': symbol, 'type': otype, 'volume': volume,
+                        'price': price, 'sl': o_sl, 'tp': o_tp
+                    }
+                    log.log(f"Read order #{ticket}: {symbol} sl={o_sl} tp={o_tp}", "DEBUG")
+                
+                # Check for new pending orders to copy
+                for master_ticket, order in master_orders.items():
+                    if master_ticket not in tracked_master and master_ticket not in pending_track and master_ticket not in copied_pending_orders:
+                        incoming_symbol = order['symbol'].strip().upper()
+                        
+                        symbol_allowed = False
+                        
+                        # NEW FORMAT: Check child's own symbols list first
+                        child_symbols = child.get('symbols', [])
+                        if child_symbols and isinstance(child_symbols, list):
+                            for mapping in child_symbols:
+                                if isinstance(mapping, dict):
+                                    m_sym = mapping.get('master', '').upper().strip()
+                                    c_sym = mapping.get('child', '').strip()
+                                    if m_sym == incoming_symbol and c_sym:
+                                        symbol_allowed = True
+                                        break
+                        
+                        # OLD FORMAT (backward compatibility): Check numbered slots
+                        if not symbol_allowed:
+                            for slot_i in range(1, 21):
+                                master_sym = pair.get(f'master_symbol_{slot_i}', '').strip().upper()
+                                child_sym = child.get(f'child_symbol_{slot_i}', '').strip().upper()
+                                if master_sym == incoming_symbol and child_sym:
                                     symbol_allowed = True
-                                    log.log(f"Symbol {incoming_symbol} ALLOWED (new format: {m_sym}->{c_sym})", "INFO")
                                     break
-                    
-                    # OLD FORMAT (backward compatibility): Check numbered slots
-                    if not symbol_allowed:
-                        for slot_i in range(1, 21):
-                            master_sym = pair.get(f'master_symbol_{slot_i}', '').strip().upper()
-                            child_sym = child.get(f'child_symbol_{slot_i}', '').strip().upper()
-                            if master_sym == incoming_symbol and child_sym:
-                                symbol_allowed = True
-                                log.log(f"Symbol {incoming_symbol} ALLOWED (slot {slot_i}: {master_sym}->{child_sym})", "INFO")
-                                break
-                    
-                    if not symbol_allowed:
-                        log.log(f"Symbol {incoming_symbol} NOT CONFIGURED - SKIPPING trade #{master_ticket}", "WARN")
-                        tracked_master[master_ticket] = -1  # Mark as skipped
-                        continue
-                    
-                    # Process new trade (already verified not tracked above)
-                    if True:
-                        # On first run with force_copy disabled, skip existing positions
-                        if first_run and not force_copy:
-                            tracked_master[master_ticket] = -1  # Mark as existed before start
-                            log.log(f"Skipping existing position {master_ticket} (force_copy disabled)", "INFO")
+                        
+                        if not symbol_allowed:
+                            log.log(f"Pending symbol {incoming_symbol} NOT CONFIGURED", "WARN")
                             continue
                         
-                        child_volume = round(pos['volume'] * lot_multiplier, 2)
+                        child_volume = round(order['volume'] * lot_multiplier, 2)
                         if child_volume < 0.01:
                             child_volume = 0.01
                         
-                        log.log(f"NEW SIGNAL: {pos['symbol']} detected from master", "SIGNAL")
-                        
-                        # DEBUG: Log raw position data from shared memory
-                        raw_sl = pos['sl']
-                        raw_tp = pos['tp']
-                        log.log(f"RAW from shared mem: type={pos['type']}, sl={raw_sl}, tp={raw_tp}, copy_sl={copy_sl}, copy_tp={copy_tp}, copy_mode={copy_mode}", "DEBUG")
+                        log.log(f"NEW PENDING: {order['symbol']} type={order['type']} vol={child_volume} sl={order['sl']} tp={order['tp']}", "SIGNAL")
+                        mapped_symbol = map_symbol(order['symbol'], child, pair)
                         
-                        mapped_symbol = map_symbol(pos['symbol'], child, pair)
-                        final_sl = pos['sl'] if copy_sl else 0
-                        final_tp = pos['tp'] if copy_tp else 0
-                        log.log(f"PASSING to open_trade: sl={final_sl}, tp={final_tp}", "DEBUG")
-                        
-                        success = open_trade(
-                            mapped_symbol, 
-                            pos['type'], 
+                        success = open_pending_order(
+                            mapped_symbol,
+                            order['type'],
                             child_volume,
-                            final_sl,
-                            final_tp,
+                            order['price'],
+                            order['sl'] if copy_sl else 0,
+                            order['tp'] if copy_tp else 0,
                             master_ticket,
-                            f"copy_{master_ticket}",
+                            f"pending_{master_ticket}",
                             log,
                             copy_mode
                         )
                         
-                        # Update trade stats
-                        update_trade_stats(pair_id, success)
-                        
                         if success:
-                            # Add to pending tracking
+                            # Store ORIGINAL (unswapped) values for comparison with master
+                            # The swap is applied when modifying, not when tracking
+                            track_sl = order['sl'] if copy_sl else 0
+                            track_tp = order['tp'] if copy_tp else 0
                             pending_track[master_ticket] = {
-                                'symbol': pos['symbol'],
-                                'attempts': 0,
-                                'time': time.time()
+                                'symbol': order['symbol'], 
+                                'time': time.time(), 
+                                'price': order['price'], 
+                                'sl': track_sl,  # ORIGINAL master SL
+                                'tp': track_tp,  # ORIGINAL master TP
+                                'attempts': 0, 
+                                'is_pending_order': True
                             }
-                            # Try immediate lookup
-                            time.sleep(0.05)
-                            child_ticket = find_child_position(master_ticket, pos['symbol'], log)
-                            if child_ticket:
-                                tracked_master[master_ticket] = child_ticket
-                                log.log(f"Mapped master {master_ticket} -> child {child_ticket}", "INFO")
-                                del pending_track[master_ticket]
-                        else:
-                            # Mark as failed to prevent retry spam
-                            tracked_master[master_ticket] = -1
+                            copied_pending_orders[master_ticket] = True
+                            log.log(f'Tracking pending #{master_ticket} with master sl={track_sl} tp={track_tp}', 'INFO')
                 
-
-                # Update SL/TP on existing positions if changed on master
-                if copy_sl or copy_tp:
-                    for master_ticket, child_ticket in tracked_master.items():
-                        if child_ticket > 0 and master_ticket in master_now:
-                            # Skip if we recently failed to modify this position
-                            fail_key = f"sltp_fail_{child_ticket}"
-                            if fail_key in pending_track:
-                                if time.time() - pending_track[fail_key].get('time', 0) < 5:
-                                    continue  # Wait 5 seconds before retrying
-                            
-                            master_pos = master_now[master_ticket]
-                            child_pos = mt5.positions_get(ticket=child_ticket)
-                            if child_pos:
-                                cp = child_pos[0]
-                                new_sl = master_pos['sl'] if copy_sl else cp.sl
-                                new_tp = master_pos['tp'] if copy_tp else cp.tp
-                                
-                                # REVERSE mode: Swap SL and TP for opposite positions
-                                if copy_mode == 'reverse':
-                                    # SIMPLE SWAP: SL becomes TP and TP becomes SL
-                                    if new_sl > 0 or new_tp > 0:
-                                        old_sl, old_tp = new_sl, new_tp
-                                        new_sl = old_tp  # New SL = Old TP
-                                        new_tp = old_sl  # New TP = Old SL
-                                        log.log(f"REVERSE SWAP (modify): Original SL={old_sl}, TP={old_tp} -> New SL={new_sl}, TP={new_tp}", "INFO")
-                                
-                                # Check if SL/TP changed
-                                if abs(cp.sl - new_sl) > 0.00001 or abs(cp.tp - new_tp) > 0.00001:
-                                    result = modify_sltp(child_ticket, cp.symbol, new_sl, new_tp, log)
-                                    if not result:
-                                        pending_track[fail_key] = {'time': time.time()}
-                # Close positions (if copy_close enabled)
-                if copy_close:
-                    closed_tickets = []
-                    
-                    # First, iterate over a copy of items to avoid modification during iteration
-                    for master_ticket, child_ticket in list(tracked_master.items()):
-                        if master_ticket not in master_now:
-                            if child_ticket > 0:
-                                child_pos = mt5.positions_get(ticket=child_ticket)
-                                if child_pos:
-                                    cp = child_pos[0]
-                                    log.log(f"CLOSE SIGNAL: Master closed {cp.symbol}", "SIGNAL")
-                                    close_result = close_trade(cp.ticket, cp.symbol, cp.type, cp.volume, log)
-                                    if close_result and close_result.get('success'):
-                                        import datetime
-                                        save_child_closed_trade(pair_id, child_id, {
-                                            'ticket': cp.ticket,
-                                            'symbol': cp.symbol,
-                                            'type': cp.type,
-                                            'volume': cp.volume,
-                                            'price_open': cp.price_open,
-                                            'close_price': close_result.get('price', 0),
-                                            'profit': cp.profit,
-                                            'close_time': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                                        })
-                                else:
-                                    # Position already closed on child side
-                                    log.log(f"Child position {child_ticket} already closed", "DEBUG")
-                            closed_tickets.append(master_ticket)
-                    
-                    for t in closed_tickets:
-                        if t in tracked_master:
-                            del tracked_master[t]
-                        if t in pending_track:
-                            del pending_track[t]
-                    
-                    # BULK CLOSE DETECTION: Close all child positions if master has zero
-                    tracked_count = len([t for t in tracked_master.values() if t > 0])
-                    if len(master_now) == 0 and tracked_count > 0:
-                        log.log(f"BULK CLOSE TRIGGERED: master has 0 positions, closing {tracked_count} tracked", "SIGNAL")
-                    if len(master_now) == 0:
-                        # Get all child positions that belong to our copy trades
-                        all_child_positions = mt5.positions_get()
-                        if all_child_positions:
-                            for cp in all_child_positions:
-                                # Check if this is one of our copied positions
-                                # Match by: comment contains 'copy_' OR 'pending_' OR magic number matches
-                                is_our_position = False
-                                if cp.comment and ('copy_' in cp.comment or 'pending_' in cp.comment):
-                                    is_our_position = True
-                                if cp.ticket in tracked_master.values():
-                                    is_our_position = True
-                                if cp.magic in tracked_master.keys():
-                                    is_our_position = True
-                                
-                                if is_our_position:
-                                    log.log(f"BULK CLOSE: Closing position {cp.symbol} #{cp.ticket}", "SIGNAL")
-                                    try:
-                                        close_result = close_trade(cp.ticket, cp.symbol, cp.type, cp.volume, log)
-                                        if close_result and close_result.get('success'):
-                                            import datetime
-                                            save_child_closed_trade(pair_id, child_id, {
-                                                'ticket': cp.ticket, 'symbol': cp.symbol, 'type': cp.type,
-                                                'volume': cp.volume, 'price_open': cp.price_open,
-                                                'close_price': close_result.get('price', 0), 'profit': cp.profit,
-                                                'close_time': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                                            })
-                                    except Exception as e:
-                                        log.log(f"BULK CLOSE ERROR: {e}", "ERROR")
+                # Update Price/SL/TP on existing pending orders if changed on master
+                for master_ticket, order in master_orders.items():
+                    if master_ticket in pending_track:
+                        tracked = pending_track[master_ticket]
+                        if not tracked.get('is_pending_order', False):
+                            continue
                         
-                        # Clear tracked_master of any remaining entries with valid child tickets
-                        remaining = [(mt, ct) for mt, ct in tracked_master.items() if ct > 0]
-                        for master_ticket, child_ticket in remaining:
-                            del tracked_master[master_ticket]
-                            if master_ticket in pending_track:
-                                del pending_track[master_ticket]
+                        # Get ORIGINAL values from master (unswapped)
+                        new_price = order['price']
+                        master_sl = order['sl'] if copy_sl else 0
+                        master_tp = order['tp'] if copy_tp else 0
                         
-                        if remaining:
-                            log.log(f"BULK CLOSE: Cleared {len(remaining)} tracked entries", "INFO")
-
-                # Read and copy pending orders if enabled
-                if copy_pending:
-                    master_orders = {}
-                    
-                    # Read orders from shared memory if any exist
-                    if ord_count > 0:
-                        log.log(f"Reading {ord_count} pending orders from master", "DEBUG")
-                        mm.seek(HEADER_SIZE + MAX_POSITIONS * POSITION_SIZE)
-                        for i in range(ord_count):
-                            ord_data = mm.read(ORDER_SIZE)
-                            if len(ord_data) < ORDER_SIZE:
-                                break
+                        # Compare with ORIGINAL tracked values
+                        old_price = tracked.get('price', 0)
+                        old_sl = tracked.get('sl', 0)
+                        old_tp = tracked.get('tp', 0)
+                        
+                        price_diff = abs(new_price - old_price)
+                        sl_diff = abs(master_sl - old_sl)
+                        tp_diff = abs(master_tp - old_tp)
+                        
+                        # NOW apply swap for sending to child
+                        child_sl = master_sl
+                        child_tp = master_tp
+                        if copy_mode == 'reverse':
+                            # SIMPLE SWAP: SL becomes TP and TP becomes SL
+                            if master_sl > 0 or master_tp > 0:
+                                child_sl = master_tp  # New SL = Old TP
+                                child_tp = master_sl  # New TP = Old SL
+                                log.log(f"REVERSE SWAP (pending modify): SL={master_sl}->{child_sl}, TP={master_tp}->{child_tp}", "INFO")
+                        
+                        if price_diff > 0.00001 or sl_diff > 0.00001 or tp_diff > 0.00001:
+                            # Rate limit: skip if last modification failed within 5 seconds
+                            last_fail = tracked.get('last_modify_fail', 0)
+                            if time.time() - last_fail < 5:
+                                continue
                             
-                            # Use little-endian to match master_watcher_new.py
-                            ticket = struct.unpack('<Q', ord_data[0:8])[0]
-                            otype = struct.unpack('<B', ord_data[8:9])[0]
-                            volume = struct.unpack('<d', ord_data[9:17])[0]
-                            price = struct.unpack('<d', ord_data[17:25])[0]
-                            o_sl = struct.unpack('<d', ord_data[25:33])[0]
-                            o_tp = struct.unpack('<d', ord_data[33:41])[0]
-                            symbol = ord_data[41:56].decode('utf-8').rstrip('\x00')
+                            log.log(f"PENDING MODIFIED #{master_ticket}: price={old_price}->{new_price} master_sl={old_sl}->{master_sl} master_tp={old_tp}->{master_tp} child_sl={child_sl} child_tp={child_tp}", "INFO")
                             
-                            master_orders[ticket] = {
-                                'symbol': symbol, 'type': otype, 'volume': volume,
-                                'price': price, 'sl': o_sl, 'tp': o_tp
+                            child_orders = mt5.orders_get()
+                            
+                            found = False
+                            if child_orders:
+                                for child_order in child_orders:
+                                    # Match by comment containing master ticket
+                                    if f"pending_{str(master_ticket)[:8]}" in child_order.comment:
+                                        log.log(f"Found matching order {child_order.ticket}, modifying with child_sl={child_sl}, child_tp={child_tp}", "INFO")
+                                        if price_diff > 0.00001:
+                                            # Price changed - use modify_pending_price
+                                            result = modify_pending_price(child_order.ticket, new_price, child_sl, child_tp, log)
+                                        else:
+                                            # Only SL/TP changed
+                                            result = modify_pending_sltp(child_order.ticket, child_sl, child_tp, log)
+                                        if result:
+                                            # Store ORIGINAL master values for next comparison
+                                            pending_track[master_ticket]['price'] = order['price']
+                                            pending_track[master_ticket]['sl'] = master_sl
+                                            pending_track[master_ticket]['tp'] = master_tp
+                                            pending_track[master_ticket].pop('last_modify_fail', None)
+                                        else:
+                                            pending_track[master_ticket]['last_modify_fail'] = time.time()
+                                        found = True
+                                        break
+                            
+                            if not found:
+                                log.log(f"Could not find child order for master #{master_ticket}", "WARN")
+            
+            # Cancel pending orders that were deleted on master
+            pending_to_cancel = []
+            for tracked_ticket in list(pending_track.keys()):
+                if pending_track[tracked_ticket].get('is_pending_order', False):
+                    if tracked_ticket not in master_orders:
+                        pending_to_cancel.append(tracked_ticket)
+                        log.log(f"Master pending #{tracked_ticket} no longer exists, will cancel child", "INFO")
+            
+            for tracked_ticket in pending_to_cancel:
+                child_orders = mt5.orders_get()
+                found = False
+                if child_orders:
+                    for order in child_orders:
+                        if order.comment.startswith(f"pending_{str(tracked_ticket)[:8]}"):
+                            log.log(f"Cancelling child pending order {order.ticket}", "INFO")
+                            request = {
+                                "action": mt5.TRADE_ACTION_REMOVE,
+                                "order": order.ticket,
                             }
-                            log.log(f"Read order #{ticket}: {symbol} sl={o_sl} tp={o_tp}", "DEBUG")
-                        
-                        # Check for new pending orders to copy
-                        for master_ticket, order in master_orders.items():
-                            if master_ticket not in tracked_master and master_ticket not in pending_track and master_ticket not in copied_pending_orders:
-                                incoming_symbol = order['symbol'].strip().upper()
-                                
-                                symbol_allowed = False
-                                
-                                # NEW FORMAT: Check child's own symbols list first
-                                child_symbols = child.get('symbols', [])
-                                if child_symbols and isinstance(child_symbols, list):
-                                    for mapping in child_symbols:
-                                        if isinstance(mapping, dict):
-                                            m_sym = mapping.get('master', '').upper().strip()
-                                            c_sym = mapping.get('child', '').strip()
-                                            if m_sym == incoming_symbol and c_sym:
-                                                symbol_allowed = True
-                                                break
-                                
-                                # OLD FORMAT (backward compatibility): Check numbered slots
-                                if not symbol_allowed:
-                                    for slot_i in range(1, 21):
-                                        master_sym = pair.get(f'master_symbol_{slot_i}', '').strip().upper()
-                                        child_sym = child.get(f'child_symbol_{slot_i}', '').strip().upper()
-                                        if master_sym == incoming_symbol and child_sym:
-                                            symbol_allowed = True
-                                            break
-                                
-                                if not symbol_allowed:
-                                    log.log(f"Pending symbol {incoming_symbol} NOT CONFIGURED", "WARN")
-                                    continue
+                            result = mt5.order_send(request)
+                            if result and result.retcode == mt5.TRADE_RETCODE_DONE:
+                                log.log(f"Cancelled pending order {order.ticket} successfully", "CLOSE")
+                            else:
+                                log.log(f"Failed to cancel order {order.ticket}: {result.retcode if result else 'no result'}", "ERROR")
+                            found = True
+                            break
+                
+                if not found:
+                    log.log(f"Child order for master #{tracked_ticket} not found (may already be gone)", "DEBUG")
+                
+                del pending_track[tracked_ticket]
+                if tracked_ticket in copied_pending_orders:
+                    del copied_pending_orders[tracked_ticket]
+        
+        # Periodic status, and the child state at its poll rate (published only when it changed)
+        now = time.time()
+        try:
+            if self.state and self.state.poll_due():
+                child_acc = mt5.account_info()
+                if child_acc:
+                    self.state.update(child_acc.balance, child_acc.equity, mt5.positions_get() or [])
+        except:
+            pass
+        
+        if now - self.last_log > 60:
+            child_pos_count = len(mt5.positions_get() or [])
+            log.log(f"Status: Tracking {len(tracked_master)} | Pending {len(pending_track)} | Child has {child_pos_count} positions", "INFO")
+            self.last_log = now
+        
+        # Mark first run complete
+        if self.first_run:
+            self.first_run = False
+            if not force_copy:
+                skipped = len([t for t in tracked_master.values() if t == -1])
+                log.log(f"First run complete. Skipped {skipped} existing positions.", "INFO")
+        
+        return ACTIVE
 
-                                child_volume = round(order['volume'] * lot_multiplier, 2)
-                                if child_volume < 0.01:
-                                    child_volume = 0.01
-                                
-                                log.log(f"NEW PENDING: {order['symbol']} type={order['type']} vol={child_volume} sl={order['sl']} tp={order['tp']}", "SIGNAL")
-                                mapped_symbol = map_symbol(order['symbol'], child, pair)
-                                
-                                success = open_pending_order(
-                                    mapped_symbol,
-                                    order['type'],
-                                    child_volume,
-                                    order['price'],
-                                    order['sl'] if copy_sl else 0,
-                                    order['tp'] if copy_tp else 0,
-                                    master_ticket,
-                                    f"pending_{master_ticket}",
-                                    log,
-                                    copy_mode
-                                )
-                                
-                                if success:
-                                    # Store ORIGINAL (unswapped) values for comparison with master
-                                    # The swap is applied when modifying, not when tracking
-                                    track_sl = order['sl'] if copy_sl else 0
-                                    track_tp = order['tp'] if copy_tp else 0
-                                    pending_track[master_ticket] = {
-                                        'symbol': order['symbol'], 
-                                        'time': time.time(), 
-                                        'price': order['price'], 
-                                        'sl': track_sl,  # ORIGINAL master SL
-                                        'tp': track_tp,  # ORIGINAL master TP
-                                        'attempts': 0, 
-                                        'is_pending_order': True
-                                    }
-                                    copied_pending_orders[master_ticket] = True
-                                    log.log(f'Tracking pending #{master_ticket} with master sl={track_sl} tp={track_tp}', 'INFO')
+class SignalArbiter:
+    """
+    Executor mode: settles signals of different pairs on the one child account.
+    With policy 'skip_opposite' (the child's conflict_policy, else the
+    DEFAULT_CONFLICT_POLICY) a follower may not open a position against
+    another pair's open copy on the same symbol. Netting accounts always use
+    it - there an opposite order would close the other pair's position.
+    """
 
-                        # Update Price/SL/TP on existing pending orders if changed on master
-                        for master_ticket, order in master_orders.items():
-                            if master_ticket in pending_track:
-                                tracked = pending_track[master_ticket]
-                                if not tracked.get('is_pending_order', False):
-                                    continue
-                                
-                                # Get ORIGINAL values from master (unswapped)
-                                new_price = order['price']
-                                master_sl = order['sl'] if copy_sl else 0
-                                master_tp = order['tp'] if copy_tp else 0
-                                
-                                # Compare with ORIGINAL tracked values
-                                old_price = tracked.get('price', 0)
-                                old_sl = tracked.get('sl', 0)
-                                old_tp = tracked.get('tp', 0)
-                                
-                                price_diff = abs(new_price - old_price)
-                                sl_diff = abs(master_sl - old_sl)
-                                tp_diff = abs(master_tp - old_tp)
-                                
-                                # NOW apply swap for sending to child
-                                child_sl = master_sl
-                                child_tp = master_tp
-                                if copy_mode == 'reverse':
-                                    # SIMPLE SWAP: SL becomes TP and TP becomes SL
-                                    if master_sl > 0 or master_tp > 0:
-                                        child_sl = master_tp  # New SL = Old TP
-                                        child_tp = master_sl  # New TP = Old SL
-                                        log.log(f"REVERSE SWAP (pending modify): SL={master_sl}->{child_sl}, TP={master_tp}->{child_tp}", "INFO")
-                                
-                                if price_diff > 0.00001 or sl_diff > 0.00001 or tp_diff > 0.00001:
-                                    # Rate limit: skip if last modification failed within 5 seconds
-                                    last_fail = tracked.get('last_modify_fail', 0)
-                                    if time.time() - last_fail < 5:
-                                        continue
-                                    
-                                    log.log(f"PENDING MODIFIED #{master_ticket}: price={old_price}->{new_price} master_sl={old_sl}->{master_sl} master_tp={old_tp}->{master_tp} child_sl={child_sl} child_tp={child_tp}", "INFO")
-                                    
-                                    child_orders = mt5.orders_get()
-                                    
-                                    found = False
-                                    if child_orders:
-                                        for child_order in child_orders:
-                                            # Match by comment containing master ticket
-                                            if f"pending_{str(master_ticket)[:8]}" in child_order.comment:
-                                                log.log(f"Found matching order {child_order.ticket}, modifying with child_sl={child_sl}, child_tp={child_tp}", "INFO")
-                                                if price_diff > 0.00001:
-                                                    # Price changed - use modify_pending_price
-                                                    result = modify_pending_price(child_order.ticket, new_price, child_sl, child_tp, log)
-                                                else:
-                                                    # Only SL/TP changed
-                                                    result = modify_pending_sltp(child_order.ticket, child_sl, child_tp, log)
-                                                if result:
-                                                    # Store ORIGINAL master values for next comparison
-                                                    pending_track[master_ticket]['price'] = order['price']
-                                                    pending_track[master_ticket]['sl'] = master_sl
-                                                    pending_track[master_ticket]['tp'] = master_tp
-                                                    pending_track[master_ticket].pop('last_modify_fail', None)
-                                                else:
-                                                    pending_track[master_ticket]['last_modify_fail'] = time.time()
-                                                found = True
-                                                break
-                                    
-                                    if not found:
-                                        log.log(f"Could not find child order for master #{master_ticket}", "WARN")
+    def __init__(self, followers, netting):
+        self.followers = followers  # (pair_id, child_id) -> PairFollower, shared with the executor
+        self.netting = netting
 
-                    # Cancel pending orders that were deleted on master
-                    pending_to_cancel = []
-                    for tracked_ticket in list(pending_track.keys()):
-                        if pending_track[tracked_ticket].get('is_pending_order', False):
-                            if tracked_ticket not in master_orders:
-                                pending_to_cancel.append(tracked_ticket)
-                                log.log(f"Master pending #{tracked_ticket} no longer exists, will cancel child", "INFO")
-                    
-                    for tracked_ticket in pending_to_cancel:
-                        child_orders = mt5.orders_get()
-                        found = False
-                        if child_orders:
-                            for order in child_orders:
-                                if order.comment.startswith(f"pending_{str(tracked_ticket)[:8]}"):
-                                    log.log(f"Cancelling child pending order {order.ticket}", "INFO")
-                                    request = {
-                                        "action": mt5.TRADE_ACTION_REMOVE,
-                                        "order": order.ticket,
-                                    }
-                                    result = mt5.order_send(request)
-                                    if result and result.retcode == mt5.TRADE_RETCODE_DONE:
-                                        log.log(f"Cancelled pending order {order.ticket} successfully", "CLOSE")
-                                    else:
-                                        log.log(f"Failed to cancel order {order.ticket}: {result.retcode if result else 'no result'}", "ERROR")
-                                    found = True
-                                    break
-                        
-                        if not found:
-                            log.log(f"Child order for master #{tracked_ticket} not found (may already be gone)", "DEBUG")
-                        
-                        del pending_track[tracked_ticket]
-                        if tracked_ticket in copied_pending_orders:
-                            del copied_pending_orders[tracked_ticket]
+    def allow(self, follower, symbol, direction, child):
+        policy = child.get('conflict_policy', DEFAULT_CONFLICT_POLICY)
+        if policy != 'skip_opposite' and not self.netting:
+            return True
+        positions = mt5.positions_get(symbol=symbol) or []
+        for other in self.followers.values():
+            if other is follower:
+                continue
+            owned = {t for t in other.tracked_master.values() if t > 0}
+            for pos in positions:
+                if pos.ticket in owned and pos.type != direction:
+                    side = "BUY" if pos.type == 0 else "SELL"
+                    follower.log.log(f"CONFLICT: {symbol} is held {side} for pair {other.pair_id} - signal not copied", "WARN")
+                    return False
+        return True
 
-                # Periodic status and data write
-                now = time.time()
-                try:
-                    child_acc = mt5.account_info()
-                    child_positions = mt5.positions_get() or []
-                    if child_acc:
-                        write_child_data(pair_id, child_id, child_acc.balance, child_acc.equity, child_positions)
-                except:
-                    pass
-                
-                if now - last_log > 60:
-                    child_pos_count = len(mt5.positions_get() or [])
-                    log.log(f"Status: Tracking {len(tracked_master)} | Pending {len(pending_track)} | Child has {child_pos_count} positions", "INFO")
-                    last_log = now
-                
-                # Mark first run complete
-                if first_run:
-                    first_run = False
-                    if not force_copy:
-                        skipped = len([t for t in tracked_master.values() if t == -1])
-                        log.log(f"First run complete. Skipped {skipped} existing positions.", "INFO")
-                
+def run_executor(pair_id, child_id, budget):
+    follower = PairFollower(pair_id, child_id, worker_status)
+    log = follower.log
+    if not follower.setup():
+        return
+    child_terminal = follower.child.get('terminal', '').strip().strip('"').strip("'")
+    acc = connect_session(follower.child, log)
+    if not acc:
+        return
+    if not follower.attach(acc):
+        return
+    
+    error_count = 0
+    try:
+        while True:
+            try:
+                result = follower.step()
+                if result == DISABLED:
+                    log.log("Child or pair disabled - shutting down and closing MT5 terminal", "INFO")
+                    print("Child or pair disabled - closing MT5 terminal...")
+                    close_mt5_terminal(child_terminal)
+                    log.log("MT5 terminal closed. Exiting.", "INFO")
+                    print("Exiting child executor.")
+                    return  # Exit the function completely
                 error_count = 0
-                time.sleep(0.01)
-                
+                budget.pace()
+            
             except struct.error as e:
                 error_count += 1
                 if error_count < 5:
@@ -1510,27 +1635,124 @@ def main(pair_id, child_id):
                 error_count += 1
                 log.log(f"Loop error: {e}", "ERROR")
                 if error_count > 10:
-                    log.log("Too many errors, restarting connection...", "ERROR")
-                    try:
-                        mt5.shutdown()
-                        time.sleep(1)
-                        mt5.initialize(path=child_terminal, login=child_account, 
-                                      password=child_password, server=child_server)
-                        error_count = 0
-                    except:
-                        pass
+                    reconnect_session(follower.child, log)
+                    error_count = 0
                 time.sleep(0.5)
-            
+    
     except KeyboardInterrupt:
         log.log("Stopping (Ctrl+C)...", "INFO")
     finally:
-        if mm:
-            mm.close()
-        if f:
-            f.close()
+        follower.close()
         close_mt5_terminal(child_terminal)
         log.log("Child executor stopped.", "INFO")
 
+def main_executor(executor_key, max_loop_hz=None):
+    """Executor mode: one MT5 session for the pairs listed in the executor's membership file"""
+    if not executor_key:
+        print("ERROR: --executor argument required!")
+        return
+    run_multiplexed(executor_key, loop_budget(max_loop_hz, CHILD_LOOP_HZ))
+
+def run_multiplexed(executor_key, budget):
+    data_dir = os.path.join(DATA_DIR, "data")
+    print("=" * 60)
+    print(f"CHILD EXECUTOR - Executor: {executor_key}")
+    print("=" * 60)
+    
+    followers = {}  # (pair_id, child_id) -> PairFollower
+    joined = {}     # (pair_id, child_id) -> launched_ms of the membership it was started for
+    arbiter = SignalArbiter(followers, netting=False)
+    session = {'acc': None, 'child': None}
+
+    def leave(key, reason):
+        follower = followers.pop(key)
+        follower.log.log(f"Leaving executor: {reason}", "INFO")
+        follower.close()
+        if follower.status:
+            follower.status.close()
+
+    def sync_members():
+        """Start followers for new memberships, drop the ones the launcher removed"""
+        global worker_status
+        members = {(pair_id, child_id): launched_ms for pair_id, child_id, launched_ms in load_members(data_dir, executor_key)}
+        for key in [k for k in followers if members.get(k) != joined.get(k)]:
+            leave(key, "removed by launcher")
+        for key, launched_ms in members.items():
+            if joined.get(key) == launched_ms:
+                continue  # Running, or already failed for this membership
+            joined[key] = launched_ms
+            pair, child = load_config(*key)
+            follower = PairFollower(key[0], key[1], open_follower_status(key[0], key[1], pair), exclusive=False,
+                                    arbiter=arbiter)
+            followers[key] = follower
+            if worker_status is None:
+                worker_status = follower.status  # The first member's status stands for the process exit status
+            if not follower.setup():
+                leave(key, "setup failed")
+                continue
+            if session['acc'] is None:
+                session['acc'] = connect_session(follower.child, follower.log)
+                session['child'] = follower.child
+                if session['acc'] is None:
+                    leave(key, "login failed")
+                    continue
+                arbiter.netting = session['acc'].margin_mode == getattr(mt5, 'ACCOUNT_MARGIN_MODE_RETAIL_NETTING', 0)
+            if not follower.attach(session['acc']):
+                leave(key, "master segment unavailable")
+        for key in [k for k in joined if k not in members]:
+            del joined[key]
+        return members
+    
+    members = sync_members()
+    members_path = get_members_path(data_dir, executor_key)
+    members_mtime = os.path.getmtime(members_path) if os.path.exists(members_path) else 0
+    last_members_check = time.time()
+    
+    try:
+        while followers:
+            now = time.time()
+            if now - last_members_check >= MEMBERS_CHECK_INTERVAL:
+                last_members_check = now
+                try:
+                    mtime = os.path.getmtime(members_path)
+                except OSError:
+                    mtime = 0
+                if mtime != members_mtime:
+                    members_mtime = mtime
+                    members = sync_members()
+            
+            # A failing follower backs off through its idle_until (same delays as
+            # run_executor's sleeps) so the others keep copying meanwhile
+            for key, follower in list(followers.items()):
+                try:
+                    result = follower.step()
+                    if result == DISABLED:
+                        leave(key, "child or pair disabled")
+                    elif result == ACTIVE:
+                        follower.error_count = 0  # Not on WAITING: that includes its own backoff passes
+                except struct.error as e:
+                    follower.error_count += 1
+                    if follower.error_count < 5:
+                        follower.log.log(f"Data read error (retrying): {e}", "WARN")
+                    follower.idle_until = time.time() + 0.1
+                except Exception as e:
+                    follower.error_count += 1
+                    follower.log.log(f"Loop error: {e}", "ERROR")
+                    if follower.error_count > 10:
+                        reconnect_session(session['child'], follower.log)
+                        follower.error_count = 0
+                    follower.idle_until = time.time() + 0.5
+            budget.pace()
+    except KeyboardInterrupt:
+        print("[*] Stopping (Ctrl+C)...")
+    finally:
+        for key in list(followers):
+            leave(key, "executor stopped")
+        if session['child']:
+            close_mt5_terminal(session['child'].get('terminal', '').strip().strip('"').strip("'"))
+        print(f"[*] Executor {executor_key} stopped ({len(members)} member(s) listed)")
+
+
 if __name__ == "__main__":
     # Parse command line arguments
     pair_id = None
@@ -1547,7 +1769,10 @@ if __name__ == "__main__":
             child_id = sys.argv[idx + 1]
     
     try:
-        main(pair_id, child_id)
+        if '--executor' in sys.argv and sys.argv.index('--executor') + 1 < len(sys.argv):
+            main_executor(sys.argv[sys.argv.index('--executor') + 1])
+        else:
+            main(pair_id, child_id)
     except Exception as e:
         print(f"\n[FATAL ERROR] {e}")
     finally:
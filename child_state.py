@@ -0,0 +1,222 @@
+"""
+Child State Segment - live account state and loop health of a pair's children
+Replaces child_data_{pair}_{child}.bin, which every child executor reopened
+and rewrote on every 10 ms loop pass, after asking MT5 for account info and
+all positions each time - only for the dashboard.
+
+data/children_{pair_id}.bin:
+    Header (16 bytes): magic(4) + version(4) + slot_count(4) + slot_size(4)
+    Slots (3416 bytes each): seq(8) + child_id(32) + pid(4) + count(4) + changed_ms(8)
+                             + checked_ms(8) + heartbeat_ms(8) + loops(8) + balance(8)
+                             + equity(8) + copies(4) + latency last/avg/max(3 x 4)
+                             + error_ms(8) + error(96)
+                             + 50 positions (64 each): ticket(8) + type(1) + volume(8)
+                               + sl(8) + tp(8) + symbol(15) + price_open(8) + profit(8)
+
+A child takes the slot of its index in the pair config unless another child
+holds it (see shm_segment.claim_slot); slots of children whose heartbeat
+stopped STALE_SLOT_AFTER ago are reused. Each child executor is the only
+writer of its slot.
+
+A writer polls MT5 at most once per poll interval (settings
+"child_state_interval_ms", DEFAULT_POLL_MS) and publishes the account state
+only when balance, equity or the positions changed. Otherwise the slot is
+only refreshed with the heartbeat (once per HEARTBEAT_INTERVAL): loop
+counter, time of the last poll, copy latency and the last error.
+"""
+
+import os
+import time
+import struct
+
+from shm_segment import open_segment, open_segment_readonly, seqlock_write, seqlock_read, claim_slot, SEQ_SIZE
+
+MAGIC = b'JDCH'
+VERSION = 1
+MAX_SLOTS = 32  # One per child of a pair
+MAX_POSITIONS = 50
+HEARTBEAT_INTERVAL = 1.0  # Seconds between publishes when the account state is unchanged
+DEFAULT_POLL_MS = 500  # Milliseconds between account_info / positions_get polls
+LATENCY_SMOOTHING = 0.2  # Weight of the newest copy in the average latency
+STALE_SLOT_AFTER = 300  # Seconds without heartbeat before another child may take a slot
+
+HEADER = struct.Struct('<4sIII')
+STATE = struct.Struct('<32sIIQQQQddIfffQ96s')
+POSITION = struct.Struct('<QBddd15sdd')
+PAYLOAD_SIZE = STATE.size + MAX_POSITIONS * POSITION.size
+SLOT_SIZE = SEQ_SIZE + PAYLOAD_SIZE
+SEGMENT_SIZE = HEADER.size + MAX_SLOTS * SLOT_SIZE
+
+
+def get_segment_path(data_dir, pair_id):
+    return os.path.join(data_dir, f'children_{pair_id}.bin')
+
+
+def _slot_offset(slot):
+    return HEADER.size + slot * SLOT_SIZE
+
+
+def _init_segment(mm):
+    HEADER.pack_into(mm, 0, MAGIC, VERSION, MAX_SLOTS, SLOT_SIZE)
+
+
+def pack_positions(positions):
+    """Position records of MT5 positions (first MAX_POSITIONS)"""
+    return b''.join(POSITION.pack(p.ticket, p.type, p.volume, p.sl, p.tp, p.symbol.encode('utf-8')[:15],
+                                  p.price_open, p.profit)
+                    for p in list(positions)[:MAX_POSITIONS])
+
+
+class ChildStateWriter:
+    """Child executor side: publishes its account state and loop health in its slot"""
+
+    def __init__(self, data_dir, pair_id, child_id, slot_hint, poll_ms=None):
+        self.mm = open_segment(get_segment_path(data_dir, pair_id), SEGMENT_SIZE, _init_segment)
+        if HEADER.unpack_from(self.mm, 0) != (MAGIC, VERSION, MAX_SLOTS, SLOT_SIZE):
+            _init_segment(self.mm)
+        self.child_id = child_id
+        self.slot = self._claim_slot(slot_hint)
+        self.poll_interval = (poll_ms or DEFAULT_POLL_MS) / 1000
+        self.balance = self.equity = 0.0
+        self.positions = b''
+        self.count = 0
+        self.changed_ms = self.checked_ms = 0
+        self.loops = 0
+        self.copies = 0
+        self.latency = self.avg_latency = self.max_latency = 0.0
+        self.error = ''
+        self.error_ms = 0
+        self.last_publish = 0.0
+        self._publish()
+
+    def _read_slot(self, slot):
+        payload = seqlock_read(self.mm, _slot_offset(slot), STATE.size)
+        return STATE.unpack(payload) if payload else None
+
+    def _claim_slot(self, slot_hint):
+        def owner_of(slot):
+            current = self._read_slot(slot)
+            return _symbol(current[0]) if current else None
+
+        def reclaimable(slot):
+            current = self._read_slot(slot)
+            return current is not None and time.time() * 1000 - current[5] > STALE_SLOT_AFTER * 1000
+
+        return claim_slot(owner_of, range(MAX_SLOTS), self.child_id, slot_hint, reclaimable)
+
+    def _publish(self):
+        now = time.time()
+        self.last_publish = now
+        payload = STATE.pack(self.child_id.encode('utf-8')[:32], os.getpid(), self.count, self.changed_ms,
+                             self.checked_ms, int(now * 1000), self.loops, self.balance, self.equity,
+                             self.copies, self.latency, self.avg_latency, self.max_latency,
+                             self.error_ms, self.error.encode('utf-8')[:96])
+        seqlock_write(self.mm, _slot_offset(self.slot), payload + self.positions)
+
+    def heartbeat(self):
+        """Count a loop pass; publishes at most once per HEARTBEAT_INTERVAL - cheap enough for every pass"""
+        self.loops += 1
+        if time.time() - self.last_publish >= HEARTBEAT_INTERVAL:
+            self._publish()
+
+    def poll_due(self):
+        """Whether the account state should be read from MT5 again"""
+        return time.time() * 1000 - self.checked_ms >= self.poll_interval * 1000
+
+    def update(self, balance, equity, positions):
+        """Account state read from MT5; published right away only if it changed"""
+        now_ms = int(time.time() * 1000)
+        self.checked_ms = now_ms
+        packed = pack_positions(positions)
+        if (balance, equity, packed) == (self.balance, self.equity, self.positions) and self.changed_ms:
+            return
+        self.balance, self.equity, self.positions = balance, equity, packed
+        self.count = len(packed) // POSITION.size
+        self.changed_ms = now_ms
+        self._publish()
+
+    def record_copy(self, latency_ms):
+        """Latency of one copy attempt (published with the next heartbeat)"""
+        self.copies += 1
+        self.latency = latency_ms
+        self.avg_latency = latency_ms if self.copies == 1 else \
+            self.avg_latency + LATENCY_SMOOTHING * (latency_ms - self.avg_latency)
+        self.max_latency = max(self.max_latency, latency_ms)
+
+    def note_error(self, message):
+        """Latest error (published with the next heartbeat)"""
+        self.error = message
+        self.error_ms = int(time.time() * 1000)
+
+    def close(self):
+        try:
+            self._publish()
+            self.mm.close()
+        except Exception:
+            pass
+
+
+def open_child_state(data_dir, pair_id, child_id, slot_hint, poll_ms=None):
+    """ChildStateWriter, or None (with a warning) if the segment cannot be opened or is full"""
+    try:
+        return ChildStateWriter(data_dir, pair_id, child_id, slot_hint, poll_ms)
+    except Exception as e:
+        print(f"[WARN] Child state segment unavailable: {e}")
+        return None
+
+
+def _symbol(raw):
+    return raw.rstrip(b'\x00').decode('utf-8', errors='ignore')
+
+
+def _unpack(payload):
+    (child_id, pid, count, changed_ms, checked_ms, heartbeat_ms, loops, balance, equity,
+     copies, latency, avg_latency, max_latency, error_ms, error) = STATE.unpack_from(payload, 0)
+    positions = []
+    for i in range(min(count, MAX_POSITIONS)):
+        ticket, pos_type, volume, sl, tp, symbol, price_open, profit = \
+            POSITION.unpack_from(payload, STATE.size + i * POSITION.size)
+        positions.append({
+            'ticket': ticket, 'symbol': _symbol(symbol), 'type': pos_type,
+            'volume': volume, 'sl': sl, 'tp': tp,
+            'price_open': price_open, 'profit': round(profit, 2)
+        })
+    return {
+        'child_id': _symbol(child_id),
+        'pid': pid,
+        'changed': changed_ms,
+        'checked': checked_ms,
+        'heartbeat': heartbeat_ms,
+        'loops': loops,
+        'balance': balance,
+        'equity': equity,
+        'positions': positions,
+        'copies': copies,
+        'latency_ms': round(latency, 1),
+        'avg_latency_ms': round(avg_latency, 1),
+        'max_latency_ms': round(max_latency, 1),
+        'last_error': error.rstrip(b'\x00').decode('utf-8', errors='ignore'),
+        'error_time': error_ms
+    }
+
+
+def read_child_states(data_dir, pair_id):
+    """{child_id: slot dict} of every child of a pair in one mapping ({} if there is no segment)"""
+    mm = open_segment_readonly(get_segment_path(data_dir, pair_id), SEGMENT_SIZE)
+    if mm is None:
+        return {}
+    try:
+        if HEADER.unpack_from(mm, 0) != (MAGIC, VERSION, MAX_SLOTS, SLOT_SIZE):
+            return {}
+        result = {}
+        for slot in range(MAX_SLOTS):
+            payload = seqlock_read(mm, _slot_offset(slot), PAYLOAD_SIZE)
+            if not payload:
+                continue
+            state = _unpack(payload)
+            previous = result.get(state['child_id'])
+            if state['child_id'] and (not previous or state['heartbeat'] > previous['heartbeat']):
+                result[state['child_id']] = state  # A slot left by a reordered config loses to the live one
+        return result
+    finally:
+        mm.close()
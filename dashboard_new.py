@@ -5,15 +5,18 @@ Supports multiple pairs with multiple children per pair
 License-protected version - no user login required
 """
 
-from flask import Flask, render_template, jsonify, request, session, redirect, url_for, flash
+from flask import Flask, Response, render_template, jsonify, request, session, redirect, url_for, flash
 import json
 import os
 import sys
 import time
+import threading
+import zlib
+import gzip
+import heapq
+import itertools
 from datetime import datetime, timedelta
 import secrets
-import mmap
-import struct
 from auth_license import (
     generate_secret_key, login_required, developer_required,
     authenticate_user, verify_access_code, get_current_user, get_user_by_id,
@@ -21,6 +24,20 @@ from auth_license import (
     generate_user_access_code, can_access_pair, get_user_pairs, verify_password
 )
 from license import get_license_info, check_license_limits
+from log_cursor import (
+    decode_cursor, encode_cursor, read_new_lines, seek_end, read_lines_reversed, file_changed, section_changed, LOG_LINE_RE
+)
+from log_archive import read_archive
+from storage_db import db
+from stats_segment import read_pair_stats
+from price_segment import read_prices
+from read_model import read_master, read_child, read_children
+from event_hub import EventHub
+from stream_export import iter_json, iter_csv
+from static_assets import AssetManifest, CACHE_CONTROL
+from fetcher_pool import get_pool
+from node_client import (get_client as get_node_client, load_nodes, save_nodes, pair_summary,
+                         STATUS_TIMEOUT as NODE_STATUS_TIMEOUT, COMMAND_TIMEOUT as NODE_COMMAND_TIMEOUT)
 
 
 # Get correct directory for config files (works in both dev and EXE)
@@ -44,12 +61,242 @@ def get_data_dir():
 DATA_DIR = get_data_dir()
 CONFIG_FILE = 'config.json'
 STATUS_FILE = 'copier_status.json'
-STATS_FILE = 'pair_stats.json'
+STATS_FILE = 'pair_stats.json'  # Legacy, imported into the database once
+STATS_CHECKPOINT_INTERVAL = 60  # Seconds between copies of live stats into the database
+MARKET_WATCH_INTERVAL = 1.0  # Seconds between market watch snapshots
+MARKET_WATCH_IDLE = 30  # Stop refreshing after this long without requests
+STREAM_INTERVAL = 0.25  # Seconds between change checks for /api/stream clients
+STREAM_EQUITY_INTERVAL = 5.0  # Seconds between pushes of equity/floating profit alone (they move every tick)
+STREAM_TELEMETRY_INTERVAL = 5.0  # Seconds between checks of worker load figures (resource governor sample rate)
+STREAM_LOG_TAIL = 500  # Lines pushed for a log that was rotated or created while streaming
+GZIP_MIN_SIZE = 1024  # Smaller JSON bodies are sent uncompressed
+LOG_EXPORT_COLUMNS = ['timestamp', 'type', 'account', 'account_type', 'pair_name', 'symbol',
+                      'message', 'ticket', 'volume', 'price', 'sl', 'tp', 'source']
+TRADE_EXPORT_COLUMNS = ['close_time', 'account_type', 'child_id', 'ticket', 'symbol', 'type',
+                        'volume', 'price_open', 'close_price', 'profit']
+ACTIVITY_TAGS = ['[SIGNAL]', '[OPEN]', '[CLOSE]', '[ERROR]', '[WARN]', '[INFO]', '[DEBUG]']
+
+def make_market_entry(price):
+    """Build a market watch row (same fields as mt5_data_fetcher.get_market_watch) from a price segment slot"""
+    bid, ask, point, digits, daily_open = price['bid'], price['ask'], price['point'], price['digits'], price['daily_open']
+    current = bid if bid > 0 else price['last']
+    change = ((current - daily_open) / daily_open) * 100 if daily_open > 0 and current > 0 else 0
+    return {
+        'symbol': price['symbol'],
+        'bid': bid,
+        'ask': ask,
+        'last': price['last'] if price['last'] > 0 else (bid + ask) / 2,
+        'spread': round((ask - bid) / point) if point > 0 else 0,
+        'daily_open': round(daily_open, digits) if daily_open > 0 else 0,
+        'daily_change': round(change, 2),
+        'time': datetime.fromtimestamp(price['time_msc'] / 1000).strftime('%H:%M:%S') if price['time_msc'] > 0 else '',
+        'digits': digits
+    }
+
+def fresh_state(state):
+    """Segment state (see read_model) while its writer is updating it, else None - caller asks the terminal"""
+    return state if state and state['fresh'] else None
+
+def make_freshness(state):
+    """Where an account's live fields came from and how old they are"""
+    if state:
+        return {'source': 'segment', 'updated': state['updated'], 'age_ms': state['age_ms']}
+    return {'source': 'terminal', 'updated': int(time.time() * 1000), 'age_ms': 0}
+
+def make_segment_positions(state, login):
+    """get_mt5_positions-shaped result from a segment state"""
+    positions = [dict(p, type_str='BUY' if p['type'] == 0 else 'SELL') for p in state['positions']]
+    return {
+        'success': True,
+        'account': {
+            'login': login,
+            'balance': state['balance'],
+            'equity': state['equity'],
+            'profit': round(state['equity'] - state['balance'], 2)
+        },
+        'positions': positions,
+        'count': len(positions),
+        'freshness': make_freshness(state)
+    }
+
+def trade_signature(state):
+    """Parts of a segment state that change on trades only - balance, tickets, volumes, SL/TP (no equity or profit)"""
+    if not state:
+        return None
+    return (state['balance'],
+            tuple((p['ticket'], p['volume'], p['sl'], p['tp']) for p in state['positions']),
+            tuple((o['ticket'], o['volume'], o['price'], o['sl'], o['tp']) for o in state['orders']))
+
+def equity_signature(state):
+    """Equity and floating profit of a segment state (change with every price tick)"""
+    if not state:
+        return None
+    return (state['equity'], tuple(p['profit'] for p in state['positions']))
+
+def make_cached_json(payload):
+    """JSON response with a content ETag: 304 without a body when the client's copy is current, gzip when accepted"""
+    body = json.dumps(payload, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    etag = '"%08x-%x"' % (zlib.crc32(body), len(body))
+    if etag in request.headers.get('If-None-Match', ''):
+        response = Response(status=304)
+    else:
+        encoding = None
+        if len(body) >= GZIP_MIN_SIZE and 'gzip' in request.headers.get('Accept-Encoding', ''):
+            body, encoding = gzip.compress(body, compresslevel=5), 'gzip'
+        response = Response(body, mimetype='application/json')
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+    response.headers['ETag'] = etag
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['Vary'] = 'Accept-Encoding, Cookie'
+    return response
+
+def make_trade_entry(row):
+    """Build a closed-trade record from a trade_history row"""
+    return {
+        'ticket': row['ticket'],
+        'symbol': row['symbol'],
+        'type': row['type'],
+        'volume': row['volume'],
+        'price_open': round(row['price_open'] or 0, 5),
+        'close_price': round(row['price_close'] or 0, 5),
+        'profit': round(row['profit'] or 0, 2),
+        'close_time': row['close_time'] or ''
+    }
+
+def make_log_entry(log, account, account_type, pair_id, pair_name, source):
+    """Build a history record from a JSON activity entry"""
+    return {
+        'timestamp': f"{log.get('date', '')} {log.get('time', '')}".strip(),
+        'type': log.get('type', 'info'),
+        'action': log.get('action', log.get('type', 'info')),
+        'message': log.get('message', ''),
+        'account': account,
+        'account_type': account_type,
+        'pair_id': pair_id,
+        'pair_name': pair_name,
+        'symbol': log.get('symbol', ''),
+        'ticket': log.get('ticket', ''),
+        'volume': log.get('volume', ''),
+        'price': log.get('price', ''),
+        'sl': log.get('sl', ''),
+        'tp': log.get('tp', ''),
+        'source': source
+    }
+
+def make_log_line_record(line, account, account_type, pair_id, pair_name, source, child_id=None):
+    """Build a history record from one text log line (None if it is not a log entry)"""
+    match = LOG_LINE_RE.match(line.strip())
+    if not match:
+        return None
+    date_str, time_str, log_type, message = match.groups()
+    record = {
+        'timestamp': f"{date_str} {time_str}",
+        'type': log_type.lower(),
+        'action': log_type.lower(),
+        'message': message,
+        'account': account,
+        'account_type': account_type,
+        'pair_id': pair_id,
+        'pair_name': pair_name,
+        'symbol': '',
+        'ticket': '',
+        'volume': '',
+        'price': '',
+        'sl': '',
+        'tp': '',
+        'source': source
+    }
+    if child_id:
+        record['child_id'] = child_id
+    return record
+
+def parse_log_lines(lines, account, account_type, pair_id, pair_name, source, child_id=None):
+    """Build history records (newest first) from text log lines"""
+    records = []
+    for line in reversed(lines):
+        record = make_log_line_record(line, account, account_type, pair_id, pair_name, source, child_id)
+        if record:
+            records.append(record)
+    return records
+
+def iter_log_lines(lines, account, account_type, pair_id, pair_name, source, child_id=None):
+    """Lazy parse_log_lines for lines already in newest-first order"""
+    for line in lines:
+        record = make_log_line_record(line, account, account_type, pair_id, pair_name, source, child_id)
+        if record:
+            yield record
+
+def make_system_log_entry(line):
+    """Build a history record from a trade_log.txt line"""
+    log_type = 'info'
+    if 'ERROR' in line.upper(): log_type = 'error'
+    elif 'WARNING' in line.upper(): log_type = 'warning'
+    elif 'SUCCESS' in line.upper() or 'COPIED' in line.upper(): log_type = 'trade'
+    return {
+        'timestamp': '',
+        'type': log_type,
+        'action': log_type,
+        'message': line,
+        'account': 'System',
+        'account_type': 'SYSTEM',
+        'pair_id': '',
+        'pair_name': 'System',
+        'source': 'system'
+    }
+
+def normalize_log_type(record):
+    """History page category of a log record (same rules as normalizeType in history.html)"""
+    t = (record.get('type') or record.get('action') or 'info').lower()
+    msg = (record.get('message') or '').lower()
+    if t in ('trade', 'open') or 'opened' in msg or 'open trade' in msg or 'buy ' in msg or 'sell ' in msg: return 'trade'
+    if t == 'close' or 'closed' in msg or 'close trade' in msg: return 'close'
+    if t == 'copy' or 'copied' in msg: return 'copy'
+    if t == 'modify' or 'modified' in msg or 'sl/tp' in msg: return 'modify'
+    if t == 'signal' or 'signal' in msg: return 'signal'
+    if t == 'error' or 'error' in msg or 'failed' in msg: return 'error'
+    if t == 'warning' or 'warning' in msg: return 'warning'
+    if t == 'debug': return 'debug'
+    return 'info'
+
+def stream_response(chunks, filename=None, mimetype='application/json'):
+    """Chunked response from a text generator (sent as a download when filename is set)"""
+    response = Response((chunk.encode('utf-8') for chunk in chunks), mimetype=mimetype)
+    if filename:
+        response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+def parse_activity_lines(lines, time_width, tags=ACTIVITY_TAGS):
+    """Build dashboard activity entries (newest first) from text log lines"""
+    activities = []
+    for line in reversed(lines):
+        if any(tag in line for tag in tags):
+            log_type = 'INFO'
+            if '[CLOSE]' in line: log_type = 'CLOSE'
+            elif '[SIGNAL]' in line: log_type = 'SIGNAL'
+            elif '[OPEN]' in line: log_type = 'TRADE'
+            elif '[ERROR]' in line: log_type = 'ERROR'
+            elif '[WARN]' in line: log_type = 'WARN'
+            elif '[DEBUG]' in line: log_type = 'DEBUG'
+            
+            activities.append({
+                'time': line[1:time_width] if len(line) > time_width else '',
+                'message': line.strip(),
+                'type': log_type
+            })
+    return activities
 
 def create_app(process_manager):
     """Create Flask application with process manager"""
     app = Flask(__name__, template_folder='Templates', static_folder='static')
     app.secret_key = generate_secret_key()
+    # Compiled templates are cached for the life of the process (no per-render file checks)
+    app.config['TEMPLATES_AUTO_RELOAD'] = False
+    
+    # Shared CSS/JS under fingerprinted, long-cached URLs (see static_assets)
+    assets = AssetManifest(app.static_folder)
+    app.jinja_env.globals['asset_url'] = assets.url
     
     # Store process manager reference
     app.config['PROCESS_MANAGER'] = process_manager
@@ -66,17 +313,49 @@ def create_app(process_manager):
         with open(config_path, 'w') as f:
             json.dump(config, f, indent=2)
     
-    def load_stats():
-        stats_path = os.path.join(DATA_DIR, STATS_FILE)
-        if os.path.exists(stats_path):
-            with open(stats_path, 'r', encoding='utf-8-sig') as f:
-                return json.load(f)
-        return {}
+    stats_checkpoint = {'time': 0}
+    
+    def load_stats(config=None):
+        """Copy counters per pair - live from the shared-memory stats segments, else the database"""
+        stats = db.get_trade_stats()
+        data_dir = os.path.join(DATA_DIR, 'data')
+        checkpoint = time.time() - stats_checkpoint['time'] >= STATS_CHECKPOINT_INTERVAL
+        for pair in (config or load_config()).get('pairs', []):
+            pair_id = pair.get('id')
+            live = read_pair_stats(data_dir, pair_id)
+            if live is None:
+                continue
+            stats[pair_id] = live
+            if checkpoint:
+                db.set_trade_stats(pair_id, live['total'], live['success'], live['failed'])
+        if checkpoint:
+            stats_checkpoint['time'] = time.time()
+        return stats
+    
+    def import_legacy_trade_files():
+        """Move pre-database pair_stats.json / closed_trades_*.json into the trade database (once)"""
+        data_dir = os.path.join(DATA_DIR, 'data')
+        try:
+            stats_path = os.path.join(DATA_DIR, STATS_FILE)
+            if os.path.exists(stats_path):
+                with open(stats_path, 'r', encoding='utf-8-sig') as f:
+                    db.import_trade_stats(json.load(f))
+                os.replace(stats_path, stats_path + '.imported')
+            
+            for pair in load_config().get('pairs', []):
+                pair_id = pair.get('id')
+                closed_file = os.path.join(data_dir, f'closed_trades_{pair_id}.json')
+                if os.path.exists(closed_file):
+                    db.import_closed_trades_file(closed_file, pair_id, pair.get('master_account', 0), 'MASTER')
+                for child in pair.get('children', []):
+                    child_id = child.get('id')
+                    closed_file = os.path.join(data_dir, f'closed_trades_{pair_id}_{child_id}.json')
+                    if os.path.exists(closed_file):
+                        db.import_closed_trades_file(closed_file, pair_id, child.get('account', 0), 'CHILD', child_id)
+        except Exception as e:
+            print(f"[WARN] Legacy trade import failed: {e}")
     
-    def save_stats(stats):
-        stats_path = os.path.join(DATA_DIR, STATS_FILE)
-        with open(stats_path, 'w') as f:
-            json.dump(stats, f, indent=2)
+    import_legacy_trade_files()
     
     @app.context_processor
     def inject_user():
@@ -84,6 +363,24 @@ def create_app(process_manager):
         license_info = get_license_info()
         return dict(current_user=user, license_info=license_info)
     
+    @app.route('/assets/<path:filename>')
+    def serve_asset(filename):
+        """Fingerprinted static asset, precompressed per Accept-Encoding"""
+        asset = assets.get(filename)
+        if not asset:
+            return 'Not found', 404
+        if asset.etag in request.headers.get('If-None-Match', ''):
+            response = Response(status=304)
+        else:
+            encoding, body = asset.select(request.headers.get('Accept-Encoding'))
+            response = Response(body, mimetype=asset.mimetype)
+            if encoding != 'identity':
+                response.headers['Content-Encoding'] = encoding
+        response.headers['ETag'] = asset.etag
+        response.headers['Cache-Control'] = CACHE_CONTROL
+        response.headers['Vary'] = 'Accept-Encoding'
+        return response
+    
     # License Error Route
     @app.route('/license-error')
     def license_error():
@@ -170,7 +467,11 @@ def create_app(process_manager):
     @app.route('/api/pairs', methods=['GET'])
     @login_required
     def get_pairs():
-        config = load_config()
+        pm = app.config['PROCESS_MANAGER']
+        return jsonify(build_pair_list(load_config(), pm.get_status()))
+    
+    def build_pair_list(config, status):
+        """Pairs visible to the current user, with process status attached"""
         user = get_current_user()
         pairs = config.get('pairs', [])
         
@@ -187,9 +488,6 @@ def create_app(process_manager):
             pairs = [p for _, p in accessible_pairs]
         
         # Add status information
-        pm = app.config['PROCESS_MANAGER']
-        status = pm.get_status()
-        
         for pair in pairs:
             pair_id = pair.get('id')
             if pair_id in status:
@@ -205,7 +503,7 @@ def create_app(process_manager):
                     'children_running': {}
                 }
         
-        return jsonify(pairs)
+        return pairs
     
     @app.route('/api/pairs', methods=['POST'])
     @developer_required
@@ -402,6 +700,7 @@ def create_app(process_manager):
             'period': data.get('period', 'M1'),
             'symbol_override': data.get('symbol_override', False),
             'force_copy': data.get('force_copy', False),
+            'conflict_policy': data.get('conflict_policy', 'allow'),
             'enabled': data.get('enabled', True)
         }
         
@@ -438,7 +737,7 @@ def create_app(process_manager):
             return jsonify({'success': False, 'error': 'Child not found'})
         
         # Update child fields
-        for key in ['name', 'terminal', 'account', 'password', 'server', 'lot_multiplier', 'copy_mode', 'copy_close', 'enabled', 'period', 'symbol_override', 'force_copy', 'copy_sl', 'copy_tp', 'copy_pending', 'active_from', 'active_to']:
+        for key in ['name', 'terminal', 'account', 'password', 'server', 'lot_multiplier', 'copy_mode', 'copy_close', 'enabled', 'period', 'symbol_override', 'force_copy', 'copy_sl', 'copy_tp', 'copy_pending', 'active_from', 'active_to', 'conflict_policy']:
             if key in data:
                 value = data[key]
                 if key in ['terminal', 'server'] and isinstance(value, str):
@@ -515,6 +814,13 @@ def create_app(process_manager):
         success, message = pm.stop_child(pair_id, child_id)
         return jsonify({'success': success, 'message': message})
     
+    def first_pair_stats(config, stats=None):
+        """Copy counters of the first enabled pair (the overview 'copied' figure)"""
+        pairs = [p for p in config.get('pairs', []) if p.get('enabled', True)]
+        if not pairs:
+            return {'total': 0, 'success': 0, 'failed': 0}
+        return (stats or load_stats(config)).get(pairs[0]['id'], {'total': 0, 'success': 0, 'failed': 0})
+    
     @app.route('/api/status')
     @login_required
     def get_status():
@@ -540,7 +846,7 @@ def create_app(process_manager):
         pair_running = pair_id in status and status[pair_id].get('master', False)
         
         # Load stats
-        stats = load_stats().get(pair_id, {'total': 0, 'success': 0, 'failed': 0})
+        stats = first_pair_stats(config)
         
         # Build response
         result = {
@@ -575,20 +881,168 @@ def create_app(process_manager):
         
         return jsonify(result)
     
-    @app.route('/api/process-status')
-    @login_required
-    def get_process_status():
-        pm = app.config['PROCESS_MANAGER']
-        raw_status = pm.get_status()
-        # Convert to format expected by UI: {pair_id: {running: bool, activated: bool}}
+    def get_ui_process_status(raw_status=None):
+        if raw_status is None:
+            raw_status = app.config['PROCESS_MANAGER'].get_status()
+        # Convert to format expected by UI: {pair_id: {running: bool, activated: bool, children, workers}}
         status = {}
         for pair_id, pair_status in raw_status.items():
             status[pair_id] = {
                 'running': pair_status.get('master', False),
                 'activated': pair_status.get('activated', False),
-                'children': pair_status.get('children', {})
+                'children': pair_status.get('children', {}),
+                'workers': pair_status.get('workers', {})
             }
-        return jsonify(status)
+        return status
+    
+    @app.route('/api/process-status')
+    @login_required
+    def get_process_status():
+        return jsonify(get_ui_process_status())
+    
+    @app.route('/api/snapshot')
+    @login_required
+    def get_snapshot():
+        """Everything the index page polls for - pairs, process status and copy stats - in one response
+
+        Built from one config read and one process status pass. Send the last
+        ETag as If-None-Match to get 304 with no body while nothing changed.
+        """
+        pm = app.config['PROCESS_MANAGER']
+        config = load_config()
+        raw_status = pm.get_status()
+        return make_cached_json({
+            'pairs': build_pair_list(config, raw_status),
+            'process_status': get_ui_process_status(raw_status),
+            'stats': first_pair_stats(config)
+        })
+    
+    @app.route('/api/telemetry')
+    @login_required
+    def get_telemetry():
+        """Worker load per pair (CPU%, loop rate, cores, copy latency) - volatile, so not part of /api/snapshot"""
+        return jsonify(app.config['PROCESS_MANAGER'].get_telemetry())
+    
+    @app.route('/api/fetcher-stats')
+    @login_required
+    def get_fetcher_stats():
+        """MT5 fetcher pool cache counters (hits, coalesced waits, misses per function)"""
+        return jsonify(get_pool().cache_stats())
+    
+    # API Routes - Nodes (this machine plus the node agents in nodes.json)
+    LOCAL_NODE = 'local'
+    
+    def local_node_status():
+        pm = app.config['PROCESS_MANAGER']
+        config = load_config()
+        return {
+            'success': True, 'node': LOCAL_NODE, 'local': True, 'latency_ms': 0,
+            'pairs': [pair_summary(p) for p in config.get('pairs', [])],
+            'status': pm.get_status(),
+            'stats': load_stats(config)
+        }
+    
+    def local_node_action(pair_id, action, child_id=None):
+        """Same operations a node agent exposes, on this machine's ProcessManager"""
+        pm = app.config['PROCESS_MANAGER']
+        if child_id:
+            if action == 'stop':
+                success, message = pm.stop_child(pair_id, child_id)
+            else:
+                pair = next((p for p in load_config().get('pairs', []) if p.get('id') == pair_id), None)
+                child = next((c for c in (pair or {}).get('children', []) if c.get('id') == child_id), None)
+                if not child:
+                    return {'success': False, 'error': 'Child not found', 'node': LOCAL_NODE}
+                success, message = pm.start_child(pair_id, child_id, child)
+        else:
+            actions = {'start': pm.start_pair, 'stop': pm.stop_pair,
+                       'activate': pm.activate_pair, 'deactivate': pm.deactivate_pair}
+            success, message = actions[action](pair_id)
+        return {'success': success, 'message': message, 'node': LOCAL_NODE}
+    
+    def run_node_commands(targets, action):
+        """
+        Run one pair/child action on several nodes in parallel.
+        targets is a list of {'node', 'pair_id', 'child_id'?}; results come back in the same order.
+        """
+        nodes = {n['name']: n for n in load_nodes(DATA_DIR)}
+        client = get_node_client()
+        futures = []
+        for target in targets:
+            node_name, pair_id, child_id = target.get('node'), target.get('pair_id'), target.get('child_id')
+            path = f"/pairs/{pair_id}" + (f"/children/{child_id}" if child_id else '') + f"/{action}"
+            if node_name == LOCAL_NODE:
+                futures.append(client.executor.submit(local_node_action, pair_id, action, child_id))
+            elif node_name in nodes:
+                futures.append(client.executor.submit(client.call, nodes[node_name], 'POST', path, {},
+                                                      NODE_COMMAND_TIMEOUT))
+            else:
+                futures.append(None)
+        results = []
+        for target, future in zip(targets, futures):
+            try:
+                result = future.result() if future else {'success': False, 'error': 'Unknown node'}
+            except Exception as e:
+                result = {'success': False, 'error': str(e)}
+            result.update(node=target.get('node'), pair_id=target.get('pair_id'), child_id=target.get('child_id'))
+            results.append(result)
+        return results
+    
+    @app.route('/api/nodes')
+    @developer_required
+    def get_nodes():
+        """Aggregated view of every node: pairs, process status, worker health and copy stats"""
+        nodes = load_nodes(DATA_DIR)
+        remote = get_node_client().fan_out([(n, 'GET', '/status', None, NODE_STATUS_TIMEOUT) for n in nodes])
+        for node, result in zip(nodes, remote):
+            result['url'] = node['url']
+        return jsonify({'nodes': [local_node_status()] + remote})
+    
+    @app.route('/api/nodes', methods=['POST'])
+    @developer_required
+    def save_node():
+        """Add or update a node agent (name, url, token)"""
+        data = request.json or {}
+        name, url, token = (data.get('name') or '').strip(), (data.get('url') or '').strip(), data.get('token') or ''
+        if not name or name == LOCAL_NODE or not url.startswith(('http://', 'https://')):
+            return jsonify({'success': False, 'error': 'Name and http(s) URL are required'})
+        nodes = load_nodes(DATA_DIR)
+        previous = next((n for n in nodes if n['name'] == name), {})
+        nodes = [n for n in nodes if n['name'] != name]
+        nodes.append({'name': name, 'url': url, 'token': token or previous.get('token', '')})
+        save_nodes(DATA_DIR, nodes)
+        return jsonify({'success': True})
+    
+    @app.route('/api/nodes/<name>', methods=['DELETE'])
+    @developer_required
+    def delete_node(name):
+        save_nodes(DATA_DIR, [n for n in load_nodes(DATA_DIR) if n['name'] != name])
+        return jsonify({'success': True})
+    
+    @app.route('/api/nodes/<name>/pairs/<pair_id>/<action>', methods=['POST'])
+    @developer_required
+    def node_pair_action(name, pair_id, action):
+        if action not in ('start', 'stop', 'activate', 'deactivate'):
+            return jsonify({'success': False, 'error': 'Unknown action'}), 404
+        return jsonify(run_node_commands([{'node': name, 'pair_id': pair_id}], action)[0])
+    
+    @app.route('/api/nodes/<name>/pairs/<pair_id>/children/<child_id>/<action>', methods=['POST'])
+    @developer_required
+    def node_child_action(name, pair_id, child_id, action):
+        if action not in ('start', 'stop'):
+            return jsonify({'success': False, 'error': 'Unknown action'}), 404
+        return jsonify(run_node_commands([{'node': name, 'pair_id': pair_id, 'child_id': child_id}], action)[0])
+    
+    @app.route('/api/nodes/command', methods=['POST'])
+    @developer_required
+    def node_command():
+        """One action on many node pairs at once: {'action', 'targets': [{'node', 'pair_id', 'child_id'?}]}"""
+        data = request.json or {}
+        action, targets = data.get('action'), data.get('targets') or []
+        if action not in ('start', 'stop', 'activate', 'deactivate'):
+            return jsonify({'success': False, 'error': 'Unknown action'})
+        results = run_node_commands(targets, action)
+        return jsonify({'success': all(r.get('success') for r in results), 'results': results})
     
     @app.route('/api/pairs/<pair_id>/activate', methods=['POST'])
     @developer_required
@@ -610,12 +1064,14 @@ def create_app(process_manager):
         success, message = pm.deactivate_pair(pair_id)
         return jsonify({'success': success, 'message': message})
     
-    @app.route('/api/market-watch')
-    @login_required
-    def get_market_watch():
+    # Market watch: one background refresher builds a shared snapshot that every
+    # client reads, so the terminal is queried once per interval whatever the client count
+    market_watch = {'body': None, 'requested': 0, 'thread': None}
+    market_watch_lock = threading.Lock()
+    market_watch_ready = threading.Event()
+    
+    def fetch_market_watch():
         """Get Market Watch symbols from first active master account"""
-        from mt5_data_fetcher import get_market_watch
-        
         pm = app.config['PROCESS_MANAGER']
         status = pm.get_status()
         config = load_config()
@@ -631,8 +1087,16 @@ def create_app(process_manager):
                 master_password = pair.get('master_password')
                 master_terminal = pair.get('master_terminal', '').strip().strip('"\'')
                 
+                # Prices published by the running master watcher - no terminal round trip
+                prices = read_prices(os.path.join(DATA_DIR, 'data'), pair_id)
+                if prices:
+                    symbols = [make_market_entry(p) for p in prices]
+                    return {'success': True, 'symbols': symbols, 'count': len(symbols),
+                            'master_account': master_account, 'source': 'segment'}
+                
                 # Fetch market watch from this terminal
-                result = get_market_watch(
+                result = get_pool().call(
+                    'get_market_watch',
                     login=master_account,
                     server=master_server,
                     password=master_password,
@@ -640,14 +1104,185 @@ def create_app(process_manager):
                 )
                 
                 if result.get('success'):
-                    result['master_account'] = master_account
-                    return jsonify(result)
+                    return dict(result, master_account=master_account)
         
-        return jsonify({
+        return {
             'success': False,
             'error': 'No active pairs. Activate a pair to see market data.',
             'symbols': []
-        })
+        }
+    
+    def market_watch_loop():
+        while True:
+            with market_watch_lock:
+                if time.time() - market_watch['requested'] > MARKET_WATCH_IDLE:
+                    # Nobody is watching - drop the snapshot so a restart never serves stale prices
+                    market_watch['thread'] = None
+                    market_watch['body'] = None
+                    market_watch_ready.clear()
+                    return
+            start = time.time()
+            try:
+                result = fetch_market_watch()
+            except Exception as e:
+                result = {'success': False, 'error': str(e), 'symbols': []}
+            market_watch['body'] = json.dumps(result)
+            market_watch_ready.set()
+            time.sleep(max(0, MARKET_WATCH_INTERVAL - (time.time() - start)))
+    
+    def keep_market_watch():
+        """Mark the snapshot as wanted (starts the refresher if it is not running)"""
+        with market_watch_lock:
+            market_watch['requested'] = time.time()
+            if market_watch['thread'] is None:
+                market_watch['thread'] = threading.Thread(target=market_watch_loop, name='market-watch', daemon=True)
+                market_watch['thread'].start()
+    
+    @app.route('/api/market-watch')
+    @login_required
+    def get_market_watch():
+        """Latest market watch snapshot (starts the refresher on first use)"""
+        keep_market_watch()
+        market_watch_ready.wait(10)
+        body = market_watch['body']
+        if body is None:
+            return jsonify({'success': False, 'error': 'Market data not available yet', 'symbols': []})
+        return Response(body, mimetype='application/json')
+    
+    # Live push channel: one watcher thread checks cheap change signals (segment
+    # contents, log file offsets, process status) and publishes what changed,
+    # with the changed data, once to every /api/stream client
+    event_hub = EventHub()
+    stream_state = {'thread': None}
+    stream_lock = threading.Lock()
+    
+    def file_signature(path):
+        try:
+            st = os.stat(path)
+            return (st.st_size, st.st_mtime_ns)
+        except OSError:
+            return None
+    
+    def collect_stream_changes(last):
+        """Compare change signals with the previous pass; returns [(event, data)] for what changed"""
+        events = []
+        missing = object()
+        
+        def changed(key, signature):
+            previous = last.get(key, missing)
+            last[key] = signature
+            return previous is not missing and previous != signature
+        
+        status = get_ui_process_status()
+        if changed('status', json.dumps(status, sort_keys=True)):
+            events.append(('status', status))
+        
+        # Worker load moves with every governor sample - its own event, checked at that rate
+        now = time.time()
+        if now - last.get('telemetry_at', 0) >= STREAM_TELEMETRY_INTERVAL:
+            last['telemetry_at'] = now
+            telemetry = app.config['PROCESS_MANAGER'].get_telemetry()
+            if changed('telemetry', json.dumps(telemetry, sort_keys=True)):
+                events.append(('telemetry', telemetry))
+        
+        data_dir = os.path.join(DATA_DIR, 'data')
+        logs_dir = os.path.join(DATA_DIR, 'logs')
+        log_state = last.setdefault('log_cursor', {})
+        
+        def follow_log(path):
+            """Lines appended to a text log since the previous pass (none on the first one)"""
+            if ('follow', path) not in last:
+                last[('follow', path)] = True
+                seek_end(path, log_state)
+                return [], False
+            return read_new_lines(path, log_state, tail=STREAM_LOG_TAIL)
+        
+        config = load_config()
+        enabled = [p for p in config.get('pairs', []) if p.get('enabled', True)]
+        overview_pair = enabled[0].get('id') if enabled else None  # Its counters are the overview 'copied' figure
+        for pair in config.get('pairs', []):
+            pair_id = pair.get('id')
+            children = pair.get('children', [])
+            
+            # Live account state: pushed with the event (tradeData shape), right away
+            # when a trade changed it, at most every STREAM_EQUITY_INTERVAL for price moves
+            master = fresh_state(read_master(data_dir, pair_id))
+            live_children = {cid: fresh_state(s) for cid, s in read_children(data_dir, pair_id).items()}
+            traded = changed(('pair', pair_id), (trade_signature(master),
+                                                 sorted((cid, trade_signature(s)) for cid, s in live_children.items())))
+            moved = (equity_signature(master), sorted((cid, equity_signature(s)) for cid, s in live_children.items()))
+            last.setdefault(('equity', pair_id), (moved, now))
+            sent, sent_at = last[('equity', pair_id)]
+            if traded or (moved != sent and now - sent_at >= STREAM_EQUITY_INTERVAL):
+                last[('equity', pair_id)] = (moved, now)
+                live = {cid: s for cid, s in live_children.items() if s}
+                events.append(('pair', {
+                    'pair_id': pair_id,
+                    'master': {k: master[k] for k in ('balance', 'equity', 'positions', 'orders')} if master else None,
+                    'children': {cid: s['positions'] for cid, s in live.items()},
+                    'child_data': {cid: {'balance': s['balance'], 'equity': s['equity']} for cid, s in live.items()}
+                }))
+            
+            stats = read_pair_stats(data_dir, pair_id)
+            if stats and changed(('stats', pair_id), (stats['total'], stats['success'], stats['failed'])):
+                events.append(('stats', {'pair_id': pair_id, 'total': stats['total'], 'overview': pair_id == overview_pair,
+                                         'success': stats['success'], 'failed': stats['failed']}))
+            
+            # New log lines, parsed as the mt5-data activities, from the watcher's own cursor
+            logs = {'master': (os.path.join(logs_dir, f'master_{pair_id}.log'), 24, ACTIVITY_TAGS)}
+            for child in children:
+                child_id = child.get('id')
+                logs[child_id] = (os.path.join(logs_dir, f'child_{pair_id}_{child_id}.log'), 20, ACTIVITY_TAGS[:-1])
+            sources, activities, reset = [], {}, []
+            for source, (path, width, tags) in logs.items():
+                lines, was_reset = follow_log(path)
+                if lines or was_reset:
+                    sources.append(source)
+                    activities[source] = parse_activity_lines(lines, width, tags)
+                    if was_reset:
+                        reset.append(source)
+            if sources:
+                events.append(('logs', {'pair_id': pair_id, 'sources': sources, 'activities': activities, 'reset': reset}))
+        
+        if changed(('log', 'system'), file_signature(os.path.join(logs_dir, 'trade_log.txt'))):
+            events.append(('logs', {'pair_id': '', 'sources': ['system']}))
+        
+        # Ticker prices: keep the shared snapshot alive and forward each new one
+        keep_market_watch()
+        body = market_watch['body']
+        if body is not None and changed('prices', body):
+            events.append(('prices', body))
+        return events
+    
+    def stream_watch_loop():
+        last = {}
+        while True:
+            with stream_lock:
+                if event_hub.count == 0:
+                    stream_state['thread'] = None
+                    return
+            start = time.time()
+            try:
+                for event, data in collect_stream_changes(last):
+                    if event == 'prices':
+                        event_hub.publish(event, encoded=data)
+                    else:
+                        event_hub.publish(event, data)
+            except Exception as e:
+                print(f"[WARN] Stream watcher error: {e}")
+            time.sleep(max(0, STREAM_INTERVAL - (time.time() - start)))
+    
+    @app.route('/api/stream')
+    @login_required
+    def stream_events():
+        """Server-Sent Events: status, telemetry (worker load), pair (live account state), stats, logs (new lines) and prices"""
+        sub = event_hub.subscribe()
+        with stream_lock:
+            if stream_state['thread'] is None:
+                stream_state['thread'] = threading.Thread(target=stream_watch_loop, name='stream-watch', daemon=True)
+                stream_state['thread'].start()
+        return Response(event_hub.stream(sub), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
     
     # API Routes - Activity Logs
     @app.route('/api/activity/<pair_id>')
@@ -798,164 +1433,240 @@ def create_app(process_manager):
         return jsonify({'success': True})
 
 
+    def open_cursor(scope):
+        """Decode the request cursor; returns (state, full) - full when there is no usable cursor"""
+        state = decode_cursor(request.args.get('cursor'))
+        if state is None or state.get('scope') != scope:
+            return {'scope': scope}, True
+        return state, False
+    
+    def close_cursor(result, state, full, activities_reset, sections):
+        """Drop unchanged sections from a delta response and attach the next cursor"""
+        unchanged = []
+        for name in sections:
+            if name in result and not section_changed(state, name, result[name]) and not full:
+                del result[name]
+                unchanged.append(name)
+        result['full'] = full
+        result['unchanged'] = unchanged
+        result['activities_reset'] = activities_reset
+        result['cursor'] = encode_cursor(state)
+        return result
+    
+    def read_activity_delta(state, full, text_log, json_file, time_width, tags=ACTIVITY_TAGS):
+        """Read an account's activity entries past the cursor
+
+        Returns (activities, complete) - complete is True when the list replaces
+        what the client holds rather than being prepended to it.
+        """
+        if os.path.exists(text_log):
+            lines, was_reset = read_new_lines(text_log, state, tail=5000)
+            return parse_activity_lines(lines, time_width, tags), full or was_reset
+        if json_file and os.path.exists(json_file):
+            # JSON activity is rewritten in place - resend it only when it changed
+            if not file_changed(json_file, state) and not full:
+                return [], False
+            with open(json_file, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+            return [{
+                'time': f"{act.get('date', '')} {act.get('time', '')}",
+                'message': act.get('message', ''),
+                'type': act.get('type', 'INFO')
+            } for act in entries], True
+        return [], full
+    
     @app.route('/api/all-logs', methods=['GET'])
     @login_required
     def api_get_all_logs():
-        """Get all activity logs from all pairs, masters and children with full identification"""
-        all_logs = []
+        """Get all activity logs from all pairs, masters and children with full identification
+
+        Pass ?cursor=<token> from the previous response to receive only records
+        appended since then. The response carries 'full': true when the whole
+        dataset was sent (first poll, or a log was rotated since the cursor).
+        ?limit= applies to full responses only: a delta always carries every new
+        record, since its cursor has moved past all of them.
+        With ?archives=true, ?date_from=/?date_to= (YYYY-MM-DD) limit the archived
+        records read - only archive blocks overlapping that range are decompressed.
+        """
         config = load_config()
         limit = request.args.get('limit', 0, type=int)  # 0 = unlimited
         include_archives = request.args.get('archives', 'false').lower() == 'true'
+        archive_range = [request.args.get('date_from') or None, request.args.get('date_to') or None] if include_archives else None
+        
+        scope = ['logs', include_archives, archive_range]
+        state, full = open_cursor(scope)
+        
+        if not full:
+            sources, reset = collect_log_delta(config, state)
+            if reset:
+                # A log was rotated since the cursor was issued - resend everything
+                full = True
+                state = {'scope': scope}
+        if full:
+            records = iter_all_logs(config, archive_range, state)
+        else:
+            # Each source is newest first; merged lazily, undated system lines last
+            records = itertools.chain(heapq.merge(*sources[:-1], key=lambda r: r.get('timestamp', ''), reverse=True),
+                                      sources[-1])
+        
+        # Apply limit if specified (0 = unlimited) - never to a delta, whose dropped records the cursor would skip
+        if limit > 0 and full:
+            records = itertools.islice(records, limit)
+        # The readers above already recorded their positions, so the cursor goes out with records merged on the fly
+        return stream_response(iter_json(records, 'logs', {'full': full, 'cursor': encode_cursor(state)}))
+    
+    def collect_log_delta(config, state):
+        """Log records appended to every pair/master/child source past the cursor state
+
+        Returns (sources, reset): one newest-first record list per source, the
+        trade_log.txt lines last. reset is True when a source could not be read
+        incrementally (rotated/truncated text log or rewritten JSON log).
+        """
+        sources = []
+        reset = False
+        logs_dir = os.path.join(DATA_DIR, 'logs')
         
         for pair in config.get('pairs', []):
             pair_id = pair.get('id')
             pair_name = pair.get('name', f'Pair {pair_id}')
             master_account = pair.get('master_account', 'Unknown')
             
-            # Load master activity
-            master_log = os.path.join(DATA_DIR, 'logs', f'master_activity_{pair_id}.json')
-            if os.path.exists(master_log):
-                try:
-                    with open(master_log, 'r') as f:
-                        master_activities = json.load(f)
-                    for log in master_activities:
-                        all_logs.append({
-                            'timestamp': f"{log.get('date', '')} {log.get('time', '')}".strip(),
-                            'type': log.get('type', 'info'),
-                            'action': log.get('action', log.get('type', 'info')),
-                            'message': log.get('message', ''),
-                            'account': str(master_account),
-                            'account_type': 'MASTER',
-                            'pair_id': pair_id,
-                            'pair_name': pair_name,
-                            'symbol': log.get('symbol', ''),
-                            'ticket': log.get('ticket', ''),
-                            'volume': log.get('volume', ''),
-                            'price': log.get('price', ''),
-                            'sl': log.get('sl', ''),
-                            'tp': log.get('tp', ''),
-                            'source': 'master'
-                        })
-                except:
-                    pass
-            
-            # Load master activity archives if requested
-            if include_archives:
-                archive_dir = os.path.join(DATA_DIR, 'logs', 'archive')
-                for i in range(1, 6):  # Check up to 5 archives
-                    archive_file = os.path.join(archive_dir, f'master_activity_{pair_id}.{i}.json')
-                    if os.path.exists(archive_file):
-                        try:
-                            with open(archive_file, 'r') as f:
-                                archived_activities = json.load(f)
-                            for log in archived_activities:
-                                all_logs.append({
-                                    'timestamp': f"{log.get('date', '')} {log.get('time', '')}".strip(),
-                                    'type': log.get('type', 'info'),
-                                    'action': log.get('action', log.get('type', 'info')),
-                                    'message': log.get('message', ''),
-                                    'account': str(master_account),
-                                    'account_type': 'MASTER',
-                                    'pair_id': pair_id,
-                                    'pair_name': pair_name,
-                                    'symbol': log.get('symbol', ''),
-                                    'ticket': log.get('ticket', ''),
-                                    'volume': log.get('volume', ''),
-                                    'price': log.get('price', ''),
-                                    'sl': log.get('sl', ''),
-                                    'tp': log.get('tp', ''),
-                                    'source': 'master_archive'
-                                })
-                        except:
-                            pass
+            # Master text log is append-only so it can be read incrementally
+            master_text_log = os.path.join(logs_dir, f'master_{pair_id}.log')
+            master_log = os.path.join(logs_dir, f'master_activity_{pair_id}.json')
+            if os.path.exists(master_text_log):
+                lines, was_reset = read_new_lines(master_text_log, state)
+                reset = reset or was_reset
+                sources.append(parse_log_lines(lines, str(master_account), 'MASTER', pair_id, pair_name, 'master'))
+            elif os.path.exists(master_log):
+                # Legacy JSON log is rewritten in place - any change means a full resend
+                reset = file_changed(master_log, state) or reset
             
-            # Load children activities from .log files (text format)
-            import re as regex
             for child in pair.get('children', []):
                 child_id = child.get('id')
                 child_account = child.get('account', 'Unknown')
-                
-                # Load all child log files including rotated ones
-                log_files = []
-                child_log = os.path.join(DATA_DIR, 'logs', f'child_{pair_id}_{child_id}.log')
-                if os.path.exists(child_log):
-                    log_files.append(child_log)
-                
-                # Include rotated logs if archives requested
-                if include_archives:
-                    for i in range(1, 6):  # Check up to 5 rotated files
-                        rotated = f"{child_log}.{i}"
-                        if os.path.exists(rotated):
-                            log_files.append(rotated)
-                
-                for log_file in log_files:
-                    try:
-                        with open(log_file, 'r') as f:
-                            lines = f.readlines()
-                        # No limit when reading - read all lines
-                        for line in reversed(lines):
-                            line = line.strip()
-                            if not line:
-                                continue
-                            # Parse format: [2025-12-26 17:18:25.265] [INFO] message
-                            match = regex.match(r'\[(\d{4}-\d{2}-\d{2}) (\d{2}:\d{2}:\d{2})\.\d+\] \[(\w+)\] (.+)', line)
-                            if match:
-                                date_str, time_str, log_type, message = match.groups()
-                                all_logs.append({
-                                    'timestamp': f"{date_str} {time_str}",
-                                    'type': log_type.lower(),
-                                    'action': log_type.lower(),
-                                    'message': message,
-                                    'account': str(child_account),
-                                    'account_type': 'CHILD',
-                                    'pair_id': pair_id,
-                                    'pair_name': pair_name,
-                                    'symbol': '',
-                                    'ticket': '',
-                                    'volume': '',
-                                    'price': '',
-                                    'sl': '',
-                                    'tp': '',
-                                    'source': 'child',
-                                    'child_id': child_id
-                                })
-                    except Exception as e:
-                        print(f"Error reading child log: {e}")
+                child_log = os.path.join(logs_dir, f'child_{pair_id}_{child_id}.log')
+                try:
+                    lines, was_reset = read_new_lines(child_log, state)
+                    reset = reset or was_reset
+                    sources.append(parse_log_lines(lines, str(child_account), 'CHILD', pair_id, pair_name, 'child', child_id))
+                except Exception as e:
+                    print(f"Error reading child log: {e}")
         
         # Also load trade_log.txt for general system logs
-        trade_log = os.path.join(DATA_DIR, 'logs', 'trade_log.txt')
-        if os.path.exists(trade_log):
+        system = []
+        try:
+            lines, was_reset = read_new_lines(os.path.join(logs_dir, 'trade_log.txt'), state)
+            reset = reset or was_reset
+            system = [make_system_log_entry(line.strip()) for line in reversed(lines) if line.strip()]
+        except:
+            pass
+        sources.append(system)
+        
+        return sources, reset
+    
+    def iter_all_logs(config, archive_range=None, state=None):
+        """Every log record newest first, merged lazily across sources
+
+        Text logs are read backwards and archives block by block, so memory stays
+        bounded however long the logs are. With a cursor state, the current end of
+        each live log is recorded in it first and reading stops there, so the next
+        delta (collect_log_delta) starts exactly after what this returns.
+        """
+        logs_dir = os.path.join(DATA_DIR, 'logs')
+        archive_dir = os.path.join(logs_dir, 'archive')
+        sources = []
+        
+        def live_lines(path):
+            if state is None:
+                return read_lines_reversed(path)
+            end = seek_end(path, state)
+            return read_lines_reversed(path, end=end) if end is not None else iter(())
+        
+        def legacy_json(path, *args):
+            # Pre-text-log JSON activity files are small and capped - sort them whole
             try:
-                with open(trade_log, 'r') as f:
-                    lines = f.readlines()  # Read all lines
-                for line in lines:
-                    line = line.strip()
-                    if line:
-                        log_type = 'info'
-                        if 'ERROR' in line.upper(): log_type = 'error'
-                        elif 'WARNING' in line.upper(): log_type = 'warning'
-                        elif 'SUCCESS' in line.upper() or 'COPIED' in line.upper(): log_type = 'trade'
-                        all_logs.append({
-                            'timestamp': '',
-                            'type': log_type,
-                            'action': log_type,
-                            'message': line,
-                            'account': 'System',
-                            'account_type': 'SYSTEM',
-                            'pair_id': '',
-                            'pair_name': 'System',
-                            'source': 'system'
-                        })
+                with open(path, 'r') as f:
+                    records = [make_log_entry(log, *args) for log in json.load(f)]
             except:
-                pass
+                return []
+            return sorted(records, key=lambda r: r['timestamp'], reverse=True)
         
-        # Sort by timestamp descending
-        all_logs.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
-        
-        # Apply limit if specified (0 = unlimited)
-        if limit > 0:
-            return jsonify({'logs': all_logs[:limit], 'total': len(all_logs)})
-        return jsonify({'logs': all_logs, 'total': len(all_logs)})
+        for pair in config.get('pairs', []):
+            pair_id = pair.get('id')
+            pair_name = pair.get('name', f'Pair {pair_id}')
+            master = (str(pair.get('master_account', 'Unknown')), 'MASTER', pair_id, pair_name)
+            
+            master_text_log = os.path.join(logs_dir, f'master_{pair_id}.log')
+            master_log = os.path.join(logs_dir, f'master_activity_{pair_id}.json')
+            if os.path.exists(master_text_log):
+                sources.append(iter_log_lines(live_lines(master_text_log), *master, 'master'))
+            elif os.path.exists(master_log):
+                if state is not None:
+                    file_changed(master_log, state)
+                sources.append(legacy_json(master_log, *master, 'master'))
+            
+            if archive_range is not None:
+                sources.append(iter_log_lines(read_archive(f'master_{pair_id}.log', *archive_range), *master, 'master_archive'))
+                sources.append(make_log_entry(log, *master, 'master_archive')
+                               for log in read_archive(f'master_activity_{pair_id}.json', *archive_range))
+                for i in range(1, 6):
+                    archive_file = os.path.join(archive_dir, f'master_activity_{pair_id}.{i}.json')
+                    if os.path.exists(archive_file):
+                        sources.append(legacy_json(archive_file, *master, 'master_archive'))
+            
+            for child in pair.get('children', []):
+                child_id = child.get('id')
+                child_args = (str(child.get('account', 'Unknown')), 'CHILD', pair_id, pair_name, 'child', child_id)
+                child_log = os.path.join(logs_dir, f'child_{pair_id}_{child_id}.log')
+                sources.append(iter_log_lines(live_lines(child_log), *child_args))
+                if archive_range is not None:
+                    sources.append(iter_log_lines(read_archive(os.path.basename(child_log), *archive_range), *child_args))
+                    for i in range(1, 6):
+                        sources.append(iter_log_lines(read_lines_reversed(f"{child_log}.{i}"), *child_args))
+        
+        # trade_log.txt lines carry no timestamp - they follow the dated records
+        system = (make_system_log_entry(line.strip()) for line in live_lines(os.path.join(logs_dir, 'trade_log.txt'))
+                  if line.strip())
+        return itertools.chain(heapq.merge(*sources, key=lambda r: r.get('timestamp', ''), reverse=True), system)
+    
+    @app.route('/api/all-logs/export', methods=['GET'])
+    @login_required
+    def api_export_all_logs():
+        """Stream every log record newest first as JSON or a CSV download (?format=csv)
+
+        ?archives=true includes archived logs; ?date_from=/?date_to= (YYYY-MM-DD)
+        limit the records exported (archive blocks outside the range are not read).
+        ?type=, ?pair=, ?account=, ?symbol= and ?search= apply the history page filters.
+        """
+        config = load_config()
+        fmt = request.args.get('format', 'json').lower()
+        include_archives = request.args.get('archives', 'false').lower() == 'true'
+        date_from = request.args.get('date_from') or None
+        date_to = request.args.get('date_to') or None
+        
+        records = iter_all_logs(config, [date_from, date_to] if include_archives else None)
+        if date_from or date_to:
+            records = (r for r in records
+                       if not r['timestamp'] or ((not date_from or r['timestamp'][:10] >= date_from)
+                                                 and (not date_to or r['timestamp'][:10] <= date_to)))
+        log_type = request.args.get('type', '').lower()
+        pair_name = request.args.get('pair', '')
+        account = request.args.get('account', '')
+        symbol = request.args.get('symbol', '').lower()
+        search = request.args.get('search', '').lower()
+        if log_type or pair_name or account or symbol or search:
+            records = (r for r in records
+                       if (not log_type or normalize_log_type(r) == log_type)
+                       and (not pair_name or r.get('pair_name') == pair_name)
+                       and (not account or r.get('account') == account)
+                       and (not symbol or symbol in (r.get('symbol') or '').lower())
+                       and (not search or search in (r.get('message') or '').lower()))
+        
+        if fmt == 'csv':
+            return stream_response(iter_csv(records, LOG_EXPORT_COLUMNS),
+                                   f"logs_{datetime.now().strftime('%Y-%m-%d')}.csv", 'text/csv')
+        return stream_response(iter_json(records, 'logs'))
 
 
     
@@ -1023,33 +1734,16 @@ def create_app(process_manager):
     @app.route('/api/pairs/<pair_id>/trades')
     @login_required
     def get_pair_trades(pair_id):
-        """Get live trades from shared memory (binary struct format)"""
-        import mmap
-        import struct
-        import os
-        from datetime import datetime
-        
+        """Get live trades from shared memory (binary struct format)
+
+        Accepts ?cursor=<token> like /api/all-logs: activities then hold only new
+        entries (accounts listed in 'activities_reset' are complete lists) and
+        sections listed in 'unchanged' are omitted.
+        """
         # Get date filter parameters
         date_from = request.args.get('date_from', None)
         date_to = request.args.get('date_to', None)
         
-        # Helper function to check if trade is within date range
-        def is_in_date_range(trade_time_str):
-            if not date_from and not date_to:
-                return True
-            try:
-                if ' ' in str(trade_time_str):
-                    trade_date = str(trade_time_str).split(' ')[0]
-                else:
-                    trade_date = str(trade_time_str)[:10]
-                if date_from and trade_date < date_from:
-                    return False
-                if date_to and trade_date > date_to:
-                    return False
-                return True
-            except:
-                return True
-        
         result = {'master': [], 'children': {}, 'balance': 0, 'equity': 0, 'child_data': {}, 'activities': {'master': []}, 'closed_master': [], 'closed_children': {}}
         
         config = load_config()
@@ -1058,102 +1752,48 @@ def create_app(process_manager):
         if not pair:
             return jsonify(result)
         
-        data_dir = os.path.join(os.getenv('LOCALAPPDATA'), 'JD_MT5_TradeCopier', 'data')
+        state, full = open_cursor([date_from, date_to])
+        activities_reset = []
+        
+        data_dir = os.path.join(DATA_DIR, 'data')
+        result['freshness'] = {}
         
         # Read master positions from shared memory
         try:
-            shared_file = os.path.join(data_dir, f'shared_positions_{pair_id}.bin')
-            
-            if os.path.exists(shared_file) and os.path.getsize(shared_file) >= 28:
-                with open(shared_file, 'r+b') as f:
-                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
-                        mm.seek(0)
-                        timestamp = struct.unpack('<Q', mm.read(8))[0]
-                        balance = struct.unpack('<d', mm.read(8))[0]
-                        equity = struct.unpack('<d', mm.read(8))[0]
-                        count = struct.unpack('<I', mm.read(4))[0]
-                        
-                        result['balance'] = round(balance, 2)
-                        result['equity'] = round(equity, 2)
-                        
-                        for i in range(min(count, 50)):
-                            try:
-                                ticket = struct.unpack('<Q', mm.read(8))[0]
-                                pos_type = struct.unpack('<B', mm.read(1))[0]
-                                volume = struct.unpack('<d', mm.read(8))[0]
-                                sl = struct.unpack('<d', mm.read(8))[0]
-                                tp = struct.unpack('<d', mm.read(8))[0]
-                                symbol = mm.read(15).decode('utf-8', errors='ignore').rstrip('\x00')
-                                price_open = struct.unpack('<d', mm.read(8))[0]
-                                profit = struct.unpack('<d', mm.read(8))[0]
-                                
-                                result['master'].append({
-                                    'ticket': ticket, 'symbol': symbol, 'type': pos_type,
-                                    'volume': volume, 'sl': sl, 'tp': tp,
-                                    'price_open': price_open, 'profit': round(profit, 2)
-                                })
-                            except:
-                                break
+            master_state = read_master(data_dir, pair_id)
+            if master_state:
+                result['balance'] = master_state['balance']
+                result['equity'] = master_state['equity']
+                result['master'] = master_state['positions']
+                result['freshness']['master'] = make_freshness(master_state)
         except Exception as e:
             print(f"[WARN] Error reading master shared memory: {e}")
         
-        # Read closed master trades with date filtering
+        # Read closed master trades (date range is an indexed query on close_time)
         try:
-            closed_file = os.path.join(data_dir, f'closed_trades_{pair_id}.json')
-            if os.path.exists(closed_file):
-                with open(closed_file, 'r') as f:
-                    all_closed = json.load(f)
-                    complete_trades = []
-                    for t in all_closed:
-                        if t.get('close_price') and t.get('close_time'):
-                            if is_in_date_range(t.get('close_time', '')):
-                                t['close_price'] = round(t.get('close_price', 0), 5)
-                                t['price_open'] = round(t.get('price_open', 0), 5)
-                                t['profit'] = round(t.get('profit', 0), 2)
-                                complete_trades.append(t)
-                    result['closed_master'] = complete_trades
-        except:
-            pass
+            rows = db.get_closed_trades(pair_id, account_type='MASTER', date_from=date_from, date_to=date_to)
+            result['closed_master'] = [make_trade_entry(row) for row in rows if row['price_close'] and row['close_time']]
+        except Exception as e:
+            print(f"[WARN] Error reading closed master trades: {e}")
         
         # Read master activities - try text log first (more history), then JSON
         try:
             logs_dir = os.path.join(os.getenv('LOCALAPPDATA'), 'JD_MT5_TradeCopier', 'logs')
             master_text_log = os.path.join(logs_dir, f'master_{pair_id}.log')
             master_json_file = os.path.join(logs_dir, f'master_activity_{pair_id}.json')
-            
-            # Prefer text log (has full history like child logs)
-            if os.path.exists(master_text_log):
-                with open(master_text_log, 'r', encoding='utf-8', errors='ignore') as f:
-                    lines = f.readlines()[-5000:]  # Last 5000 lines
-                    for line in reversed(lines):
-                        if any(tag in line for tag in ['[SIGNAL]', '[OPEN]', '[CLOSE]', '[ERROR]', '[WARN]', '[INFO]', '[DEBUG]']):
-                            log_type = 'INFO'
-                            if '[CLOSE]' in line: log_type = 'CLOSE'
-                            elif '[SIGNAL]' in line: log_type = 'SIGNAL'
-                            elif '[OPEN]' in line: log_type = 'TRADE'
-                            elif '[ERROR]' in line: log_type = 'ERROR'
-                            elif '[WARN]' in line: log_type = 'WARN'
-                            elif '[DEBUG]' in line: log_type = 'DEBUG'
-                            
-                            result['activities']['master'].append({
-                                'time': line[1:24] if len(line) > 24 else '',
-                                'message': line.strip(),
-                                'type': log_type
-                            })
-            # Fall back to JSON if text log doesn't exist
-            elif os.path.exists(master_json_file):
-                with open(master_json_file, 'r', encoding='utf-8') as f:
-                    activities = json.load(f)
-                    for act in activities:
-                        result['activities']['master'].append({
-                            'time': f"{act.get('date', '')} {act.get('time', '')}",
-                            'message': act.get('message', ''),
-                            'type': act.get('type', 'INFO')
-                        })
+            activities, complete = read_activity_delta(state, full, master_text_log, master_json_file, 24)
+            result['activities']['master'] = activities
+            if complete:
+                activities_reset.append('master')
         except Exception as e:
             print(f"[WARN] Error reading master activity: {e}")
         
-        # Read child data
+        # Read child data - all children of the pair in one pass over its child state segment
+        try:
+            child_states = read_children(data_dir, pair_id)
+        except Exception as e:
+            child_states = {}
+            print(f"[WARN] Error reading child states: {e}")
         for child in pair.get('children', []):
             child_id = child.get('id')
             result['children'][child_id] = []
@@ -1161,109 +1801,70 @@ def create_app(process_manager):
             result['closed_children'][child_id] = []
             result['child_data'][child_id] = {'balance': 0, 'equity': 0}
             
-            # Read child data from binary struct format
-            try:
-                child_file = os.path.join(data_dir, f'child_data_{pair_id}_{child_id}.bin')
-                
-                if os.path.exists(child_file) and os.path.getsize(child_file) >= 28:
-                    with open(child_file, 'rb') as f:
-                        data = f.read()
-                        timestamp = struct.unpack('<Q', data[0:8])[0]
-                        balance = struct.unpack('<d', data[8:16])[0]
-                        equity = struct.unpack('<d', data[16:24])[0]
-                        count = struct.unpack('<I', data[24:28])[0]
-                        
-                        result['child_data'][child_id] = {'balance': round(balance, 2), 'equity': round(equity, 2)}
-                        
-                        offset = 28
-                        positions = []
-                        for i in range(min(count, 50)):
-                            if offset + 64 > len(data):
-                                break
-                            ticket = struct.unpack('<Q', data[offset:offset+8])[0]
-                            pos_type = struct.unpack('<B', data[offset+8:offset+9])[0]
-                            volume = struct.unpack('<d', data[offset+9:offset+17])[0]
-                            sl = struct.unpack('<d', data[offset+17:offset+25])[0]
-                            tp = struct.unpack('<d', data[offset+25:offset+33])[0]
-                            symbol = data[offset+33:offset+48].decode('utf-8', errors='ignore').rstrip(chr(0))
-                            price_open = struct.unpack('<d', data[offset+48:offset+56])[0]
-                            profit = struct.unpack('<d', data[offset+56:offset+64])[0]
-                            
-                            positions.append({
-                                'ticket': ticket, 'symbol': symbol, 'type': pos_type,
-                                'volume': volume, 'sl': sl, 'tp': tp,
-                                'price_open': price_open, 'profit': round(profit, 2)
-                            })
-                            offset += 64
-                        result['children'][child_id] = positions
-            except Exception as e:
-                print(f"[WARN] Error reading child {child_id}: {e}")
+            child_state = child_states.get(child_id)
+            if child_state:
+                result['child_data'][child_id] = {'balance': child_state['balance'], 'equity': child_state['equity']}
+                result['children'][child_id] = child_state['positions']
+                result['freshness'][child_id] = make_freshness(child_state)
             
-            # Read child activities - try JSON first, then fall back to log file
+            # Read child activities - text log is append-only so it can be read incrementally
             try:
                 logs_dir = os.path.join(os.getenv('LOCALAPPDATA'), 'JD_MT5_TradeCopier', 'logs')
                 json_file = os.path.join(logs_dir, f'child_activity_{pair_id}_{child_id}.json')
                 log_file = os.path.join(logs_dir, f'child_{pair_id}_{child_id}.log')
-                
-                # Try JSON first (faster and structured)
-                if os.path.exists(json_file):
-                    with open(json_file, 'r', encoding='utf-8') as f:
-                        activities = json.load(f)
-                        for act in activities:
-                            result['activities'][child_id].append({
-                                'time': f"{act.get('date', '')} {act.get('time', '')}",
-                                'message': act.get('message', ''),
-                                'type': act.get('type', 'INFO')
-                            })
-                # Fall back to text log file
-                elif os.path.exists(log_file):
-                    with open(log_file, 'r', encoding='utf-8', errors='ignore') as f:
-                        lines = f.readlines()[-5000:]
-                        for line in reversed(lines):
-                            if any(tag in line for tag in ['[SIGNAL]', '[OPEN]', '[CLOSE]', '[ERROR]', '[WARN]', '[INFO]', '[DEBUG]']):
-                                log_type = 'INFO'
-                                if '[CLOSE]' in line: log_type = 'CLOSE'
-                                elif '[SIGNAL]' in line: log_type = 'SIGNAL'
-                                elif '[OPEN]' in line: log_type = 'TRADE'
-                                elif '[ERROR]' in line: log_type = 'ERROR'
-                                elif '[WARN]' in line: log_type = 'WARN'
-                                elif '[DEBUG]' in line: log_type = 'DEBUG'
-                                
-                                result['activities'][child_id].append({
-                                    'time': line[1:20] if len(line) > 20 else '',
-                                    'message': line.strip(),
-                                    'type': log_type
-                                })
+                activities, complete = read_activity_delta(state, full, log_file, json_file, 20)
+                result['activities'][child_id] = activities
+                if complete:
+                    activities_reset.append(child_id)
             except Exception as e:
                 print(f"[WARN] Error reading child {child_id} activities: {e}")
             
-            # Read child closed trades with date filtering
+            # Read child closed trades (date range is an indexed query on close_time)
             try:
-                child_closed_file = os.path.join(data_dir, f'closed_trades_{pair_id}_{child_id}.json')
-                if os.path.exists(child_closed_file):
-                    with open(child_closed_file, 'r') as f:
-                        child_closed = json.load(f)
-                        filtered_closed = []
-                        for t in child_closed:
-                            if is_in_date_range(t.get('close_time', '')):
-                                t['close_price'] = round(t.get('close_price', 0), 5)
-                                t['price_open'] = round(t.get('price_open', 0), 5)
-                                t['profit'] = round(t.get('profit', 0), 2)
-                                filtered_closed.append(t)
-                        result['closed_children'][child_id] = filtered_closed
-            except:
-                pass
+                rows = db.get_closed_trades(pair_id, account_type='CHILD', child_id=child_id,
+                                            date_from=date_from, date_to=date_to)
+                result['closed_children'][child_id] = [make_trade_entry(row) for row in rows]
+            except Exception as e:
+                print(f"[WARN] Error reading child {child_id} closed trades: {e}")
         
-        return jsonify(result)
+        return jsonify(close_cursor(result, state, full, activities_reset,
+                                    ['master', 'children', 'child_data', 'balance', 'equity', 'closed_master', 'closed_children']))
 
+    @app.route('/api/pairs/<pair_id>/trades/export')
+    @login_required
+    def export_pair_trades(pair_id):
+        """Stream a pair's closed trades newest first as JSON or a CSV download (?format=csv)
+
+        Optional ?account_type=MASTER|CHILD, ?child_id=, ?date_from=/?date_to= (YYYY-MM-DD).
+        Rows are read from the trade database in batches, never as one list.
+        """
+        config = load_config()
+        if not any(p.get('id') == pair_id for p in config.get('pairs', [])):
+            return jsonify({'success': False, 'error': 'Pair not found'})
+        
+        fmt = request.args.get('format', 'json').lower()
+        rows = db.iter_closed_trades(pair_id,
+                                     account_type=request.args.get('account_type') or None,
+                                     child_id=request.args.get('child_id') or None,
+                                     date_from=request.args.get('date_from') or None,
+                                     date_to=request.args.get('date_to') or None)
+        trades = (dict(make_trade_entry(row), account_type=row['account_type'], child_id=row['child_id'] or '')
+                  for row in rows)
+        
+        if fmt == 'csv':
+            return stream_response(iter_csv(trades, TRADE_EXPORT_COLUMNS),
+                                   f"trades_{pair_id}_{datetime.now().strftime('%Y-%m-%d')}.csv", 'text/csv')
+        return stream_response(iter_json(trades, 'trades'))
+    
     @app.route('/api/accounts/<account_type>/<account_id>/positions')
     @login_required
     def get_account_positions(account_type, account_id):
-        """Get live positions directly from MT5 terminal"""
-        from mt5_data_fetcher import get_mt5_positions
+        """Get live positions - from the account's shared segment while its process runs, else from the MT5 terminal"""
         
         config = load_config()
         account_info = None
+        state = None
+        data_dir = os.path.join(DATA_DIR, 'data')
         
         # Find account in config
         if account_type == 'master':
@@ -1275,6 +1876,7 @@ def create_app(process_manager):
                         'password': pair.get('master_password'),
                         'terminal': pair.get('master_terminal')
                     }
+                    state = fresh_state(read_master(data_dir, account_id))
                     break
         elif account_type == 'child':
             pair_id, child_id = account_id.split('_')
@@ -1288,13 +1890,18 @@ def create_app(process_manager):
                                 'password': child.get('password'),
                                 'terminal': child.get('terminal')
                             }
+                            state = fresh_state(read_child(data_dir, pair_id, child_id))
                             break
                     break
         
         if not account_info:
             return jsonify({'success': False, 'error': 'Account not found'})
         
-        result = get_mt5_positions(
+        if state:
+            return jsonify(make_segment_positions(state, account_info['login']))
+        
+        result = get_pool().call(
+            'get_mt5_positions',
             login=account_info['login'],
             server=account_info['server'],
             password=account_info.get('password'),
@@ -1307,8 +1914,6 @@ def create_app(process_manager):
     @login_required
     def get_account_history(account_type, account_id):
         """Get trade history directly from MT5 terminal"""
-        from mt5_data_fetcher import get_mt5_history, get_mt5_closed_orders
-        
         days = int(request.args.get('days', 5))
         
         config = load_config()
@@ -1343,8 +1948,10 @@ def create_app(process_manager):
         if not account_info:
             return jsonify({'success': False, 'error': 'Account not found'})
         
-        # Get both deals and orders
-        deals_result = get_mt5_history(
+        # Get both deals and orders (same terminal worker, one after the other)
+        pool = get_pool()
+        deals_result = pool.call(
+            'get_mt5_history',
             login=account_info['login'],
             server=account_info['server'],
             password=account_info.get('password'),
@@ -1352,7 +1959,8 @@ def create_app(process_manager):
             days=days
         )
         
-        orders_result = get_mt5_closed_orders(
+        orders_result = pool.call(
+            'get_mt5_closed_orders',
             login=account_info['login'],
             server=account_info['server'],
             password=account_info.get('password'),
@@ -1371,9 +1979,7 @@ def create_app(process_manager):
     @app.route('/api/pairs/<pair_id>/live-data')
     @login_required
     def get_pair_live_data(pair_id):
-        """Get live data for all accounts in a pair"""
-        from mt5_data_fetcher import get_mt5_positions
-        
+        """Get live data for all accounts in a pair (terminals are queried in parallel)"""
         config = load_config()
         pair = next((p for p in config.get('pairs', []) if p.get('id') == pair_id), None)
         
@@ -1386,25 +1992,33 @@ def create_app(process_manager):
             'children': {}
         }
         
-        # Get master data
-        master_data = get_mt5_positions(
-            login=pair.get('master_login'),
-            server=pair.get('master_server'),
-            password=pair.get('master_password'),
-            terminal_path=pair.get('master_terminal')
-        )
-        result['master'] = master_data
-        
-        # Get child data
+        # Running accounts are read from their segments; only the others need a terminal fetch
+        data_dir = os.path.join(DATA_DIR, 'data')
+        accounts = [('master', pair.get('master_login'), fresh_state(read_master(data_dir, pair_id)), {
+            'login': pair.get('master_login'),
+            'server': pair.get('master_server'),
+            'password': pair.get('master_password'),
+            'terminal_path': pair.get('master_terminal')
+        })]
+        child_states = read_children(data_dir, pair_id)
         for child in pair.get('children', []):
-            child_id = child.get('id')
-            child_data = get_mt5_positions(
-                login=child.get('login'),
-                server=child.get('server'),
-                password=child.get('password'),
-                terminal_path=child.get('terminal')
-            )
-            result['children'][child_id] = child_data
+            accounts.append((child.get('id'), child.get('login'),
+                             fresh_state(child_states.get(child.get('id'))), {
+                'login': child.get('login'),
+                'server': child.get('server'),
+                'password': child.get('password'),
+                'terminal_path': child.get('terminal')
+            }))
+        fetch = [account for account in accounts if not account[2]]
+        responses = dict(zip([account[0] for account in fetch],
+                             get_pool().fan_out([('get_mt5_positions', account[3]) for account in fetch])))
+        
+        for account_id, login, state, _ in accounts:
+            data = make_segment_positions(state, login) if state else responses[account_id]
+            if account_id == 'master':
+                result['master'] = data
+            else:
+                result['children'][account_id] = data
         
         return jsonify(result)
     
@@ -1482,9 +2096,12 @@ def create_app(process_manager):
     @app.route('/api/pairs/<pair_id>/mt5-data')
     @login_required
     def get_pair_mt5_data(pair_id):
-        """Get data directly from MT5 terminals for all accounts in a pair"""
-        from mt5_data_fetcher import get_account_live_data
-        
+        """Get data directly from MT5 terminals for all accounts in a pair
+
+        Accepts ?cursor=<token>: activities then hold only new log entries and
+        sections listed in 'unchanged' are omitted (see get_pair_trades).
+        Master and child terminals are queried in parallel through the fetcher pool.
+        """
         # Check if pair is activated before fetching MT5 data
         pm = app.config['PROCESS_MANAGER']
         if not pm.activated_pairs.get(pair_id, False):
@@ -1533,22 +2150,54 @@ def create_app(process_manager):
             'closed_children': {}
         }
         
-        # Get master data directly from MT5
+        state, full = open_cursor([date_from, date_to, days])
+        activities_reset = []
+        
+        # Balance, equity and positions of running accounts come from their shared
+        # segments; terminals are asked only for closed trades (or everything when
+        # an account's segment is stale). All fetches go out in one parallel round trip.
+        data_dir = os.path.join(DATA_DIR, 'data')
+        children = pair.get('children', [])
+        master_state = fresh_state(read_master(data_dir, pair_id))
+        live_children = read_children(data_dir, pair_id)
+        child_states = {c.get('id'): fresh_state(live_children.get(c.get('id'))) for c in children}
+        requests = [('get_account_closed_trades' if master_state else 'get_account_live_data', {
+            'login': pair.get('master_account'),
+            'server': pair.get('master_server', ''),
+            'password': pair.get('master_password', ''),
+            'terminal_path': pair.get('master_terminal', ''),
+            'date_from': date_from,
+            'date_to': date_to,
+            'days': days
+        })]
+        for child in children:
+            requests.append(('get_account_closed_trades' if child_states[child.get('id')] else 'get_account_live_data', {
+                'login': child.get('account'),
+                'server': child.get('server', ''),
+                'password': child.get('password', ''),
+                'terminal_path': child.get('terminal', ''),
+                'date_from': date_from,
+                'date_to': date_to,
+                'days': days
+            }))
+        responses = get_pool().fan_out(requests)
+        child_results = dict(zip([c.get('id') for c in children], responses[1:]))
+        result['freshness'] = {'master': make_freshness(master_state)}
+        
+        # Master data
         try:
-            master_result = get_account_live_data(
-                login=pair.get('master_account'),
-                server=pair.get('master_server', ''),
-                password=pair.get('master_password', ''),
-                terminal_path=pair.get('master_terminal', ''),
-                date_from=date_from,
-                date_to=date_to,
-                days=days
-            )
+            master_result = responses[0]
             
-            if master_result.get('success'):
+            if master_state:
+                result['master']['balance'] = master_state['balance']
+                result['master']['equity'] = master_state['equity']
+                result['master']['positions'] = master_state['positions']
+            elif master_result.get('success'):
                 result['master']['balance'] = master_result.get('balance', 0)
                 result['master']['equity'] = master_result.get('equity', 0)
                 result['master']['positions'] = master_result.get('positions', [])
+            
+            if master_result.get('success'):
                 result['closed_master'] = master_result.get('closed_trades', [])
             else:
                 result['master']['error'] = master_result.get('error', 'Unknown error')
@@ -1564,41 +2213,15 @@ def create_app(process_manager):
             logs_dir = os.path.join(os.getenv('LOCALAPPDATA'), 'JD_MT5_TradeCopier', 'logs')
             master_text_log = os.path.join(logs_dir, f'master_{pair_id}.log')
             master_json_file = os.path.join(logs_dir, f'master_activity_{pair_id}.json')
-            
-            # Prefer text log (has full history like child logs)
-            if os.path.exists(master_text_log):
-                with open(master_text_log, 'r', encoding='utf-8', errors='ignore') as f:
-                    lines = f.readlines()[-5000:]  # Last 5000 lines
-                    for line in reversed(lines):
-                        if any(tag in line for tag in ['[SIGNAL]', '[OPEN]', '[CLOSE]', '[ERROR]', '[WARN]', '[INFO]', '[DEBUG]']):
-                            log_type = 'INFO'
-                            if '[CLOSE]' in line: log_type = 'CLOSE'
-                            elif '[SIGNAL]' in line: log_type = 'SIGNAL'
-                            elif '[OPEN]' in line: log_type = 'TRADE'
-                            elif '[ERROR]' in line: log_type = 'ERROR'
-                            elif '[WARN]' in line: log_type = 'WARN'
-                            elif '[DEBUG]' in line: log_type = 'DEBUG'
-                            
-                            result['activities']['master'].append({
-                                'time': line[1:24] if len(line) > 24 else '',
-                                'message': line.strip(),
-                                'type': log_type
-                            })
-            # Fall back to JSON if text log doesn't exist
-            elif os.path.exists(master_json_file):
-                with open(master_json_file, 'r', encoding='utf-8') as f:
-                    activities = json.load(f)
-                    for act in activities:
-                        result['activities']['master'].append({
-                            'time': f"{act.get('date', '')} {act.get('time', '')}",
-                            'message': act.get('message', ''),
-                            'type': act.get('type', 'INFO')
-                        })
+            activities, complete = read_activity_delta(state, full, master_text_log, master_json_file, 24)
+            result['activities']['master'] = activities
+            if complete:
+                activities_reset.append('master')
         except:
             pass
         
         # Get child data
-        for child in pair.get('children', []):
+        for child in children:
             child_id = child.get('id')
             result['children'][child_id] = []
             result['activities'][child_id] = []
@@ -1606,22 +2229,24 @@ def create_app(process_manager):
             result['child_data'][child_id] = {'balance': 0, 'equity': 0}
             
             try:
-                child_result = get_account_live_data(
-                    login=child.get('account'),
-                    server=child.get('server', ''),
-                    password=child.get('password', ''),
-                    terminal_path=child.get('terminal', ''),
-                    date_from=date_from,
-                    date_to=date_to,
-                    days=days
-                )
+                child_result = child_results[child_id]
+                child_state = child_states[child_id]
+                result['freshness'][child_id] = make_freshness(child_state)
                 
-                if child_result.get('success'):
+                if child_state:
+                    result['child_data'][child_id] = {
+                        'balance': child_state['balance'],
+                        'equity': child_state['equity']
+                    }
+                    result['children'][child_id] = child_state['positions']
+                elif child_result.get('success'):
                     result['child_data'][child_id] = {
                         'balance': child_result.get('balance', 0),
                         'equity': child_result.get('equity', 0)
                     }
                     result['children'][child_id] = child_result.get('positions', [])
+                
+                if child_result.get('success'):
                     result['closed_children'][child_id] = child_result.get('closed_trades', [])
             except Exception as e:
                 result['child_data'][child_id]['error'] = str(e)
@@ -1630,37 +2255,22 @@ def create_app(process_manager):
             try:
                 logs_dir = os.path.join(os.getenv('LOCALAPPDATA'), 'JD_MT5_TradeCopier', 'logs')
                 log_file = os.path.join(logs_dir, f'child_{pair_id}_{child_id}.log')
-                
-                if os.path.exists(log_file):
-                    with open(log_file, 'r', encoding='utf-8', errors='ignore') as f:
-                        lines = f.readlines()[-5000:]
-                        for line in reversed(lines):
-                            if any(tag in line for tag in ['[SIGNAL]', '[OPEN]', '[CLOSE]', '[ERROR]', '[WARN]', '[INFO]']):
-                                log_type = 'INFO'
-                                if '[CLOSE]' in line: log_type = 'CLOSE'
-                                elif '[SIGNAL]' in line: log_type = 'SIGNAL'
-                                elif '[OPEN]' in line: log_type = 'TRADE'
-                                elif '[ERROR]' in line: log_type = 'ERROR'
-                                elif '[WARN]' in line: log_type = 'WARN'
-                                
-                                result['activities'][child_id].append({
-                                    'time': line[1:20] if len(line) > 20 else '',
-                                    'message': line.strip(),
-                                    'type': log_type
-                                })
-                            if False:  # No limit
-                                break
+                activities, complete = read_activity_delta(state, full, log_file, None, 20, ACTIVITY_TAGS[:-1])
+                result['activities'][child_id] = activities
+                if complete:
+                    activities_reset.append(child_id)
             except:
                 pass
         
-        return jsonify(result)
+        return jsonify(close_cursor(result, state, full, activities_reset,
+                                    ['master', 'children', 'child_data', 'closed_master', 'closed_children']))
 
 
     return app
 
 def main():
     """Standalone dashboard for testing"""
-    from launcher_new import ProcessManager
+    from process_manager import ProcessManager
     
     # License check is done in launcher, but check here for standalone testing
     from license import verify_license_startup
@@ -0,0 +1,68 @@
+"""
+Event Hub - Server-Sent Events fan-out for the dashboard
+One producer (the dashboard's change watcher) publishes an event once; it is
+serialized once and queued to every connected /api/stream client.
+
+Clients that stop reading (full queue) are dropped; EventSource reconnects
+them automatically and they reload their state.
+"""
+
+import json
+import queue
+import threading
+
+KEEPALIVE_INTERVAL = 15  # Seconds between keepalive comments on an idle stream
+CLIENT_QUEUE_SIZE = 256  # Events buffered per client before it is dropped
+RECONNECT_MS = 3000  # EventSource retry delay sent to clients
+
+
+class Subscriber:
+    def __init__(self):
+        self.queue = queue.Queue(maxsize=CLIENT_QUEUE_SIZE)
+        self.closed = False
+
+
+class EventHub:
+    def __init__(self):
+        self.subscribers = set()
+        self.lock = threading.Lock()
+
+    @property
+    def count(self):
+        return len(self.subscribers)
+
+    def subscribe(self):
+        sub = Subscriber()
+        with self.lock:
+            self.subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub):
+        sub.closed = True
+        with self.lock:
+            self.subscribers.discard(sub)
+
+    def publish(self, event, data=None, encoded=None):
+        """Queue one event to every client (serialized once; pass encoded for pre-built JSON)"""
+        if encoded is None:
+            encoded = json.dumps(data, separators=(',', ':'))
+        message = f"event: {event}\ndata: {encoded}\n\n"
+        with self.lock:
+            subscribers = list(self.subscribers)
+        for sub in subscribers:
+            try:
+                sub.queue.put_nowait(message)
+            except queue.Full:
+                self.unsubscribe(sub)
+
+    def stream(self, sub):
+        """SSE body generator for one client"""
+        try:
+            yield f"retry: {RECONNECT_MS}\n\n"
+            while not sub.closed:
+                try:
+                    yield sub.queue.get(timeout=KEEPALIVE_INTERVAL)
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+        finally:
+            self.unsubscribe(sub)
@@ -0,0 +1,65 @@
+"""
+Executor Groups - one child executor process per MT5 session
+When the same child account (same terminal) is a child of several pairs,
+one child executor per pair-child means several processes logging into the
+same terminal and taking the MT5 connection from each other. With
+multiplex_children on (the default) such children run in a single executor
+process instead, one PairFollower per pair (see child_executor_new).
+
+The launcher owns the membership of each executor in
+data/executor_{key}.json and the executor follows it while running:
+
+    {"members": [[pair_id, child_id, launched_ms], ...]}
+
+launched_ms identifies a membership: when the launcher re-adds a pair-child
+(e.g. a supervisor restart) the executor replaces that follower.
+"""
+
+import os
+import json
+import hashlib
+
+MEMBERS_FILE = 'executor_{key}.json'
+
+
+def executor_key(child):
+    """Key of the MT5 session a child config logs into (account + server + terminal)"""
+    terminal = (child.get('terminal') or '').strip().strip('"').strip("'").lower()
+    session = f"{child.get('server', '')}|{terminal}".lower().encode('utf-8')
+    return f"{child.get('account', '')}_{hashlib.sha1(session).hexdigest()[:8]}"
+
+
+def shared_sessions(config):
+    """Executor keys used by enabled children of more than one enabled pair"""
+    pairs_by_key = {}
+    for pair in config.get('pairs', []):
+        if not pair.get('enabled', True):
+            continue
+        for child in pair.get('children', []):
+            if child.get('enabled', True) and child.get('account'):
+                pairs_by_key.setdefault(executor_key(child), set()).add(pair.get('id'))
+    return {key for key, pairs in pairs_by_key.items() if len(pairs) > 1}
+
+
+def get_members_path(data_dir, key):
+    return os.path.join(data_dir, MEMBERS_FILE.format(key=key))
+
+
+def load_members(data_dir, key):
+    """[(pair_id, child_id, launched_ms)] of an executor ([] if none)"""
+    try:
+        with open(get_members_path(data_dir, key)) as f:
+            return [tuple(m) for m in json.load(f).get('members', [])]
+    except (OSError, ValueError):
+        return []
+
+
+def save_members(data_dir, key, members):
+    """Write the membership atomically (the executor may read it at any time)"""
+    path = get_members_path(data_dir, key)
+    try:
+        with open(path + '.tmp', 'w') as f:
+            json.dump({'members': [list(m) for m in members]}, f)
+        os.replace(path + '.tmp', path)
+    except Exception as e:
+        print(f"[WARN] Could not save executor members: {e}")
@@ -0,0 +1,269 @@
+"""
+Fetcher Pool - one long-lived MT5 data-fetcher process per terminal
+The MetaTrader5 library holds a single terminal connection per process, so
+fetching master + N children from the dashboard process meant a
+shutdown/initialize/login cycle per terminal on every refresh, with Flask
+threads racing on that global connection.
+
+Each worker process stays connected to its own terminal and runs
+mt5_data_fetcher functions on request over a multiprocessing Pipe. The
+dashboard fans requests out to the workers in parallel.
+
+Workers exit on their own after IDLE_TIMEOUT seconds without requests.
+
+Calls are coalesced per (function, terminal, login, parameters): concurrent
+identical requests wait on one in-flight fetch, and successful results are
+reused for a short per-function TTL (CACHE_TTL).
+"""
+
+import os
+import time
+import atexit
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+
+REQUEST_TIMEOUT = 30  # Seconds to wait for a worker reply
+IDLE_TIMEOUT = 600  # Worker exits after this long without requests
+MAX_PARALLEL = 16  # Concurrent requests in one fan-out
+
+# Seconds a successful result is reused, per function (0 = coalesce only)
+CACHE_TTL = {
+    'get_mt5_positions': 1.0,
+    'get_account_live_data': 1.0,  # Carries positions, so positions TTL
+    'get_mt5_history': 30.0,
+    'get_mt5_closed_orders': 30.0,
+    'get_account_closed_trades': 5.0,  # Served from the incremental deal cache
+    'get_market_watch': 1.0  # Includes live bid/ask
+}
+
+# Functions a worker may run (all from mt5_data_fetcher)
+ALLOWED_CALLS = {
+    'get_mt5_positions', 'get_mt5_history', 'get_mt5_closed_orders',
+    'get_account_live_data', 'get_account_closed_trades', 'get_market_watch'
+}
+
+
+def _worker_main(conn, key):
+    """Worker process: serve (func_name, kwargs) requests for one terminal"""
+    try:
+        import mt5_data_fetcher
+        load_error = None
+    except Exception as e:
+        mt5_data_fetcher, load_error = None, f'MT5 fetcher unavailable: {e}'
+    try:
+        while True:
+            if not conn.poll(IDLE_TIMEOUT):
+                break
+            try:
+                request = conn.recv()
+            except (EOFError, OSError):
+                break
+            if request is None:
+                break
+            func_name, kwargs = request
+            try:
+                if load_error:
+                    raise RuntimeError(load_error)
+                if func_name not in ALLOWED_CALLS:
+                    raise ValueError(f'Unknown fetcher call: {func_name}')
+                result = getattr(mt5_data_fetcher, func_name)(**kwargs)
+            except Exception as e:
+                result = {'success': False, 'error': str(e)}
+            try:
+                conn.send(result)
+            except (EOFError, OSError):
+                break
+    finally:
+        if mt5_data_fetcher:
+            mt5_data_fetcher._disconnect()
+        conn.close()
+
+
+def terminal_key(terminal_path, login):
+    """Pool key for an account: its terminal (or login when no terminal path is set)"""
+    if terminal_path:
+        path = str(terminal_path).strip().strip('"').strip("'")
+        return os.path.normcase(os.path.normpath(path))
+    return f'login:{login}'
+
+
+class _Worker:
+    def __init__(self, key):
+        self.key = key
+        self.lock = threading.Lock()  # One request in flight per worker
+        self.conn, child_conn = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=_worker_main, args=(child_conn, key),
+                                               name='mt5-fetcher', daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def alive(self):
+        return self.process.is_alive()
+
+    def call(self, func_name, kwargs, timeout):
+        self.conn.send((func_name, kwargs))
+        if not self.conn.poll(timeout):
+            raise TimeoutError(f'MT5 fetcher timed out after {timeout}s')
+        return self.conn.recv()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except Exception:
+            pass
+        self.process.join(timeout=2)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.conn.close()
+
+
+class _Flight:
+    """One in-flight fetch that concurrent identical callers wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+
+
+class FetcherPool:
+    """Per-terminal fetcher workers, started on first use"""
+
+    def __init__(self):
+        self.workers = {}
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=MAX_PARALLEL, thread_name_prefix='fetch')
+        self.cache = {}  # key -> (expires, result)
+        self.flights = {}  # key -> _Flight
+        self.cache_lock = threading.Lock()
+        self.counters = {}  # func_name -> {'hits', 'coalesced', 'misses'}
+
+    def _get_worker(self, key):
+        with self.lock:
+            worker = self.workers.get(key)
+            if worker is None or not worker.alive():
+                worker = _Worker(key)
+                self.workers[key] = worker
+            return worker
+
+    def call(self, func_name, terminal_path=None, login=None, timeout=REQUEST_TIMEOUT, **kwargs):
+        """
+        Run a mt5_data_fetcher function in the worker for this account's terminal.
+        Identical concurrent calls share one fetch; results are cached for CACHE_TTL.
+        """
+        kwargs.update(terminal_path=terminal_path, login=login)
+        key = (func_name, terminal_key(terminal_path, login), str(login),
+               tuple(sorted((k, str(v)) for k, v in kwargs.items()
+                            if k not in ('terminal_path', 'login', 'password'))))
+        with self.cache_lock:
+            counters = self.counters.setdefault(func_name, {'hits': 0, 'coalesced': 0, 'misses': 0})
+            cached = self.cache.get(key)
+            if cached and cached[0] > time.time():
+                counters['hits'] += 1
+                return cached[1]
+            flight = self.flights.get(key)
+            if flight:
+                counters['coalesced'] += 1
+                leader = False
+            else:
+                counters['misses'] += 1
+                flight = self.flights[key] = _Flight()
+                leader = True
+
+        if not leader:
+            if flight.done.wait(timeout + 5):
+                return flight.result
+            return {'success': False, 'error': f'MT5 fetcher timed out after {timeout}s'}
+
+        try:
+            flight.result = self._call_worker(key[1], func_name, kwargs, timeout)
+        except Exception as e:
+            flight.result = {'success': False, 'error': str(e)}
+        finally:
+            ttl = CACHE_TTL.get(func_name, 0)
+            with self.cache_lock:
+                del self.flights[key]
+                if ttl and isinstance(flight.result, dict) and flight.result.get('success'):
+                    self.cache[key] = (time.time() + ttl, flight.result)
+                self._prune_cache()
+            flight.done.set()
+        return flight.result
+
+    def _prune_cache(self):
+        if len(self.cache) > 256:
+            now = time.time()
+            for key in [k for k, (expires, _) in self.cache.items() if expires <= now]:
+                del self.cache[key]
+
+    def cache_stats(self):
+        """Hit/coalesced/miss counters per fetcher function"""
+        with self.cache_lock:
+            stats = {name: dict(c) for name, c in self.counters.items()}
+            entries = len(self.cache)
+        for c in stats.values():
+            served = c['hits'] + c['coalesced'] + c['misses']
+            c['hit_rate'] = round((c['hits'] + c['coalesced']) / served * 100, 1) if served else 0
+        return {'functions': stats, 'cache_entries': entries, 'workers': len(self.workers)}
+
+    def _call_worker(self, key, func_name, kwargs, timeout):
+        for attempt in range(2):
+            worker = self._get_worker(key)
+            with worker.lock:
+                try:
+                    return worker.call(func_name, kwargs, timeout)
+                except TimeoutError as e:
+                    self._discard(worker)
+                    return {'success': False, 'error': str(e)}
+                except (EOFError, OSError, BrokenPipeError):
+                    # Worker exited (idle timeout or crash) - restart once
+                    self._discard(worker)
+        return {'success': False, 'error': 'MT5 fetcher worker unavailable'}
+
+    def fan_out(self, requests):
+        """
+        Run several calls in parallel, one per terminal.
+        requests is a list of (func_name, kwargs) with terminal_path/login in kwargs.
+        Returns results in the same order.
+        """
+        futures = [self.executor.submit(self.call, func_name, **kwargs) for func_name, kwargs in requests]
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append({'success': False, 'error': str(e)})
+        return results
+
+    def _discard(self, worker):
+        with self.lock:
+            if self.workers.get(worker.key) is worker:
+                del self.workers[worker.key]
+        worker.process.terminate()
+        worker.conn.close()
+
+    def stop(self, terminal_path=None, login=None):
+        """Stop the worker for one terminal (e.g. when its pair is deactivated)"""
+        with self.lock:
+            worker = self.workers.pop(terminal_key(terminal_path, login), None)
+        if worker:
+            worker.stop()
+
+    def shutdown(self):
+        with self.lock:
+            workers, self.workers = list(self.workers.values()), {}
+        for worker in workers:
+            worker.stop()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Process-wide fetcher pool (created on first use)"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = FetcherPool()
+            atexit.register(_pool.shutdown)
+        return _pool
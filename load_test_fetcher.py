@@ -0,0 +1,88 @@
+"""
+Load test for the dashboard MT5 data endpoints
+Runs N concurrent clients against a running dashboard and reports latency,
+then prints the fetcher pool cache counters from /api/fetcher-stats.
+
+Usage: python load_test_fetcher.py <pair_id> [clients] [requests_per_client] [base_url]
+"""
+
+import sys
+import time
+import json
+import threading
+import urllib.request
+from http.cookiejar import CookieJar
+
+PAIR_ID = sys.argv[1] if len(sys.argv) > 1 else None
+CLIENTS = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+REQUESTS = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+BASE_URL = sys.argv[4] if len(sys.argv) > 4 else 'http://127.0.0.1:5000'
+
+ENDPOINTS = [
+    '/api/pairs/{pair}/mt5-data',
+    '/api/pairs/{pair}/live-data',
+    '/api/accounts/master/{pair}/positions'
+]
+
+
+def make_opener():
+    """Opener with a session cookie (GET /login signs in when the license is valid)"""
+    opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(CookieJar()))
+    opener.open(BASE_URL + '/login', timeout=10).read()
+    return opener
+
+
+def client(index, latencies, errors):
+    try:
+        opener = make_opener()
+    except Exception as e:
+        errors.append(f'client {index}: login failed: {e}')
+        return
+    for i in range(REQUESTS):
+        path = ENDPOINTS[(index + i) % len(ENDPOINTS)].format(pair=PAIR_ID)
+        start = time.perf_counter()
+        try:
+            json.loads(opener.open(BASE_URL + path, timeout=60).read().decode())
+            latencies.append((path, time.perf_counter() - start))
+        except Exception as e:
+            errors.append(f'{path}: {e}')
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))] if values else 0
+
+
+if __name__ == '__main__':
+    if not PAIR_ID:
+        print(__doc__)
+        sys.exit(1)
+
+    latencies, errors = [], []
+    threads = [threading.Thread(target=client, args=(i, latencies, errors)) for i in range(CLIENTS)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    print(f"Clients: {CLIENTS}  Requests: {len(latencies)} ok, {len(errors)} failed  in {elapsed:.2f}s "
+          f"({len(latencies) / elapsed:.1f} req/s)")
+    for endpoint in ENDPOINTS:
+        path = endpoint.format(pair=PAIR_ID)
+        times = [t * 1000 for p, t in latencies if p == path]
+        if times:
+            print(f"  {path}: n={len(times)}  p50={percentile(times, 50):.0f}ms  "
+                  f"p95={percentile(times, 95):.0f}ms  max={max(times):.0f}ms")
+    for error in errors[:5]:
+        print(f"  [ERROR] {error}")
+
+    try:
+        stats = json.loads(make_opener().open(BASE_URL + '/api/fetcher-stats', timeout=10).read().decode())
+        print(f"Fetcher pool: {stats.get('workers', 0)} workers, {stats.get('cache_entries', 0)} cached results")
+        for name, c in stats.get('functions', {}).items():
+            print(f"  {name}: hits={c['hits']} coalesced={c['coalesced']} misses={c['misses']} "
+                  f"(served without a fetch: {c['hit_rate']}%)")
+    except Exception as e:
+        print(f"Could not read /api/fetcher-stats: {e}")
@@ -0,0 +1,307 @@
+"""
+Log Archive - Compressed, seekable log rotation
+Rotated log segments are stored as independently decompressible zlib blocks
+with a small time->block index, so readers only inflate the blocks that
+overlap the requested time range.
+
+Layout in logs/archive/:
+    <log name>.<YYYYmmddHHMMSS>.zlog      concatenated zlib blocks
+    <log name>.<YYYYmmddHHMMSS>.zlog.idx  JSON index: one [offset, length, first, last, count] per block
+
+Retention is by age (days) and total archive size (MB), read from the
+'log_retention_days' / 'log_retention_mb' settings in config.json.
+
+Workers rotate their logs with rotate_text_log: only a rename happens on the
+logging (trade copy) path, the rotated file is compressed line by line in a
+background thread. A rotated file left behind by a worker that exited first
+is compressed with the next rotation of that log.
+"""
+
+import os
+import re
+import json
+import glob
+import time
+import zlib
+import threading
+from datetime import datetime, timedelta
+
+BLOCK_SIZE = 512 * 1024  # Uncompressed bytes per block
+COMPRESS_LEVEL = 6
+DEFAULT_RETENTION_DAYS = 90
+DEFAULT_RETENTION_MB = 500
+ARCHIVE_EXT = '.zlog'
+INDEX_EXT = '.idx'
+ROTATED_EXT = '.rotating'
+
+_compress_lock = threading.Lock()  # One background compression at a time per process
+
+# Timestamp prefix of text log lines: [2025-12-26 17:18:25.265]
+TS_RE = re.compile(r'\[(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})')
+
+# Data directory in AppData
+def get_data_dir():
+    if os.name == 'nt':
+        base = os.environ.get('LOCALAPPDATA', os.path.expanduser('~'))
+    else:
+        base = os.path.expanduser('~/.local/share')
+    data_dir = os.path.join(base, 'JD_MT5_TradeCopier')
+    os.makedirs(data_dir, exist_ok=True)
+    os.makedirs(os.path.join(data_dir, 'data'), exist_ok=True)
+    os.makedirs(os.path.join(data_dir, 'logs'), exist_ok=True)
+    return data_dir
+
+DATA_DIR = get_data_dir()
+ARCHIVE_DIR = os.path.join(DATA_DIR, 'logs', 'archive')
+
+_retention_cache = {'loaded': 0, 'value': (DEFAULT_RETENTION_DAYS, DEFAULT_RETENTION_MB)}
+
+
+def get_retention():
+    """Return (max_age_days, max_total_mb) from config settings (cached for 60s)"""
+    now = time.time()
+    if now - _retention_cache['loaded'] < 60:
+        return _retention_cache['value']
+    days, size_mb = DEFAULT_RETENTION_DAYS, DEFAULT_RETENTION_MB
+    try:
+        with open(os.path.join(DATA_DIR, 'config.json'), 'r', encoding='utf-8-sig') as f:
+            settings = json.load(f).get('settings', {})
+        days = float(settings.get('log_retention_days', days))  # 0 = no age limit
+        size_mb = float(settings.get('log_retention_mb', size_mb))  # 0 = no size limit
+    except:
+        pass
+    _retention_cache['loaded'] = now
+    _retention_cache['value'] = (days, size_mb)
+    return days, size_mb
+
+
+def _line_ts(line, last_ts):
+    """Timestamp of a text log line (lines without one inherit the previous)"""
+    match = TS_RE.match(line)
+    return match.group(1) if match else last_ts
+
+
+def _entry_ts(entry):
+    """Timestamp of a JSON activity entry ({'date': ..., 'time': ...})"""
+    return f"{entry.get('date', '')} {entry.get('time', '')}".strip()
+
+
+def _write_segment(name, records, kind):
+    """
+    Write (timestamp, line) records as a block-compressed segment, streaming
+    (records may be a generator). Records must be in chronological order.
+    Returns the segment path.
+    """
+    os.makedirs(ARCHIVE_DIR, exist_ok=True)
+    blocks = []
+    first_ts = None
+    tmp_path = os.path.join(ARCHIVE_DIR, f"{name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp_path, 'wb') as out:
+        buf, buf_size, block_first, block_last = [], 0, None, None
+        offset = 0
+
+        def flush():
+            nonlocal buf, buf_size, block_first, block_last, offset
+            if not buf:
+                return
+            data = zlib.compress(''.join(buf).encode('utf-8'), COMPRESS_LEVEL)
+            out.write(data)
+            blocks.append([offset, len(data), block_first or '', block_last or '', len(buf)])
+            offset += len(data)
+            buf, buf_size, block_first, block_last = [], 0, None, None
+
+        for ts, line in records:
+            if not line.endswith('\n'):
+                line += '\n'
+            if ts:
+                first_ts = first_ts or ts
+                block_first = block_first or ts
+                block_last = ts
+            buf.append(line)
+            buf_size += len(line)
+            if buf_size >= BLOCK_SIZE:
+                flush()
+        flush()
+
+    # Named after its first timestamp, known once all records are written
+    stamp = re.sub(r'\D', '', first_ts or datetime.now().strftime('%Y-%m-%d %H:%M:%S'))[:14]
+    path = os.path.join(ARCHIVE_DIR, f"{name}.{stamp}{ARCHIVE_EXT}")
+    suffix = 1
+    while os.path.exists(path):
+        path = os.path.join(ARCHIVE_DIR, f"{name}.{stamp}_{suffix}{ARCHIVE_EXT}")
+        suffix += 1
+    index = {
+        'source': name,
+        'kind': kind,
+        'first': blocks[0][2] if blocks else '',
+        'last': blocks[-1][3] if blocks else '',
+        'blocks': blocks
+    }
+    with open(path + INDEX_EXT, 'w') as f:
+        json.dump(index, f)
+    os.replace(tmp_path, path)
+    return path
+
+
+def _text_records(path):
+    """(timestamp, line) of a text log, read line by line"""
+    last_ts = None
+    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+        for line in f:
+            last_ts = _line_ts(line, last_ts)
+            yield last_ts, line
+
+
+def _compress_rotated(log_file):
+    """Compress every rotated file of a log (oldest first) into archive segments"""
+    name = os.path.basename(log_file)
+    with _compress_lock:
+        for rotated in sorted(glob.glob(glob.escape(log_file) + '.*' + ROTATED_EXT)):
+            try:
+                _write_segment(name, _text_records(rotated), 'text')
+                os.remove(rotated)
+            except Exception as e:
+                print(f"[WARN] Could not compress rotated log {os.path.basename(rotated)}: {e}")
+        apply_retention()
+
+
+def rotate_text_log(log_file):
+    """
+    Start a fresh log now and compress the old one in a background thread
+    (non-daemon, so a worker that exits normally finishes it first).
+    Called by the process that owns (appends to) the log file.
+    """
+    rotated = f"{log_file}.{datetime.now().strftime('%Y%m%d%H%M%S%f')}{ROTATED_EXT}"
+    os.replace(log_file, rotated)
+    threading.Thread(target=_compress_rotated, args=(log_file,), name='log-archive').start()
+    return rotated
+
+
+def archive_text_log(log_file):
+    """
+    Move a text log into a compressed archive segment and start a fresh log
+    (synchronously, streaming - for callers off the trade path).
+    """
+    rotating = f"{log_file}.{datetime.now().strftime('%Y%m%d%H%M%S%f')}{ROTATED_EXT}"
+    os.replace(log_file, rotating)
+    try:
+        path = _write_segment(os.path.basename(log_file), _text_records(rotating), 'text')
+    finally:
+        try:
+            os.remove(rotating)
+        except:
+            pass
+    apply_retention()
+    return path
+
+
+def archive_json_activities(log_file, activities):
+    """Archive a JSON activity list (newest first) as a compressed segment"""
+    records = [(_entry_ts(a), json.dumps(a)) for a in reversed(activities)]
+    path = _write_segment(os.path.basename(log_file), records, 'json')
+    apply_retention()
+    return path
+
+
+def list_segments(name=None):
+    """List (path, index) for archive segments, optionally for one log name, oldest first"""
+    pattern = f"{glob.escape(name)}.*{ARCHIVE_EXT}" if name else f"*{ARCHIVE_EXT}"
+    segments = []
+    for path in glob.glob(os.path.join(ARCHIVE_DIR, pattern)):
+        try:
+            with open(path + INDEX_EXT, 'r') as f:
+                index = json.load(f)
+        except:
+            continue
+        if name and index.get('source') != name:
+            continue
+        segments.append((path, index))
+    segments.sort(key=lambda s: (s[1].get('first', ''), s[0]))
+    return segments
+
+
+def _remove_segment(path):
+    for p in (path, path + INDEX_EXT):
+        try:
+            os.remove(p)
+        except:
+            pass
+
+
+def apply_retention(max_age_days=None, max_total_mb=None):
+    """Delete segments older than the age limit, then oldest first until under the size limit"""
+    if max_age_days is None or max_total_mb is None:
+        days, size_mb = get_retention()
+        max_age_days = days if max_age_days is None else max_age_days
+        max_total_mb = size_mb if max_total_mb is None else max_total_mb
+    try:
+        cutoff = (datetime.now() - timedelta(days=max_age_days)).strftime('%Y-%m-%d %H:%M:%S')
+        segments = list_segments()
+        kept = []
+        for path, index in segments:
+            if max_age_days > 0 and index.get('last') and index['last'] < cutoff:
+                _remove_segment(path)
+            else:
+                kept.append((path, index))
+
+        if max_total_mb > 0:
+            limit = max_total_mb * 1024 * 1024
+            sizes = {path: os.path.getsize(path) for path, _ in kept if os.path.exists(path)}
+            total = sum(sizes.values())
+            kept.sort(key=lambda s: s[1].get('last', ''))
+            for path, _ in kept:
+                if total <= limit:
+                    break
+                total -= sizes.get(path, 0)
+                _remove_segment(path)
+    except Exception as e:
+        print(f"[WARN] Log archive retention failed: {e}")
+
+
+def _overlaps(first, last, ts_from, ts_to):
+    if ts_from and last and last < ts_from:
+        return False
+    if ts_to and first and first > ts_to:
+        return False
+    return True
+
+
+def read_archive(name, date_from=None, date_to=None):
+    """
+    Yield archived records of one log, newest first, within [date_from, date_to].
+    Text segments yield lines; JSON segments yield activity dicts.
+    Only blocks whose time range overlaps the request are decompressed.
+    """
+    ts_from = f"{date_from} 00:00:00" if date_from else None
+    ts_to = f"{date_to} 23:59:59" if date_to else None
+    for path, index in reversed(list_segments(name)):
+        if not _overlaps(index.get('first'), index.get('last'), ts_from, ts_to):
+            continue
+        kind = index.get('kind', 'text')
+        try:
+            with open(path, 'rb') as f:
+                for offset, length, first, last, _count in reversed(index.get('blocks', [])):
+                    if not _overlaps(first, last, ts_from, ts_to):
+                        continue
+                    f.seek(offset)
+                    text = zlib.decompress(f.read(length)).decode('utf-8', errors='ignore')
+                    last_ts = None
+                    records = []
+                    for line in text.splitlines():
+                        if kind == 'json':
+                            try:
+                                entry = json.loads(line)
+                            except ValueError:
+                                continue
+                            ts = _entry_ts(entry)
+                            record = entry
+                        else:
+                            ts = last_ts = _line_ts(line, last_ts)
+                            record = line
+                        if ts and ((ts_from and ts < ts_from) or (ts_to and ts > ts_to)):
+                            continue
+                        records.append(record)
+                    for record in reversed(records):
+                        yield record
+        except Exception as e:
+            print(f"[WARN] Error reading log archive {os.path.basename(path)}: {e}")
@@ -0,0 +1,166 @@
+"""
+Log Cursor - Incremental reads for dashboard polling
+Lets list endpoints return only the records added or changed since the last poll
+
+A cursor is an opaque token handed to the browser. It encodes, per source:
+- text logs (append-only): file identity + byte offset already consumed
+- whole-file sources (JSON rewritten in place): mtime/size signature
+- computed sections (positions, balances): digest of the last value sent
+
+A source that was rotated or truncated since the cursor was issued is
+reported as reset so the caller can resend it in full.
+"""
+
+import os
+import re
+import json
+import base64
+import hashlib
+
+CURSOR_VERSION = 1
+
+# Parse format: [2025-12-26 17:18:25.265] [INFO] message
+LOG_LINE_RE = re.compile(r'\[(\d{4}-\d{2}-\d{2}) (\d{2}:\d{2}:\d{2})\.\d+\] \[(\w+)\] (.+)')
+
+
+def decode_cursor(token):
+    """Decode a cursor token into its state dict (None if missing or invalid)"""
+    if not token:
+        return None
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        state = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        if not isinstance(state, dict) or state.get('v') != CURSOR_VERSION:
+            return None
+        return state
+    except Exception:
+        return None
+
+
+def encode_cursor(state):
+    """Encode a cursor state dict into a compact URL-safe token"""
+    state['v'] = CURSOR_VERSION
+    raw = json.dumps(state, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def _source_key(path):
+    """Short stable key for a file path (keeps cursors small with many children)"""
+    return hashlib.sha1(os.path.normcase(os.path.abspath(path)).encode()).hexdigest()[:12]
+
+
+def read_new_lines(path, state, tail=0):
+    """
+    Read complete lines appended to a text log since the cursor position.
+
+    Returns (lines, reset). reset is True when the file was rotated or
+    truncated since the cursor was issued; lines then hold the whole file.
+    With no previous position the whole file is read (last `tail` lines if set).
+    Partial trailing lines are left for the next poll.
+    """
+    key = _source_key(path)
+    offsets = state.setdefault('f', {})
+    try:
+        st = os.stat(path)
+    except OSError:
+        offsets.pop(key, None)
+        return [], False
+
+    prev = offsets.get(key)
+    start = 0
+    reset = False
+    if prev:
+        ino, offset = prev
+        if ino == st.st_ino and offset <= st.st_size:
+            start = offset
+        else:
+            reset = True
+
+    if start == st.st_size:
+        offsets[key] = [st.st_ino, start]
+        return [], reset
+
+    with open(path, 'rb') as f:
+        f.seek(start)
+        data = f.read(st.st_size - start)
+
+    end = data.rfind(b'\n')
+    data = data[:end + 1] if end >= 0 else b''
+    offsets[key] = [st.st_ino, start + len(data)]
+
+    lines = data.decode('utf-8', errors='ignore').splitlines()
+    if tail and (not prev or reset):
+        lines = lines[-tail:]
+    return lines, reset
+
+
+def seek_end(path, state, block_size=4096):
+    """
+    Move the cursor past the last complete line of a text log without
+    reading the file, so read_new_lines returns only lines appended later.
+    Returns the new offset (None if the file does not exist).
+    """
+    key = _source_key(path)
+    offsets = state.setdefault('f', {})
+    try:
+        st = os.stat(path)
+        with open(path, 'rb') as f:
+            f.seek(max(0, st.st_size - block_size))
+            tail = f.read(st.st_size - f.tell())
+    except OSError:
+        offsets.pop(key, None)
+        return None
+    end = tail.rfind(b'\n')
+    offset = st.st_size - len(tail) + end + 1 if end >= 0 else st.st_size - len(tail)
+    offsets[key] = [st.st_ino, offset]
+    return offset
+
+
+def file_changed(path, state):
+    """Check a whole-file source (rewritten in place) against the cursor signature"""
+    key = _source_key(path)
+    sigs = state.setdefault('s', {})
+    try:
+        st = os.stat(path)
+        sig = [st.st_mtime_ns, st.st_size]
+    except OSError:
+        sig = None
+    changed = sigs.get(key) != sig
+    sigs[key] = sig
+    return changed
+
+
+def section_changed(state, name, value):
+    """Check a computed section against the digest of the last value sent"""
+    digests = state.setdefault('d', {})
+    digest = hashlib.sha1(json.dumps(value, sort_keys=True, default=str).encode()).hexdigest()[:16]
+    changed = digests.get(name) != digest
+    digests[name] = digest
+    return changed
+
+
+def read_lines_reversed(path, block_size=64 * 1024, end=None):
+    """
+    Yield the complete lines of a text log newest first, reading the file
+    backwards one block at a time (memory stays bounded by the longest line).
+    With end set, only the bytes before that offset are read (see seek_end).
+    """
+    try:
+        f = open(path, 'rb')
+    except OSError:
+        return
+    with f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell() if end is None else min(end, f.tell())
+        pending = b''
+        while position > 0:
+            size = min(block_size, position)
+            position -= size
+            f.seek(position)
+            lines = (f.read(size) + pending).split(b'\n')
+            pending = lines.pop(0)
+            for line in reversed(lines):
+                if line:
+                    yield line.decode('utf-8', errors='ignore').rstrip('\r')
+        if pending:
+            yield pending.decode('utf-8', errors='ignore').rstrip('\r')
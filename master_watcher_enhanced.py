@@ -12,6 +12,7 @@ import json
 import os
 import sys
 from datetime import datetime, timedelta
+from log_archive import archive_json_activities
 
 # Import enhanced database storage
 try:
@@ -47,7 +48,6 @@ MAX_POSITIONS = 50
 POSITION_SIZE = 48
 MASTER_ACTIVITY_LOG_TEMPLATE = "master_activity_{pair_id}.json"
 MAX_ACTIVITY_LOGS = 10000  # Keep 10000 entries per pair before rotating
-MASTER_ARCHIVE_MAX = 5  # Keep up to 5 archived files
 HEADER_SIZE = 28
 
 def log_to_database(pair_id, level, message, account_id=None):
@@ -70,24 +70,8 @@ def rotate_master_activity_if_needed(log_file, pair_id):
         if len(activities) < MAX_ACTIVITY_LOGS:
             return
         
-        # Archive current log
-        archive_dir = os.path.join(DATA_DIR, 'logs', 'archive')
-        os.makedirs(archive_dir, exist_ok=True)
-        
-        # Rotate existing archives
-        for i in range(MASTER_ARCHIVE_MAX - 1, 0, -1):
-            old_file = os.path.join(archive_dir, f'master_activity_{pair_id}.{i}.json')
-            new_file = os.path.join(archive_dir, f'master_activity_{pair_id}.{i+1}.json')
-            if os.path.exists(old_file):
-                if i + 1 > MASTER_ARCHIVE_MAX:
-                    os.remove(old_file)
-                else:
-                    os.rename(old_file, new_file)
-        
-        # Archive current to .1
-        archive_file = os.path.join(archive_dir, f'master_activity_{pair_id}.1.json')
-        with open(archive_file, 'w') as f:
-            json.dump(activities, f)
+        # Compress into block archive (retention by age/size in log_archive)
+        archive_json_activities(log_file, activities)
         
         # Clear current log
         with open(log_file, 'w') as f:
@@ -132,7 +116,7 @@ def save_master_activity(pair_id, message, log_type="INFO"):
         pass
 
 def save_closed_trade(pair_id, trade_data):
-    """Save closed trade to JSON file and database"""
+    """Save closed trade to database"""
     # Save to database
     if USE_DATABASE:
         try:
@@ -154,25 +138,6 @@ def save_closed_trade(pair_id, trade_data):
             )
         except Exception as e:
             log_to_database(pair_id, 'ERROR', f"Failed to save trade to database: {e}")
-    
-    # Legacy JSON file
-    try:
-        closed_file = os.path.join(DATA_DIR, "data", f"closed_trades_{pair_id}.json")
-        closed_trades = []
-        if os.path.exists(closed_file):
-            try:
-                with open(closed_file, 'r') as f:
-                    closed_trades = json.load(f)
-            except:
-                closed_trades = []
-        
-        closed_trades.insert(0, trade_data)
-        closed_trades = closed_trades[:50]
-        
-        with open(closed_file, 'w') as f:
-            json.dump(closed_trades, f)
-    except:
-        pass
 
 def load_config(pair_id):
     """Load configuration for specific pair"""
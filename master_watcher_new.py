@@ -13,6 +13,10 @@ import json
 import os
 import sys
 from datetime import datetime, timedelta
+from log_archive import rotate_text_log
+from storage_db import db
+from price_segment import PriceWriter, MAX_SYMBOLS as MAX_PRICE_SYMBOLS
+from worker_status import open_worker_status, loop_budget, MASTER_ID, MASTER_LOOP_HZ
 
 
 # Get correct directory for config files
@@ -39,7 +43,6 @@ DATA_DIR = get_data_dir()
 
 # Log rotation settings
 MAX_LOG_SIZE_MB = 50  # Rotate when log exceeds 50MB
-MAX_ROTATED_FILES = 5  # Keep 5 archived logs
 
 def rotate_log_if_needed(log_file):
     """Rotate log file if it exceeds MAX_LOG_SIZE_MB"""
@@ -51,19 +54,9 @@ def rotate_log_if_needed(log_file):
         if size_mb < MAX_LOG_SIZE_MB:
             return
         
-        # Rotate existing archives
-        for i in range(MAX_ROTATED_FILES - 1, 0, -1):
-            old_file = f"{log_file}.{i}"
-            new_file = f"{log_file}.{i+1}"
-            if os.path.exists(old_file):
-                if i + 1 > MAX_ROTATED_FILES:
-                    os.remove(old_file)
-                else:
-                    os.rename(old_file, new_file)
-        
-        # Rotate current log to .1
-        os.rename(log_file, f"{log_file}.1")
-        print(f"[INFO] Rotated log file: {os.path.basename(log_file)} ({size_mb:.1f}MB)")
+        # Rename only - compressed into the block archive in the background (retention in log_archive)
+        rotate_text_log(log_file)
+        print(f"[INFO] Rotated log file: {os.path.basename(log_file)} ({size_mb:.1f}MB), archiving in background")
     except Exception as e:
         print(f"[WARN] Log rotation failed: {e}")
 
@@ -72,17 +65,20 @@ MAX_POSITIONS = 50
 MAX_ORDERS = 20  # Max pending orders
 POSITION_SIZE = 48
 ORDER_SIZE = 64  # Pending order size: ticket(8)+type(1)+volume(8)+price(8)+sl(8)+tp(8)+symbol(15)+padding(8)
-MASTER_ACTIVITY_LOG_TEMPLATE = "master_activity_{pair_id}.json"
-MAX_ACTIVITY_LOGS = 10000
+POSITION_DETAIL_SIZE = 16  # price_open(8)+profit(8)
 
 # Shared memory format:
 # Header: timestamp(8) + balance(8) + equity(8) + pos_count(4) + order_count(4) = 32 bytes
 # Positions: MAX_POSITIONS * POSITION_SIZE
 # Orders: MAX_ORDERS * ORDER_SIZE
+# Position details: MAX_POSITIONS * POSITION_DETAIL_SIZE (dashboard read model; children stop before it)
 HEADER_SIZE = 32
 
+# Readiness reported to the launcher (set in main)
+worker_status = None
+
 def save_master_activity(pair_id, message, log_type="INFO"):
-    """Save master activity to both JSON and text log files for dashboard"""
+    """Save master activity to the text log and event database for dashboard"""
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
     
     # Write to text log file (with rotation when too large)
@@ -95,50 +91,83 @@ def save_master_activity(pair_id, message, log_type="INFO"):
     except:
         pass
     
-    # Also write to JSON for quick access (limited to MAX_ACTIVITY_LOGS)
+    # Also record in the event database (batched, no per-line file rewrite; DEBUG stays in the text log)
     try:
-        log_file = os.path.join(DATA_DIR, 'logs', f'master_activity_{pair_id}.json')
-        activities = []
-        if os.path.exists(log_file):
-            try:
-                with open(log_file, 'r') as f:
-                    activities = json.load(f)
-            except:
-                activities = []
-        
-        activity = {
-            "time": datetime.now().strftime("%H:%M:%S"),
-            "date": datetime.now().strftime("%Y-%m-%d"),
-            "message": message,
-            "type": log_type
-        }
-        activities.insert(0, activity)
-        activities = activities[:MAX_ACTIVITY_LOGS]
-        
-        with open(log_file, 'w') as f:
-            json.dump(activities, f)
+        if log_type != "DEBUG":
+            db.add_log(pair_id, 'MASTER_WATCHER', log_type, message)
     except:
         pass
+    
+    if worker_status and log_type == "ERROR":
+        worker_status.note_error(message)
 
-def save_closed_trade(pair_id, trade_data):
-    """Save closed trade to JSON file for dashboard"""
+def save_closed_trade(pair_id, account_id, trade_data):
+    """Save closed trade to the trade database for dashboard"""
     try:
-        closed_file = os.path.join(DATA_DIR, "data", f"closed_trades_{pair_id}.json")
-        closed_trades = []
-        if os.path.exists(closed_file):
-            try:
-                with open(closed_file, 'r') as f:
-                    closed_trades = json.load(f)
-            except:
-                closed_trades = []
-        
-        closed_trades.insert(0, trade_data)
-        closed_trades = closed_trades[:50]
-        
-        with open(closed_file, 'w') as f:
-            json.dump(closed_trades, f)
-    except:
-        pass
+        db.add_trade_history(
+            ticket=trade_data.get('ticket', 0),
+            pair_id=pair_id,
+            account_id=account_id,
+            account_type='MASTER',
+            symbol=trade_data.get('symbol', ''),
+            trade_type=trade_data.get('type', 0),
+            volume=trade_data.get('volume', 0.0),
+            price_open=trade_data.get('price_open', 0.0),
+            price_close=trade_data.get('close_price', 0.0),
+            profit=trade_data.get('profit', 0.0),
+            open_time=trade_data.get('open_time', ''),
+            close_time=trade_data.get('close_time')
+        )
+    except Exception as e:
+        print(f"[WARN] Error saving closed trade: {e}")
+
+# Price publishing (prices_{pair}.bin, read by the dashboard ticker and children)
+PRICE_INTERVAL = 0.25  # Seconds between price publishes
+PRICE_SYMBOLS_REFRESH = 60  # Seconds between re-reads of the symbol list
+
+def get_price_symbols(pair):
+    """Symbols to publish: the pair's mapped master symbols, then Market Watch (visible) symbols"""
+    symbols = []
+    for child in pair.get('children', []):
+        for mapping in child.get('symbols', []) or []:
+            if isinstance(mapping, dict) and mapping.get('master', '').strip():
+                symbols.append(mapping['master'].strip())
+    for i in range(1, 21):
+        master_sym = pair.get(f'master_symbol_{i}', '').strip()
+        if master_sym:
+            symbols.append(master_sym)
+    
+    # Mapped symbols must be selected in the terminal to receive ticks
+    for symbol in symbols:
+        mt5.symbol_select(symbol, True)
+    
+    visible = mt5.symbols_get()
+    if visible:
+        symbols += [sym.name for sym in visible if sym.visible]
+    
+    result = []
+    for symbol in dict.fromkeys(symbols):
+        info = mt5.symbol_info(symbol)
+        if info is not None:
+            result.append((symbol, info.point, info.digits))
+    return result[:MAX_PRICE_SYMBOLS]
+
+def publish_prices(writer, symbols, daily_opens):
+    """Publish the latest tick of each symbol; the D1 open is read once per trading day"""
+    for symbol, point, digits in symbols:
+        tick = mt5.symbol_info_tick(symbol)
+        if tick is None:
+            continue
+        day = tick.time // 86400  # Tick times are broker server time
+        cached = daily_opens.get(symbol)
+        if not cached or cached[0] != day:
+            bars = mt5.copy_rates_from_pos(symbol, mt5.TIMEFRAME_D1, 0, 1)
+            if bars is not None and len(bars) > 0:
+                cached = (int(bars[0]['time']) // 86400, bars[0]['open'])
+                daily_opens[symbol] = cached
+        daily_open = cached[1] if cached and cached[0] == day else 0.0
+        writer.publish(symbol, tick, point, digits, daily_open)
+    writer.heartbeat()
 
 def load_config(pair_id):
     """Load configuration for specific pair"""
@@ -158,12 +187,21 @@ def load_config(pair_id):
     
     return pair
 
-def main(pair_id):
-    """Main function for master watcher"""
+def main(pair_id, max_loop_hz=None):
+    """Main function for master watcher (reports ready/failed to the launcher)"""
+    global worker_status
     if not pair_id:
         print("ERROR: --pair-id argument required!")
         return
     
+    worker_status = open_worker_status(os.path.join(DATA_DIR, "data"), pair_id, MASTER_ID, 0)
+    try:
+        run_watcher(pair_id, loop_budget(max_loop_hz, MASTER_LOOP_HZ))
+    finally:
+        if worker_status:
+            worker_status.close()
+
+def run_watcher(pair_id, budget):
     print("=" * 60)
     print(f"MASTER WATCHER - Pair: {pair_id}")
     print("=" * 60)
@@ -196,7 +234,7 @@ def main(pair_id):
     
     # Create pair-specific shared memory file with new format (includes pending orders)
     SHARED_FILE = os.path.join(DATA_DIR, "data", f"shared_positions_{pair_id}.bin")
-    file_size = HEADER_SIZE + (MAX_POSITIONS * POSITION_SIZE) + (MAX_ORDERS * ORDER_SIZE)
+    file_size = HEADER_SIZE + (MAX_POSITIONS * POSITION_SIZE) + (MAX_ORDERS * ORDER_SIZE) + (MAX_POSITIONS * POSITION_DETAIL_SIZE)
     
     try:
         if os.path.exists(SHARED_FILE):
@@ -263,14 +301,31 @@ def main(pair_id):
         mt5.shutdown()
         return
     
+    price_writer = None
+    try:
+        price_writer = PriceWriter(os.path.join(DATA_DIR, "data"), pair_id)
+    except Exception as e:
+        print(f"[WARN] Price segment unavailable: {e}")
+    price_symbols = []
+    daily_opens = {}
+    last_price_time = 0
+    last_symbols_time = 0
+    
     last_pos_count = 0
     last_ord_count = 0
     last_log_time = 0
     tracked_positions = {}
     tracked_orders = {}
     
+    # Logged in and the shared segment is mapped - children may start
+    if worker_status:
+        worker_status.ready(f"{acc.login} @ {acc.server}")
+    
     try:
         while True:
+            if worker_status:
+                worker_status.heartbeat()
+            
             pair = load_config(pair_id)
             if not pair or not pair.get('enabled', True):
                 time.sleep(1)
@@ -306,8 +361,8 @@ def main(pair_id):
                         if deal.entry == 1:
                             pos_info['profit'] = deal.profit
                             pos_info['close_price'] = deal.price
-                            pos_info['close_time'] = datetime.now().strftime("%H:%M:%S")
-                save_closed_trade(pair_id, pos_info)
+                            pos_info['close_time'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                save_closed_trade(pair_id, master_account, pos_info)
                 type_str = "BUY" if pos_info['type'] == 0 else "SELL"
                 save_master_activity(pair_id, f"Closed {type_str} {pos_info['volume']} {pos_info['symbol']} P/L: {pos_info['profit']:.2f}", "CLOSE")
             
@@ -397,15 +452,36 @@ def main(pair_id):
             for _ in range(MAX_ORDERS - ord_count):
                 mm.write(b'\x00' * ORDER_SIZE)
             
+            # Write position details (open price, floating profit) in position order
+            if positions:
+                for pos in positions[:MAX_POSITIONS]:
+                    mm.write(struct.pack('<dd', pos.price_open, pos.profit))
+            for _ in range(MAX_POSITIONS - pos_count):
+                mm.write(b'\x00' * POSITION_DETAIL_SIZE)
+            
             mm.flush()
             
+            # Publish prices for the dashboard ticker and child slippage checks
+            if price_writer and time.time() - last_price_time >= PRICE_INTERVAL:
+                try:
+                    if time.time() - last_symbols_time >= PRICE_SYMBOLS_REFRESH:
+                        symbols = get_price_symbols(pair)
+                        if [s[0] for s in symbols] != [s[0] for s in price_symbols]:
+                            price_writer.set_symbols([s[0] for s in symbols])
+                        price_symbols = symbols
+                        last_symbols_time = time.time()
+                    publish_prices(price_writer, price_symbols, daily_opens)
+                except Exception as e:
+                    print(f"[WARN] Price publish failed: {e}")
+                last_price_time = time.time()
+            
             current_time = time.time()
             if current_time - last_log_time > 300:
                 print(f"[{datetime.now().strftime('%H:%M:%S')}] Status: {pos_count} positions, {ord_count} pending, Balance: ${balance:.2f}")
                 save_master_activity(pair_id, f"Status OK - {pos_count} positions, {ord_count} pending", "INFO")
                 last_log_time = current_time
             
-            time.sleep(0.1)
+            budget.pace()
             
     except KeyboardInterrupt:
         print("\n[*] Stopping (Ctrl+C)...")
@@ -414,6 +490,8 @@ def main(pair_id):
         print(f"\n[*] ERROR: {e}")
         save_master_activity(pair_id, f"ERROR: {e}", "ERROR")
     finally:
+        if price_writer:
+            price_writer.close()
         if mm:
             mm.close()
         if f:
@@ -10,12 +10,30 @@ Each account has its own terminal, so we must:
 
 This module connects to ALREADY RUNNING MT5 terminals.
 The Activate Pair feature opens the terminals first.
+
+Deal and order history is kept in a local per-account cache (storage_db):
+each refresh only fetches history since the last sync (minus an overlap
+for late corrections) and date-range queries are served from the cache.
 """
 import MetaTrader5 as mt5
 from datetime import datetime, timedelta
 import os
+import time
 import hashlib
 
+from storage_db import db
+
+# History cache sync: re-fetch this far behind the last sync (late corrections,
+# broker server time vs local time) and re-fetch the whole window periodically
+HISTORY_OVERLAP = timedelta(days=1)
+FULL_RESYNC_INTERVAL = 3600  # Seconds
+
+# Market watch: visible symbols and their static properties are re-read every
+# SYMBOLS_REFRESH seconds; the daily open is read once per symbol per trading day
+SYMBOLS_REFRESH = 60
+_symbols_cache = {'terminal': None, 'loaded': 0, 'symbols': []}  # [(name, digits, point)]
+_daily_open_cache = {}  # (terminal, symbol) -> (trading day, daily open)
+
 # Track current connection to avoid unnecessary reconnects
 # We also track password hash so if password changes, we force re-login
 _current_terminal_path = None
@@ -115,6 +133,73 @@ def _disconnect():
     _current_password_hash = None
 
 
+def _history_range(days, date_from=None, date_to=None):
+    """Resolve the (from, to) datetimes of a history request"""
+    if date_from and date_to:
+        try:
+            return datetime.strptime(date_from, '%Y-%m-%d'), datetime.strptime(date_to, '%Y-%m-%d') + timedelta(days=1)
+        except:
+            pass
+    return datetime.now() - timedelta(days=days), datetime.now()
+
+
+def _sync_history(login, kind, from_dt):
+    """
+    Bring the cached 'deals' or 'orders' of the connected account up to date
+    for requests starting at from_dt. Only history since the last sync is
+    fetched, except on first use, for an earlier start date, or every
+    FULL_RESYNC_INTERVAL. Returns False if the cache can't be used.
+    """
+    try:
+        now = time.time()
+        start = from_dt.timestamp()
+        state = db.get_history_sync(login, kind)
+        if state is None or start < state['covered_from'] or now - state['full_sync_at'] > FULL_RESYNC_INTERVAL:
+            covered_from = min(start, state['covered_from']) if state else start
+            fetch_from = datetime.fromtimestamp(covered_from) - HISTORY_OVERLAP
+            full_sync_at = now
+        else:
+            covered_from = state['covered_from']
+            fetch_from = datetime.fromtimestamp(state['synced_to']) - HISTORY_OVERLAP
+            full_sync_at = state['full_sync_at']
+        
+        # Broker server time can run ahead of local time
+        fetch_to = datetime.now() + HISTORY_OVERLAP
+        if kind == 'deals':
+            rows = mt5.history_deals_get(fetch_from, fetch_to)
+            if rows is None:
+                return False
+            db.upsert_mt5_deals(login, [d._asdict() for d in rows])
+        else:
+            rows = mt5.history_orders_get(fetch_from, fetch_to)
+            if rows is None:
+                return False
+            db.upsert_mt5_orders(login, [o._asdict() for o in rows])
+        db.set_history_sync(login, kind, covered_from, now, full_sync_at)
+        return True
+    except Exception as e:
+        print(f"[WARN] History cache sync failed for {login}: {e}")
+        return False
+
+
+def _get_deals(login, from_dt, to_dt):
+    """Deals of the connected account in [from_dt, to_dt), from the cache when possible"""
+    login = int(login)
+    if _sync_history(login, 'deals', from_dt):
+        return db.get_mt5_deals(login, from_dt.timestamp(), to_dt.timestamp())
+    deals = mt5.history_deals_get(from_dt, to_dt)
+    return [d._asdict() for d in deals] if deals else []
+
+
+def _get_orders(login, from_dt, to_dt):
+    """History orders of the connected account in [from_dt, to_dt), from the cache when possible"""
+    login = int(login)
+    if _sync_history(login, 'orders', from_dt):
+        return db.get_mt5_orders(login, from_dt.timestamp(), to_dt.timestamp())
+    orders = mt5.history_orders_get(from_dt, to_dt)
+    return [o._asdict() for o in orders] if orders else []
+
+
 def get_mt5_positions(login, server, password=None, terminal_path=None):
     """Get current open positions from MT5 account"""
     try:
@@ -181,41 +266,31 @@ def get_mt5_history(login, server, password=None, terminal_path=None, days=30, d
             return {'success': False, 'error': error}
         
         # Get history date range
-        if date_from and date_to:
-            try:
-                from_date = datetime.strptime(date_from, '%Y-%m-%d')
-                to_date = datetime.strptime(date_to, '%Y-%m-%d') + timedelta(days=1)
-            except:
-                from_date = datetime.now() - timedelta(days=days)
-                to_date = datetime.now()
-        else:
-            from_date = datetime.now() - timedelta(days=days)
-            to_date = datetime.now()
+        from_date, to_date = _history_range(days, date_from, date_to)
         
-        deals = mt5.history_deals_get(from_date, to_date)
-        if deals is None:
-            deals = []
+        deals = _get_deals(login, from_date, to_date)
         
         # Convert deals to dict - filter only BUY/SELL trades
         deals_list = []
         for deal in deals:
-            if deal.type in [0, 1]:  # Only BUY and SELL
+            if deal['type'] in [0, 1]:  # Only BUY and SELL
+                deal_time = datetime.fromtimestamp(deal['time']).strftime('%Y-%m-%d %H:%M:%S')
                 deals_list.append({
-                    'ticket': deal.ticket,
-                    'order': deal.order,
-                    'symbol': deal.symbol,
-                    'type': deal.type,
-                    'type_str': 'BUY' if deal.type == 0 else 'SELL',
-                    'volume': deal.volume,
-                    'price': deal.price,
-                    'profit': deal.profit,
-                    'commission': deal.commission,
-                    'swap': deal.swap,
-                    'fee': deal.fee,
-                    'time': datetime.fromtimestamp(deal.time).strftime('%Y-%m-%d %H:%M:%S'),
-                    'close_time': datetime.fromtimestamp(deal.time).strftime('%Y-%m-%d %H:%M:%S'),
-                    'close_price': deal.price,
-                    'comment': deal.comment
+                    'ticket': deal['ticket'],
+                    'order': deal['order'],
+                    'symbol': deal['symbol'],
+                    'type': deal['type'],
+                    'type_str': 'BUY' if deal['type'] == 0 else 'SELL',
+                    'volume': deal['volume'],
+                    'price': deal['price'],
+                    'profit': deal['profit'],
+                    'commission': deal['commission'],
+                    'swap': deal['swap'],
+                    'fee': deal['fee'],
+                    'time': deal_time,
+                    'close_time': deal_time,
+                    'close_price': deal['price'],
+                    'comment': deal['comment']
                 })
         
         return {
@@ -262,40 +337,29 @@ def get_mt5_closed_orders(login, server, password=None, terminal_path=None, days
             return {'success': False, 'error': error}
         
         # Get history date range
-        if date_from and date_to:
-            try:
-                from_dt = datetime.strptime(date_from, '%Y-%m-%d')
-                to_dt = datetime.strptime(date_to, '%Y-%m-%d') + timedelta(days=1)
-            except:
-                from_dt = datetime.now() - timedelta(days=days)
-                to_dt = datetime.now()
-        else:
-            from_dt = datetime.now() - timedelta(days=days)
-            to_dt = datetime.now()
+        from_dt, to_dt = _history_range(days, date_from, date_to)
         
-        orders = mt5.history_orders_get(from_dt, to_dt)
-        if orders is None:
-            orders = []
+        orders = _get_orders(login, from_dt, to_dt)
         
         # Filter completed orders and convert to dict
         orders_list = []
         for order in orders:
-            if order.state in [1, 2]:  # Filled or Partially filled
+            if order['state'] in [1, 2]:  # Filled or Partially filled
                 orders_list.append({
-                    'ticket': order.ticket,
-                    'symbol': order.symbol,
-                    'type': order.type,
-                    'type_str': 'BUY' if order.type == 0 else 'SELL' if order.type == 1 else 'OTHER',
-                    'volume_initial': order.volume_initial,
-                    'volume_current': order.volume_current,
-                    'price_open': order.price_open,
-                    'price_current': order.price_current,
-                    'sl': order.sl,
-                    'tp': order.tp,
-                    'time_setup': datetime.fromtimestamp(order.time_setup).strftime('%Y-%m-%d %H:%M:%S'),
-                    'time_done': datetime.fromtimestamp(order.time_done).strftime('%Y-%m-%d %H:%M:%S'),
-                    'state': order.state,
-                    'comment': order.comment
+                    'ticket': order['ticket'],
+                    'symbol': order['symbol'],
+                    'type': order['type'],
+                    'type_str': 'BUY' if order['type'] == 0 else 'SELL' if order['type'] == 1 else 'OTHER',
+                    'volume_initial': order['volume_initial'],
+                    'volume_current': order['volume_current'],
+                    'price_open': order['price_open'],
+                    'price_current': order['price_current'],
+                    'sl': order['sl'],
+                    'tp': order['tp'],
+                    'time_setup': datetime.fromtimestamp(order['time_setup']).strftime('%Y-%m-%d %H:%M:%S'),
+                    'time_done': datetime.fromtimestamp(order['time_done']).strftime('%Y-%m-%d %H:%M:%S'),
+                    'state': order['state'],
+                    'comment': order['comment']
                 })
         
         return {
@@ -361,30 +425,7 @@ def get_account_live_data(login, server, password=None, terminal_path=None, date
                 })
         
         # Get closed trades (deals)
-        if date_from and date_to:
-            try:
-                from_dt = datetime.strptime(date_from, '%Y-%m-%d')
-                to_dt = datetime.strptime(date_to, '%Y-%m-%d') + timedelta(days=1)
-            except:
-                from_dt = datetime.now() - timedelta(days=days)
-                to_dt = datetime.now()
-        else:
-            from_dt = datetime.now() - timedelta(days=days)
-            to_dt = datetime.now()
-        
-        deals = mt5.history_deals_get(from_dt, to_dt)
-        if deals:
-            for deal in deals:
-                if deal.type in [0, 1] and deal.entry == 1:  # BUY/SELL and OUT (closing deals)
-                    result['closed_trades'].append({
-                        'ticket': deal.ticket,
-                        'symbol': deal.symbol,
-                        'type': deal.type,
-                        'volume': deal.volume,
-                        'close_price': round(deal.price, 5),
-                        'profit': round(deal.profit, 2),
-                        'close_time': datetime.fromtimestamp(deal.time).strftime('%Y-%m-%d %H:%M:%S')
-                    })
+        result['closed_trades'] = _closed_trades(login, *_history_range(days, date_from, date_to))
         
         result['success'] = True
         return result
@@ -394,6 +435,67 @@ def get_account_live_data(login, server, password=None, terminal_path=None, date
         return result
 
 
+def _closed_trades(login, from_dt, to_dt):
+    """Closing deals (BUY/SELL, entry OUT) of the connected account in [from_dt, to_dt)"""
+    trades = []
+    for deal in _get_deals(login, from_dt, to_dt):
+        if deal['type'] in [0, 1] and deal['entry'] == 1:  # BUY/SELL and OUT (closing deals)
+            trades.append({
+                'ticket': deal['ticket'],
+                'symbol': deal['symbol'],
+                'type': deal['type'],
+                'volume': deal['volume'],
+                'close_price': round(deal['price'], 5),
+                'profit': round(deal['profit'], 2),
+                'close_time': datetime.fromtimestamp(deal['time']).strftime('%Y-%m-%d %H:%M:%S')
+            })
+    return trades
+
+
+def get_account_closed_trades(login, server, password=None, terminal_path=None, date_from=None, date_to=None, days=30):
+    """
+    Closed trades only - for accounts whose live state the dashboard
+    already reads from the shared segments (see read_model).
+    """
+    try:
+        success, error = _connect_to_terminal(terminal_path, login, server, password)
+        if not success:
+            return {'success': False, 'error': error, 'closed_trades': []}
+        return {'success': True, 'closed_trades': _closed_trades(login, *_history_range(days, date_from, date_to))}
+    except Exception as e:
+        return {'success': False, 'error': str(e), 'closed_trades': []}
+
+
+def _market_watch_symbols():
+    """Visible Market Watch symbols of the connected terminal as [(name, digits, point)]"""
+    now = time.time()
+    if _symbols_cache['terminal'] != _current_terminal_path or now - _symbols_cache['loaded'] > SYMBOLS_REFRESH:
+        symbols = mt5.symbols_get()
+        if symbols is None:
+            return None
+        _symbols_cache['symbols'] = [(s.name, s.digits, s.point) for s in symbols if s.visible]
+        _symbols_cache['terminal'] = _current_terminal_path
+        _symbols_cache['loaded'] = now
+    return _symbols_cache['symbols']
+
+
+def _daily_open(symbol, tick_time):
+    """Today's D1 open for a symbol, read from the terminal once per trading day"""
+    key = (_current_terminal_path, symbol)
+    day = tick_time // 86400  # Tick times are broker server time
+    cached = _daily_open_cache.get(key)
+    if cached and cached[0] == day:
+        return cached[1]
+    daily_bars = mt5.copy_rates_from_pos(symbol, mt5.TIMEFRAME_D1, 0, 1)
+    if daily_bars is None or len(daily_bars) == 0:
+        return 0
+    daily_open = daily_bars[0]['open']
+    # Only memoize once the terminal has the bar for the tick's day
+    if int(daily_bars[0]['time']) // 86400 == day:
+        _daily_open_cache[key] = (day, daily_open)
+    return daily_open
+
+
 def get_market_watch(login, server, password=None, terminal_path=None):
     """Get all symbols from Market Watch with their current prices and daily change"""
     try:
@@ -402,49 +504,34 @@ def get_market_watch(login, server, password=None, terminal_path=None):
         if not success:
             return {'success': False, 'error': error, 'symbols': []}
         
-        # Get all symbols visible in Market Watch
-        symbols = mt5.symbols_get()
+        # Visible symbols with cached digits/point - only the tick is read per refresh
+        symbols = _market_watch_symbols()
         if symbols is None:
             return {'success': False, 'error': 'Failed to get symbols', 'symbols': []}
         
         market_data = []
-        for sym in symbols:
-            # Only include symbols that are visible in Market Watch
-            if not sym.visible:
-                continue
-            
+        for name, digits, point in symbols:
             # Get tick data for the symbol
-            tick = mt5.symbol_info_tick(sym.name)
+            tick = mt5.symbol_info_tick(name)
             if tick is None:
                 continue
             
-            # Get symbol info for additional details
-            info = mt5.symbol_info(sym.name)
-            if info is None:
-                continue
-            
-            # Get today's daily bar to calculate daily change
-            # TIMEFRAME_D1 = daily, we get the current day's open
-            daily_bars = mt5.copy_rates_from_pos(sym.name, mt5.TIMEFRAME_D1, 0, 1)
-            
-            daily_open = 0
+            daily_open = _daily_open(name, tick.time) if tick.time > 0 else 0
             daily_change_pct = 0
-            if daily_bars is not None and len(daily_bars) > 0:
-                daily_open = daily_bars[0]['open']
-                current_price = tick.bid if tick.bid > 0 else tick.last
-                if daily_open > 0 and current_price > 0:
-                    daily_change_pct = ((current_price - daily_open) / daily_open) * 100
+            current_price = tick.bid if tick.bid > 0 else tick.last
+            if daily_open > 0 and current_price > 0:
+                daily_change_pct = ((current_price - daily_open) / daily_open) * 100
             
             market_data.append({
-                'symbol': sym.name,
+                'symbol': name,
                 'bid': tick.bid,
                 'ask': tick.ask,
                 'last': tick.last if tick.last > 0 else (tick.bid + tick.ask) / 2,
-                'spread': round((tick.ask - tick.bid) / info.point) if info.point > 0 else 0,
-                'daily_open': round(daily_open, info.digits) if daily_open > 0 else 0,
+                'spread': round((tick.ask - tick.bid) / point) if point > 0 else 0,
+                'daily_open': round(daily_open, digits) if daily_open > 0 else 0,
                 'daily_change': round(daily_change_pct, 2),
                 'time': datetime.fromtimestamp(tick.time).strftime('%H:%M:%S') if tick.time > 0 else '',
-                'digits': info.digits
+                'digits': digits
             })
         
         return {
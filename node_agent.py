@@ -0,0 +1,225 @@
+"""
+Node Agent - runs this machine's pair workers for a dashboard elsewhere
+Masters and children can be spread over several VPSes (terminal limits per
+machine). Each VPS runs an agent: a ProcessManager (with supervisor and
+worker re-adoption) behind a small JSON API, without the dashboard, Flask
+or the license UI. The dashboard aggregates the agents listed in its
+nodes.json (see node_client).
+
+    GET  /status                                         pairs, process status, worker health, load, copy stats
+    POST /pairs/<pair_id>/<start|stop|activate|deactivate>
+    POST /pairs/<pair_id>/children/<child_id>/<start|stop>
+
+Every request must be signed with the node token (node_client.sign_request)
+and carry a nonce the agent has not seen yet.
+The token, name and port come from node_agent.json in the data directory
+(a token is generated on first start and printed); --token/--port/--name
+override it. Pairs are read from this node's own config.json.
+
+Usage: python node_agent.py [--host 0.0.0.0] [--port 5101] [--name NAME] [--token TOKEN]
+       JD_MT5_TradeCopier.exe --agent ...
+
+Several agents can run on one machine for testing: give each its own
+--port and LOCALAPPDATA (data directory).
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import socket
+import signal
+import secrets
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from process_manager import ProcessManager, DATA_DIR
+from stats_segment import read_pair_stats
+from node_client import verify_request, pair_summary, NonceCache, TIME_HEADER, NONCE_HEADER, SIGNATURE_HEADER
+
+AGENT_FILE = 'node_agent.json'
+DEFAULT_PORT = 5101
+MAX_BODY = 64 * 1024
+
+PAIR_ACTION = re.compile(r'^/pairs/([^/]+)/(start|stop|activate|deactivate)$')
+CHILD_ACTION = re.compile(r'^/pairs/([^/]+)/children/([^/]+)/(start|stop)$')
+
+
+def load_agent_settings(argv):
+    """Agent name/host/port/token: node_agent.json, overridden by command line flags"""
+    path = os.path.join(DATA_DIR, AGENT_FILE)
+    try:
+        with open(path, 'r', encoding='utf-8-sig') as f:
+            settings = json.load(f)
+    except (OSError, ValueError):
+        settings = {}
+
+    def arg(name):
+        return argv[argv.index(name) + 1] if name in argv and argv.index(name) + 1 < len(argv) else None
+
+    if not settings.get('token') and not arg('--token'):
+        settings['token'] = secrets.token_urlsafe(32)
+        try:
+            with open(path, 'w') as f:
+                json.dump(settings, f, indent=2)
+            print(f"[*] Generated node token (saved in {path}): {settings['token']}")
+        except OSError as e:
+            print(f"[WARN] Could not save node token: {e}")
+    return {
+        'name': arg('--name') or settings.get('name') or socket.gethostname(),
+        'host': arg('--host') or settings.get('host', '0.0.0.0'),
+        'port': int(arg('--port') or settings.get('port', DEFAULT_PORT)),
+        'token': arg('--token') or settings.get('token')
+    }
+
+
+class NodeAgent:
+    def __init__(self, name, token, process_manager):
+        self.name = name
+        self.token = token
+        self.pm = process_manager
+        self.nonces = NonceCache()
+        self.started = int(time.time() * 1000)
+
+    def status(self):
+        pairs = self.pm.load_config().get('pairs', [])
+        data_dir = os.path.join(DATA_DIR, 'data')
+        return {
+            'success': True,
+            'name': self.name,
+            'started': self.started,
+            'pairs': [pair_summary(p) for p in pairs],
+            'status': self.pm.get_status(),
+            'telemetry': self.pm.get_telemetry(),
+            'stats': {p.get('id'): read_pair_stats(data_dir, p.get('id')) for p in pairs}
+        }
+
+    def pair_action(self, pair_id, action):
+        actions = {
+            'start': self.pm.start_pair,
+            'stop': self.pm.stop_pair,
+            'activate': self.pm.activate_pair,
+            'deactivate': self.pm.deactivate_pair
+        }
+        success, message = actions[action](pair_id)
+        return {'success': success, 'message': message}
+
+    def child_action(self, pair_id, child_id, action):
+        if action == 'stop':
+            success, message = self.pm.stop_child(pair_id, child_id)
+            return {'success': success, 'message': message}
+        pair = next((p for p in self.pm.load_config().get('pairs', []) if p.get('id') == pair_id), None)
+        if not pair:
+            return {'success': False, 'error': 'Pair not found'}
+        child = next((c for c in pair.get('children', []) if c.get('id') == child_id), None)
+        if not child:
+            return {'success': False, 'error': 'Child not found'}
+        success, message = self.pm.start_child(pair_id, child_id, child)
+        return {'success': success, 'message': message}
+
+
+class AgentHandler(BaseHTTPRequestHandler):
+    server_version = 'JDNodeAgent/1.0'
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass  # Requests are not logged; actions are printed by ProcessManager
+
+    def _reply(self, code, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_authorized(self):
+        """Request body if the signature is valid and not replayed, else None (error already sent)"""
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self._reply(400, {'success': False, 'error': 'Invalid Content-Length'})
+            return None
+        if length > MAX_BODY:
+            self._reply(413, {'success': False, 'error': 'Request too large'})
+            return None
+        body = self.rfile.read(length) if length else b''
+        agent = self.server.agent
+        timestamp, nonce = self.headers.get(TIME_HEADER), self.headers.get(NONCE_HEADER)
+        if not verify_request(agent.token, self.command, self.path, timestamp, nonce,
+                              self.headers.get(SIGNATURE_HEADER), body):
+            self._reply(401, {'success': False, 'error': 'Invalid or expired signature'})
+            return None
+        if not agent.nonces.first_use(nonce, timestamp):
+            self._reply(401, {'success': False, 'error': 'Replayed request'})
+            return None
+        return body
+
+    def do_GET(self):
+        if self._read_authorized() is None:
+            return
+        if self.path == '/status':
+            self._reply(200, self.server.agent.status())
+        else:
+            self._reply(404, {'success': False, 'error': 'Not found'})
+
+    def do_POST(self):
+        if self._read_authorized() is None:
+            return
+        agent = self.server.agent
+        try:
+            match = PAIR_ACTION.match(self.path)
+            if match:
+                self._reply(200, agent.pair_action(*match.groups()))
+                return
+            match = CHILD_ACTION.match(self.path)
+            if match:
+                self._reply(200, agent.child_action(*match.groups()))
+                return
+            self._reply(404, {'success': False, 'error': 'Not found'})
+        except Exception as e:
+            self._reply(500, {'success': False, 'error': str(e)})
+
+
+def main(argv=None):
+    argv = argv if argv is not None else sys.argv
+    settings = load_agent_settings(argv)
+
+    pm = ProcessManager()
+    pm.headless = '--console-workers' not in argv
+    adopted = pm.readopt_workers()
+    if adopted:
+        print(f"[*] Re-adopted {adopted} running worker(s)")
+    pm.supervisor.start()
+    pm.governor.start()
+
+    server = ThreadingHTTPServer((settings['host'], settings['port']), AgentHandler)
+    server.daemon_threads = True
+    server.agent = NodeAgent(settings['name'], settings['token'], pm)
+
+    def shutdown(sig, frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, shutdown)
+    print(f"[*] Node agent '{settings['name']}' listening on {settings['host']}:{settings['port']}")
+    print(f"    Data Directory: {DATA_DIR}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        pm.supervisor.stop()
+        pm.governor.stop()
+        if '--keep-workers' in argv:
+            pm._save_registry()
+            print("[*] Leaving workers running - they are re-adopted on next start")
+        else:
+            pm.stop_all()
+        print("[*] Node agent stopped")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+"""
+Node Client - dashboard side of the multi-node API (see node_agent)
+Each remote machine runs a node agent that owns its pair workers; the
+dashboard lists them in nodes.json in its data directory:
+
+    {"nodes": [{"name": "vps-2", "url": "http://10.0.0.12:5101", "token": "..."}]}
+
+Requests are signed with HMAC-SHA256 over method, path, timestamp, a
+random nonce and body under the node's token; the agent rejects unsigned,
+wrongly signed or stale (MAX_CLOCK_SKEW) requests, and a nonce it has seen
+within that window (a captured request cannot be replayed). Calls to
+several nodes run in parallel.
+"""
+
+import os
+import json
+import time
+import hmac
+import hashlib
+import secrets
+import threading
+import urllib.request
+import urllib.error
+from concurrent.futures import ThreadPoolExecutor
+
+NODES_FILE = 'nodes.json'
+STATUS_TIMEOUT = 5  # Seconds for status calls
+COMMAND_TIMEOUT = 150  # Starting a pair waits for all its workers to be ready
+MAX_CLOCK_SKEW = 30  # Seconds a signed request stays valid
+MAX_PARALLEL = 16
+
+TIME_HEADER = 'X-Node-Time'
+NONCE_HEADER = 'X-Node-Nonce'
+SIGNATURE_HEADER = 'X-Node-Signature'
+
+
+def sign_request(token, method, path, timestamp, nonce, body=b''):
+    message = f"{method.upper()}\n{path}\n{timestamp}\n{nonce}\n".encode('utf-8') + body
+    return hmac.new(token.encode('utf-8'), message, hashlib.sha256).hexdigest()
+
+
+def verify_request(token, method, path, timestamp, nonce, signature, body=b''):
+    """True if the signature matches and the timestamp is within MAX_CLOCK_SKEW (see NonceCache for replays)"""
+    try:
+        if abs(time.time() - int(timestamp)) > MAX_CLOCK_SKEW:
+            return False
+    except (TypeError, ValueError):
+        return False
+    if not nonce:
+        return False
+    expected = sign_request(token, method, path, timestamp, nonce, body)
+    return hmac.compare_digest(expected, signature or '')
+
+
+class NonceCache:
+    """Agent side: nonces of accepted requests, kept until their timestamp leaves the MAX_CLOCK_SKEW window"""
+
+    def __init__(self):
+        self.seen = {}  # nonce -> time after which its request is stale anyway
+        self.lock = threading.Lock()
+
+    def first_use(self, nonce, timestamp):
+        """False if the nonce was already used (a replayed request); records it otherwise"""
+        now = time.time()
+        with self.lock:
+            self.seen = {n: expiry for n, expiry in self.seen.items() if expiry >= now}
+            if nonce in self.seen:
+                return False
+            self.seen[nonce] = int(timestamp) + MAX_CLOCK_SKEW
+            return True
+
+
+def pair_summary(pair):
+    """What the dashboard needs to show a pair of any node (no credentials)"""
+    return {
+        'id': pair.get('id'),
+        'name': pair.get('name', pair.get('id')),
+        'enabled': pair.get('enabled', True),
+        'master_account': pair.get('master_account'),
+        'children': [{'id': c.get('id'), 'name': c.get('name', c.get('id')), 'account': c.get('account'),
+                      'enabled': c.get('enabled', True)} for c in pair.get('children', [])]
+    }
+
+
+def load_nodes(data_dir):
+    try:
+        with open(os.path.join(data_dir, NODES_FILE), 'r', encoding='utf-8-sig') as f:
+            return [n for n in json.load(f).get('nodes', []) if n.get('name') and n.get('url')]
+    except (OSError, ValueError):
+        return []
+
+
+def save_nodes(data_dir, nodes):
+    path = os.path.join(data_dir, NODES_FILE)
+    with open(path + '.tmp', 'w') as f:
+        json.dump({'nodes': nodes}, f, indent=2)
+    os.replace(path + '.tmp', path)
+
+
+class NodeClient:
+    def __init__(self):
+        self.executor = ThreadPoolExecutor(max_workers=MAX_PARALLEL, thread_name_prefix='node')
+
+    def call(self, node, method, path, payload=None, timeout=STATUS_TIMEOUT):
+        """
+        One signed request to a node agent. Never raises: failures come back as
+        {'success': False, 'error': ...}. Every result carries 'node' and 'latency_ms'.
+        """
+        body = json.dumps(payload).encode('utf-8') if payload is not None else b''
+        timestamp = str(int(time.time()))
+        nonce = secrets.token_hex(16)
+        request = urllib.request.Request(node['url'].rstrip('/') + path, data=body if method != 'GET' else None,
+                                         method=method)
+        request.add_header('Content-Type', 'application/json')
+        request.add_header(TIME_HEADER, timestamp)
+        request.add_header(NONCE_HEADER, nonce)
+        request.add_header(SIGNATURE_HEADER, sign_request(node.get('token', ''), method, path, timestamp, nonce, body))
+        started = time.time()
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                result = json.loads(response.read().decode('utf-8'))
+        except urllib.error.HTTPError as e:
+            try:
+                result = json.loads(e.read().decode('utf-8'))
+            except Exception:
+                result = {}
+            result = {'success': False, 'error': result.get('error') or f'HTTP {e.code}'}
+        except Exception as e:
+            result = {'success': False, 'error': f'Node unreachable: {getattr(e, "reason", e)}'}
+        result['node'] = node['name']
+        result['latency_ms'] = round((time.time() - started) * 1000, 1)
+        return result
+
+    def fan_out(self, calls):
+        """
+        Run several node calls in parallel.
+        calls is a list of (node, method, path, payload, timeout); results come back in the same order.
+        """
+        futures = [self.executor.submit(self.call, *call) for call in calls]
+        return [future.result() for future in futures]
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Process-wide node client (created on first use)"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = NodeClient()
+        return _client
@@ -0,0 +1,151 @@
+"""
+Price Segment - live ticks published by the master watcher
+The master watcher is already connected to the master terminal, so it
+publishes bid/ask/last for the pair's symbols here instead of the dashboard
+switching an MT5 connection onto that terminal just to read prices.
+
+data/prices_{pair_id}.bin:
+    Header (24 bytes): magic(4) + version(4) + slot_count(4) + slot_size(4) + heartbeat_ms(8)
+    Slots (88 bytes each): seq(8) + symbol(16) + bid(8) + ask(8) + last(8) + point(8)
+                           + daily_open(8) + time_msc(8) + digits(4) + pad(4) + updated_ms(8)
+
+The master watcher is the only writer; each slot is seqlocked (see shm_segment).
+heartbeat_ms is refreshed every loop so readers can tell a stopped watcher
+from a quiet market.
+"""
+
+import os
+import time
+import struct
+
+from shm_segment import open_segment, open_segment_readonly, seqlock_write, seqlock_read, SEQ_SIZE
+
+MAGIC = b'JDPX'
+VERSION = 1
+MAX_SYMBOLS = 64
+STALE_AFTER = 5  # Seconds without a heartbeat before readers ignore the segment
+
+HEADER = struct.Struct('<4sIIIQ')
+HEARTBEAT = struct.Struct('<Q')
+HEARTBEAT_OFFSET = 16
+PAYLOAD = struct.Struct('<16sdddddQI4xQ')
+SLOT_SIZE = SEQ_SIZE + PAYLOAD.size
+SEGMENT_SIZE = HEADER.size + MAX_SYMBOLS * SLOT_SIZE
+
+
+def get_segment_path(data_dir, pair_id):
+    return os.path.join(data_dir, f'prices_{pair_id}.bin')
+
+
+def _slot_offset(slot):
+    return HEADER.size + slot * SLOT_SIZE
+
+
+class PriceWriter:
+    """Master watcher side: one slot per published symbol"""
+
+    def __init__(self, data_dir, pair_id):
+        self.mm = open_segment(get_segment_path(data_dir, pair_id), SEGMENT_SIZE)
+        HEADER.pack_into(self.mm, 0, MAGIC, VERSION, MAX_SYMBOLS, SLOT_SIZE, 0)
+        self.slots = {}  # symbol -> slot
+        self.last_tick = {}  # symbol -> time_msc last written
+        self.set_symbols([])
+
+    def set_symbols(self, symbols):
+        """Assign slots to a new symbol list (all slots are cleared until their next tick)"""
+        symbols = list(dict.fromkeys(symbols))[:MAX_SYMBOLS]
+        self.slots = {symbol: slot for slot, symbol in enumerate(symbols)}
+        self.last_tick = {}
+        empty = PAYLOAD.pack(b'', 0.0, 0.0, 0.0, 0.0, 0.0, 0, 0, 0)
+        for slot in range(MAX_SYMBOLS):
+            seqlock_write(self.mm, _slot_offset(slot), empty)
+
+    def publish(self, symbol, tick, point, digits, daily_open):
+        """Write a symbol's latest tick (skipped when the tick has not changed)"""
+        slot = self.slots.get(symbol)
+        if slot is None or self.last_tick.get(symbol) == tick.time_msc:
+            return
+        seqlock_write(self.mm, _slot_offset(slot),
+                      PAYLOAD.pack(symbol.encode('utf-8')[:16], tick.bid, tick.ask, tick.last, point,
+                                   daily_open, tick.time_msc, digits, int(time.time() * 1000)))
+        self.last_tick[symbol] = tick.time_msc
+
+    def heartbeat(self):
+        HEARTBEAT.pack_into(self.mm, HEARTBEAT_OFFSET, int(time.time() * 1000))
+
+    def close(self):
+        try:
+            self.mm.close()
+        except Exception:
+            pass
+
+
+def _unpack(payload):
+    symbol, bid, ask, last, point, daily_open, time_msc, digits, updated_ms = PAYLOAD.unpack(payload)
+    return {
+        'symbol': symbol.rstrip(b'\x00').decode('utf-8', errors='ignore'),
+        'bid': bid,
+        'ask': ask,
+        'last': last,
+        'point': point,
+        'daily_open': daily_open,
+        'time_msc': time_msc,
+        'digits': digits,
+        'updated_ms': updated_ms
+    }
+
+
+def read_prices(data_dir, pair_id, max_age=STALE_AFTER):
+    """
+    Read all published prices of a pair in slot (Market Watch) order.
+    Returns [price dicts], or None when the segment is missing or its watcher stopped.
+    """
+    mm = open_segment_readonly(get_segment_path(data_dir, pair_id), SEGMENT_SIZE)
+    if mm is None:
+        return None
+    try:
+        magic, version, slots, slot_size, heartbeat_ms = HEADER.unpack_from(mm, 0)
+        if magic != MAGIC or version != VERSION or slot_size != SLOT_SIZE:
+            return None
+        if time.time() * 1000 - heartbeat_ms > max_age * 1000:
+            return None
+        prices = []
+        for slot in range(min(slots, MAX_SYMBOLS)):
+            payload = seqlock_read(mm, _slot_offset(slot), PAYLOAD.size)
+            if not payload:
+                continue
+            price = _unpack(payload)
+            if price['symbol']:
+                prices.append(price)
+        return prices
+    finally:
+        mm.close()
+
+
+class PriceReader:
+    """Keeps a pair's price segment mapped for repeated lookups (child executors)"""
+
+    def __init__(self, data_dir, pair_id):
+        self.path = get_segment_path(data_dir, pair_id)
+        self.mm = None
+
+    def get(self, symbol, max_age=STALE_AFTER):
+        """Latest price dict for one symbol, or None if not published / watcher stopped"""
+        if self.mm is None:
+            self.mm = open_segment_readonly(self.path, SEGMENT_SIZE)
+            if self.mm is None:
+                return None
+        magic, version, slots, slot_size, heartbeat_ms = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC or slot_size != SLOT_SIZE or time.time() * 1000 - heartbeat_ms > max_age * 1000:
+            return None
+        encoded = symbol.encode('utf-8')[:16]
+        for slot in range(min(slots, MAX_SYMBOLS)):
+            offset = _slot_offset(slot) + SEQ_SIZE
+            if self.mm[offset:offset + 16].rstrip(b'\x00') != encoded:
+                continue
+            payload = seqlock_read(self.mm, _slot_offset(slot), PAYLOAD.size)
+            if payload:
+                price = _unpack(payload)
+                if price['symbol'] == symbol:
+                    return price
+        return None
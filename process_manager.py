@@ -0,0 +1,700 @@
+"""
+Process Manager - starts, stops and supervises a node's pair workers
+Owns the master watcher / child executor processes of this machine, the MT5
+terminals opened for activated pairs, the worker supervisor, the resource
+governor (priority, CPU affinity, loop caps) and the worker registry. Used by the launcher (dashboard) and by node_agent, so it must not
+import the dashboard side (Flask, license, storage).
+
+Children of several pairs that log into the same account and terminal share
+one multiplexed executor process (see executor_group); processes[pair_id]
+['children'] then maps each of them to that process and stopping one only
+removes it from the executor's membership.
+"""
+
+import os
+import sys
+import time
+import threading
+import subprocess
+import json
+
+if getattr(sys, 'frozen', False):
+    APP_DIR = os.path.dirname(sys.executable)
+else:
+    APP_DIR = os.path.dirname(os.path.abspath(__file__))
+EXE_PATH = sys.executable
+
+from log_archive import archive_text_log
+from worker_status import read_worker_status, MASTER_ID, READY, FAILED, STOPPED
+from child_state import read_child_states
+from supervisor import Supervisor
+from resource_governor import ResourceGovernor
+from executor_group import executor_key, shared_sessions, save_members
+from worker_registry import (save_registry, load_registry, adopt, adoption_available, live_process,
+                             process_create_time, terminate_processes, worker_segments)
+
+CONFIG_FILE = "config.json"
+MASTER_READY_TIMEOUT = 60  # Seconds for the master to log in and map its segment
+CHILD_READY_TIMEOUT = 60  # Seconds for the children (started together) to get ready
+READY_POLL_INTERVAL = 0.1
+CONSOLE_LOG_MAX_MB = 10  # Headless worker output is archived (log_archive) past this size
+TERMINAL_STOP_TIMEOUT = 5  # Seconds to wait for all of a pair's terminals to close before killing them
+
+def get_data_dir():
+    """Get the data directory for storing config, logs, and data files"""
+    local_appdata = os.environ.get('LOCALAPPDATA', os.path.expanduser('~'))
+    data_dir = os.path.join(local_appdata, 'JD_MT5_TradeCopier')
+    os.makedirs(data_dir, exist_ok=True)
+    os.makedirs(os.path.join(data_dir, 'data'), exist_ok=True)
+    os.makedirs(os.path.join(data_dir, 'logs'), exist_ok=True)
+    return data_dir
+
+DATA_DIR = get_data_dir()
+
+class ProcessManager:
+    """Manages master and child processes for MT5 copier"""
+    
+    def __init__(self):
+        self.processes = {}  # {pair_id: {'master': proc, 'children': {child_id: proc}}}
+        self.activated_pairs = {}  # {pair_id: True/False} - tracks which pairs have MT5 terminals open
+        self.headless = True  # Workers without consoles (--console-workers turns this off for debugging)
+        self.launched = {}  # {(pair_id, worker_id): launch time ms} - readiness older than this is stale
+        self.lock = threading.RLock()  # Serializes starts/stops between API threads and the supervisor
+        self.terminals = {}  # {pair_id: [{'pid', 'create_time', 'path'}]} - MT5 terminals opened by activate_pair
+        self.create_times = {}  # {pid: process creation time} - persisted so a reused pid is never re-adopted
+        self.executors = {}  # {executor key: {'proc', 'members': {(pair_id, child_id): launched_ms}}}
+        self.supervisor = Supervisor(self, os.path.join(DATA_DIR, 'data'))
+        self.governor = ResourceGovernor(self, os.path.join(DATA_DIR, 'data'))
+        self.flask_thread = None
+        
+    def load_config(self):
+        """Load configuration from file"""
+        config_path = os.path.join(DATA_DIR, CONFIG_FILE)
+        if os.path.exists(config_path):
+            with open(config_path, 'r', encoding='utf-8-sig') as f:
+                return json.load(f)
+        return {'pairs': [], 'settings': {}}
+    
+    def save_config(self, config):
+        """Save configuration to file"""
+        config_path = os.path.join(DATA_DIR, CONFIG_FILE)
+        with open(config_path, 'w') as f:
+            json.dump(config, f, indent=2)
+    
+    def get_worker_command(self):
+        """Get the command that starts a worker (handles frozen vs script mode)"""
+        if getattr(sys, 'frozen', False):
+            # Running as EXE - use same EXE with --mode flag
+            return [EXE_PATH]
+        else:
+            # Running as script - same entry point as the EXE
+            return [sys.executable, os.path.join(APP_DIR, 'app_entry.py')]
+    
+    def open_console_log(self, name):
+        """Append handle for a headless worker's output (logs/console_<name>.log, archived when large)"""
+        path = os.path.join(DATA_DIR, 'logs', f'console_{name}.log')
+        try:
+            if os.path.getsize(path) > CONSOLE_LOG_MAX_MB * 1024 * 1024:
+                archive_text_log(path)
+        except OSError:
+            pass
+        except Exception as e:
+            print(f"[WARN] Console log rotation failed: {e}")
+        return open(path, 'ab')
+    
+    def launch_worker(self, args, log_name):
+        """
+        Start a worker process. Headless (the default): no console window, output to
+        its console log, exits when done. With console workers: a console per worker.
+        """
+        cmd = self.get_worker_command() + args
+        priority = self.governor.creation_flags()
+        if not self.headless:
+            return subprocess.Popen(
+                cmd,
+                creationflags=subprocess.CREATE_NEW_CONSOLE | priority if os.name == 'nt' else 0,
+                cwd=APP_DIR
+            )
+        
+        if os.name == 'nt':
+            detach = {'creationflags': subprocess.CREATE_NO_WINDOW | subprocess.CREATE_NEW_PROCESS_GROUP | priority}
+        else:
+            detach = {'start_new_session': True}
+        log = self.open_console_log(log_name)
+        try:
+            return subprocess.Popen(cmd + ['--headless'], stdin=subprocess.DEVNULL, stdout=log,
+                                    stderr=subprocess.STDOUT, cwd=APP_DIR, **detach)
+        finally:
+            log.close()  # The worker has its own handle
+    
+    def start_master(self, pair_id, pair_config, manual=True):
+        """Start master watcher process for a pair"""
+        if manual:
+            self.supervisor.reset(pair_id, MASTER_ID)
+        with self.lock:
+            try:
+                if pair_id in self.processes and 'master' in self.processes[pair_id]:
+                    proc = self.processes[pair_id]['master']
+                    if proc and proc.poll() is None:
+                        return True, "Master already running"
+            
+                self.launched[(pair_id, MASTER_ID)] = int(time.time() * 1000)
+                proc = self.launch_worker(['--master', '--pair-id', pair_id] + self.governor.worker_args(MASTER_ID),
+                                          f'master_{pair_id}')
+                self.governor.place(pair_id, MASTER_ID, proc)
+            
+                if pair_id not in self.processes:
+                    self.processes[pair_id] = {'master': None, 'children': {}}
+                self.processes[pair_id]['master'] = proc
+                self._save_registry()
+            
+                print(f"[*] Started Master for pair {pair_id} (PID: {proc.pid})")
+                return True, f"Master started (PID: {proc.pid})"
+            
+            except Exception as e:
+                return False, f"Failed to start master: {str(e)}"
+    
+    def start_child(self, pair_id, child_id, child_config, manual=True):
+        """Start child executor process (or join the executor shared with other pairs)"""
+        if manual:
+            self.supervisor.reset(pair_id, child_id)
+        with self.lock:
+            try:
+                key = self._executor_for(child_config)
+                if key:
+                    return self._join_executor(key, pair_id, child_id, child_config, manual)
+                
+                if pair_id in self.processes and child_id in self.processes[pair_id].get('children', {}):
+                    proc = self.processes[pair_id]['children'][child_id]
+                    if proc and proc.poll() is None:
+                        return True, "Child already running"
+            
+                self.launched[(pair_id, child_id)] = int(time.time() * 1000)
+                proc = self.launch_worker(['--child', '--pair-id', pair_id, '--child-id', child_id] +
+                                          self.governor.worker_args(child_id, child_config),
+                                          f'child_{pair_id}_{child_id}')
+                self.governor.place(pair_id, child_id, proc)
+            
+                if pair_id not in self.processes:
+                    self.processes[pair_id] = {'master': None, 'children': {}}
+                if 'children' not in self.processes[pair_id]:
+                    self.processes[pair_id]['children'] = {}
+                self.processes[pair_id]['children'][child_id] = proc
+                self._save_registry()
+            
+                print(f"[*] Started Child {child_id} for pair {pair_id} (PID: {proc.pid})")
+                return True, f"Child started (PID: {proc.pid})"
+            
+            except Exception as e:
+                return False, f"Failed to start child: {str(e)}"
+    
+    def _executor_for(self, child_config):
+        """Executor key if this child's session is shared by several pairs and multiplexing is on, else None"""
+        config = self.load_config()
+        if not config.get('settings', {}).get('multiplex_children', True):
+            return None
+        key = executor_key(child_config)
+        return key if key in shared_sessions(config) else None
+    
+    def _join_executor(self, key, pair_id, child_id, child_config, manual):
+        """Add a pair-child to its executor's membership, launching the executor if it is not running; caller holds the lock"""
+        executor = self.executors.get(key)
+        running = executor and executor['proc'].poll() is None
+        if running and manual and (pair_id, child_id) in executor['members']:
+            return True, "Child already running"
+        
+        # A new launched_ms makes a running executor (re)start this pair-child's follower
+        self.launched[(pair_id, child_id)] = int(time.time() * 1000)
+        if not running:
+            executor = self.executors[key] = {'proc': None, 'members': executor['members'] if executor else {}}
+        executor['members'][(pair_id, child_id)] = self.launched[(pair_id, child_id)]
+        save_members(os.path.join(DATA_DIR, 'data'), key,
+                     [(p, c, ms) for (p, c), ms in executor['members'].items()])
+        if not running:
+            executor['proc'] = self.launch_worker(['--child', '--executor', key] +
+                                                  self.governor.worker_args(child_id, child_config),
+                                                  f'executor_{key}')
+            print(f"[*] Started Executor {key} (PID: {executor['proc'].pid})")
+        proc = executor['proc']
+        self.governor.place(pair_id, child_id, proc)
+        
+        self.processes.setdefault(pair_id, {'master': None, 'children': {}}).setdefault('children', {})[child_id] = proc
+        self._save_registry()
+        
+        print(f"[*] Child {child_id} for pair {pair_id} joined Executor {key} (PID: {proc.pid})")
+        return True, f"Child started in shared executor (PID: {proc.pid})"
+    
+    def executor_of(self, pair_id, child_id):
+        """Key of the executor running this pair-child, or None"""
+        for key, executor in self.executors.items():
+            if (pair_id, child_id) in executor['members']:
+                return key
+        return None
+    
+    def leave_executor(self, pair_id, child_id):
+        """
+        Remove a pair-child from its executor's membership. Returns True if the
+        executor keeps running for other members; False if it was the last member
+        (or not in an executor) and the process should be stopped.
+        """
+        with self.lock:
+            key = self.executor_of(pair_id, child_id)
+            if key is None:
+                return False
+            executor = self.executors[key]
+            del executor['members'][(pair_id, child_id)]
+            save_members(os.path.join(DATA_DIR, 'data'), key,
+                         [(p, c, ms) for (p, c), ms in executor['members'].items()])
+            if executor['members'] and executor['proc'].poll() is None:
+                return True
+            del self.executors[key]
+            return False
+    
+    def stop_master(self, pair_id):
+        """Stop master watcher process"""
+        with self.lock:
+            try:
+                if pair_id not in self.processes or not self.processes[pair_id].get('master'):
+                    return True, "Master not running"
+            
+                proc = self.processes[pair_id]['master']
+                if proc and proc.poll() is None:
+                    proc.terminate()
+                    try:
+                        proc.wait(timeout=3)
+                    except:
+                        proc.kill()
+                    print(f"[*] Stopped Master for pair {pair_id}")
+            
+                self.processes[pair_id]['master'] = None
+                self.governor.release(pair_id, MASTER_ID, proc)
+                self._save_registry()
+            
+                # Clean up shared memory file
+                shared_file = os.path.join(DATA_DIR, 'data', f'shared_positions_{pair_id}.bin')
+                if os.path.exists(shared_file):
+                    try:
+                        os.remove(shared_file)
+                    except:
+                        pass
+            
+                return True, "Master stopped"
+            except Exception as e:
+                return False, f"Failed to stop master: {str(e)}"
+    
+    def stop_child(self, pair_id, child_id):
+        """Stop child executor process"""
+        with self.lock:
+            try:
+                if pair_id not in self.processes or child_id not in self.processes[pair_id].get('children', {}):
+                    return True, "Child not running"
+            
+                proc = self.processes[pair_id]['children'][child_id]
+                if self.leave_executor(pair_id, child_id):
+                    print(f"[*] Child {child_id} for pair {pair_id} left its shared executor")
+                elif proc and proc.poll() is None:
+                    proc.terminate()
+                    try:
+                        proc.wait(timeout=3)
+                    except:
+                        proc.kill()
+                    print(f"[*] Stopped Child {child_id} for pair {pair_id}")
+            
+                del self.processes[pair_id]['children'][child_id]
+                self.governor.release(pair_id, child_id, proc)
+                self._save_registry()
+                return True, "Child stopped"
+            except Exception as e:
+                return False, f"Failed to stop child: {str(e)}"
+    
+    def start_pair(self, pair_id):
+        """Start all processes for a pair (master + all enabled children)"""
+        # Check if pair is activated first
+        if not self.activated_pairs.get(pair_id, False):
+            return False, "Please activate the pair first"
+        
+        config = self.load_config()
+        pair = next((p for p in config.get('pairs', []) if p.get('id') == pair_id), None)
+        
+        if not pair:
+            return False, "Pair not found"
+        
+        if not pair.get('enabled', True):
+            return False, "Pair is disabled"
+        
+        # Start master and wait until it is logged in with its segment mapped
+        success, msg = self.start_master(pair_id, pair)
+        if not success:
+            return False, msg
+        
+        failed = self.wait_ready(pair_id, [MASTER_ID], MASTER_READY_TIMEOUT)
+        if failed:
+            return False, f"Master not ready: {failed[MASTER_ID]}"
+        
+        # Start all enabled children together, then wait for all of them
+        children = [c for c in pair.get('children', []) if c.get('enabled', True)]
+        names = {c.get('id'): c.get('name') or c.get('id') for c in children}
+        started = []
+        failed = {}
+        for child in children:
+            child_id = child.get('id')
+            success, msg = self.start_child(pair_id, child_id, child)
+            if success:
+                started.append(child_id)
+            else:
+                failed[child_id] = msg
+        failed.update(self.wait_ready(pair_id, started, CHILD_READY_TIMEOUT))
+        
+        if failed:
+            ready = len(children) - len(failed)
+            details = '; '.join(f"{names.get(child_id, child_id)}: {reason}" for child_id, reason in failed.items())
+            return False, f"Master ready, {ready}/{len(children)} children ready - failed: {details}"
+        return True, f"Started master and {len(started)} children (all ready)"
+    
+    def wait_ready(self, pair_id, worker_ids, timeout):
+        """
+        Wait until the given workers of a pair report ready in its worker status segment.
+        Returns {worker_id: reason} for workers that failed, exited or timed out ({} when all are ready).
+        """
+        data_dir = os.path.join(DATA_DIR, 'data')
+        pending = list(worker_ids)
+        failed = {}
+        deadline = time.time() + timeout
+        while pending:
+            status = read_worker_status(data_dir, pair_id)
+            for worker_id in list(pending):
+                slot = status.get(worker_id)
+                if slot and slot['started_ms'] < self.launched.get((pair_id, worker_id), 0):
+                    slot = None  # Left over from a previous run
+                procs = self.processes.get(pair_id, {})
+                proc = procs.get('master') if worker_id == MASTER_ID else procs.get('children', {}).get(worker_id)
+                
+                if slot and slot['state'] == READY:
+                    pending.remove(worker_id)
+                elif slot and slot['state'] in (FAILED, STOPPED):
+                    failed[worker_id] = slot['message'] or 'stopped before ready'
+                    pending.remove(worker_id)
+                elif proc is None or proc.poll() is not None:
+                    failed[worker_id] = f"exited with code {proc.returncode if proc else '?'}"
+                    pending.remove(worker_id)
+            if pending and time.time() >= deadline:
+                for worker_id in pending:
+                    failed[worker_id] = f"not ready after {timeout}s"
+                break
+            if pending:
+                time.sleep(READY_POLL_INTERVAL)
+        return failed
+    
+    def stop_pair(self, pair_id):
+        """Stop all processes for a pair"""
+        # Stop all children first
+        if pair_id in self.processes:
+            children_ids = list(self.processes[pair_id].get('children', {}).keys())
+            for child_id in children_ids:
+                self.stop_child(pair_id, child_id)
+        
+        # Stop master
+        self.stop_master(pair_id)
+        
+        return True, "Pair stopped"
+    
+    def activate_pair(self, pair_id):
+        """Activate a pair - opens MT5 terminals for all accounts"""
+        try:
+            config = self.load_config()
+            pair = next((p for p in config.get('pairs', []) if p.get('id') == pair_id), None)
+            
+            if not pair:
+                return False, "Pair not found"
+            
+            launched = []
+            
+            # Open master MT5 terminal - strip whitespace, newlines, and quotes
+            master_terminal = pair.get('master_terminal', '').strip().strip('"').strip("'")
+            if master_terminal and os.path.exists(master_terminal):
+                try:
+                    proc = subprocess.Popen([master_terminal], creationflags=subprocess.DETACHED_PROCESS if os.name == 'nt' else 0)
+                    launched.append(self._terminal_entry(proc, master_terminal))
+                    print(f"[*] Opened MT5 terminal for master: {master_terminal}")
+                except Exception as e:
+                    print(f"[!] Failed to open master terminal: {e}")
+            
+            # Open child MT5 terminals
+            for child in pair.get('children', []):
+                child_terminal = child.get('terminal', '').strip().strip('"').strip("'")
+                if child_terminal and os.path.exists(child_terminal):
+                    try:
+                        # Check if this terminal is already open (same as master)
+                        if child_terminal != master_terminal:
+                            proc = subprocess.Popen([child_terminal], creationflags=subprocess.DETACHED_PROCESS if os.name == 'nt' else 0)
+                            launched.append(self._terminal_entry(proc, child_terminal))
+                            print(f"[*] Opened MT5 terminal for child {child.get('id')}: {child_terminal}")
+                    except Exception as e:
+                        print(f"[!] Failed to open child terminal: {e}")
+            
+            # Mark pair as activated - terminals finish starting in the background;
+            # start_pair waits for each worker to report ready instead of a fixed delay.
+            # The launched PIDs let deactivate_pair stop exactly these terminals.
+            with self.lock:
+                still_open = [e for e in self.terminals.get(pair_id, []) if live_process(e)]
+                self.terminals[pair_id] = still_open + launched
+                self.activated_pairs[pair_id] = True
+                self._save_registry()
+            
+            return True, "Pair activated - MT5 terminals are now connected"
+            
+        except Exception as e:
+            return False, f"Failed to activate pair: {str(e)}"
+    
+    def _terminal_entry(self, proc, terminal_path):
+        return {
+            'pid': proc.pid,
+            'create_time': process_create_time(proc.pid),
+            'path': os.path.normpath(terminal_path).lower()
+        }
+    
+    def deactivate_pair(self, pair_id):
+        """Deactivate a pair - closes MT5 terminals"""
+        try:
+            # Check if copier is running - must stop first
+            if pair_id in self.processes:
+                master_running = self.processes[pair_id].get('master') and self.processes[pair_id]['master'].poll() is None
+                if master_running:
+                    return False, "Please stop the copier first"
+            
+            config = self.load_config()
+            pair = next((p for p in config.get('pairs', []) if p.get('id') == pair_id), None)
+            
+            if not pair:
+                return False, "Pair not found"
+            
+            if not adoption_available():
+                # psutil not available, just mark as deactivated
+                with self.lock:
+                    self.activated_pairs[pair_id] = False
+                    self.terminals.pop(pair_id, None)
+                    self._save_registry()
+                return True, "Pair deactivated (psutil not available - terminals may still be open)"
+            
+            # Strip whitespace, newlines, and quotes from terminal paths
+            terminal_paths = set()
+            for path in [pair.get('master_terminal', '')] + [c.get('terminal', '') for c in pair.get('children', [])]:
+                path = path.strip().strip('"').strip("'")
+                if path:
+                    terminal_paths.add(os.path.normpath(path).lower())
+            
+            # Terminals launched by activate_pair: exact PIDs (creation time checked), no scan
+            to_close = {}
+            for entry in self.terminals.get(pair_id, []):
+                proc = live_process(entry)
+                if proc:
+                    to_close[proc.pid] = proc
+                    terminal_paths.discard(entry['path'])
+            
+            # Fallback: scan for terminals we did not launch (opened by hand, or by an older launcher)
+            if terminal_paths and os.name == 'nt':
+                for proc in self._scan_terminals(terminal_paths):
+                    to_close.setdefault(proc.pid, proc)
+            
+            for proc in to_close.values():
+                print(f"[*] Closing MT5 terminal PID {proc.pid}")
+            closed_count = terminate_processes(to_close.values(), TERMINAL_STOP_TIMEOUT)
+            
+            # Mark pair as deactivated
+            with self.lock:
+                self.activated_pairs[pair_id] = False
+                self.terminals.pop(pair_id, None)
+                self._save_registry()
+            
+            if closed_count > 0:
+                return True, f"Pair deactivated - closed {closed_count} MT5 terminal(s)"
+            else:
+                return True, "Pair deactivated (no matching terminals found)"
+            
+        except Exception as e:
+            return False, f"Failed to deactivate pair: {str(e)}"
+    
+    def _scan_terminals(self, terminals_to_close):
+        """Find running MT5 terminals for the given (normalized, lowercase) paths by scanning all processes"""
+        import psutil
+        terminal_dirs = {os.path.dirname(p) for p in terminals_to_close if os.path.dirname(p)}
+        print(f"[DEBUG] Scanning for terminals: {terminals_to_close}")
+        
+        found = []
+        for proc in psutil.process_iter(['pid', 'name', 'exe', 'cmdline', 'cwd']):
+            try:
+                proc_name = (proc.info.get('name') or '').lower()
+                proc_exe = (proc.info.get('exe') or '').lower()
+                proc_cwd = (proc.info.get('cwd') or '').lower()
+                proc_cmdline = proc.info.get('cmdline') or []
+                
+                # Check if this is an MT5 terminal
+                if 'terminal64.exe' not in proc_name and 'terminal.exe' not in proc_name:
+                    continue
+                should_close = False
+                
+                # Method 1: Check exe path
+                if proc_exe:
+                    norm_exe = os.path.normpath(proc_exe).lower()
+                    exe_dir = os.path.dirname(norm_exe).lower()
+                    if norm_exe in terminals_to_close or exe_dir in terminal_dirs:
+                        should_close = True
+                        print(f"[DEBUG] Match by exe path: {norm_exe}")
+                
+                # Method 2: Check cwd (current working directory)
+                if not should_close and proc_cwd:
+                    norm_cwd = os.path.normpath(proc_cwd).lower()
+                    if norm_cwd in terminal_dirs or any(d in norm_cwd for d in terminal_dirs):
+                        should_close = True
+                        print(f"[DEBUG] Match by cwd: {norm_cwd}")
+                
+                # Method 3: Check cmdline for terminal path
+                if not should_close and proc_cmdline:
+                    cmdline_str = ' '.join(proc_cmdline).lower()
+                    for term_dir in terminal_dirs:
+                        if term_dir in cmdline_str:
+                            should_close = True
+                            print(f"[DEBUG] Match by cmdline: {cmdline_str}")
+                            break
+                
+                if should_close:
+                    found.append(proc)
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                pass
+        return found
+    
+    def _save_registry(self):
+        """Mirror running workers and activated pairs to data/workers.json (see worker_registry)"""
+        data_dir = os.path.join(DATA_DIR, 'data')
+        workers = []
+        with self.lock:
+            for pair_id, procs in self.processes.items():
+                entries = [(MASTER_ID, procs.get('master'))] + list(procs.get('children', {}).items())
+                for worker_id, proc in entries:
+                    if not proc or proc.poll() is not None:
+                        continue
+                    if proc.pid not in self.create_times:
+                        self.create_times[proc.pid] = process_create_time(proc.pid)
+                    workers.append({
+                        'pair_id': pair_id,
+                        'worker_id': worker_id,
+                        'pid': proc.pid,
+                        'create_time': self.create_times[proc.pid],
+                        'launched_ms': self.launched.get((pair_id, worker_id), 0),
+                        'executor': self.executor_of(pair_id, worker_id) if worker_id != MASTER_ID else None,
+                        'segments': worker_segments(data_dir, pair_id, worker_id, MASTER_ID)
+                    })
+            save_registry(data_dir, workers, self.activated_pairs, self.terminals)
+    
+    def readopt_workers(self):
+        """Take over workers a previous launcher left running - copying continues uninterrupted"""
+        registry = load_registry(os.path.join(DATA_DIR, 'data'))
+        if registry['workers'] and not adoption_available():
+            print("[WARN] psutil not available - workers from the previous launcher cannot be re-adopted")
+        adopted = 0
+        shared = {}  # {pid: AdoptedProcess} - members of one executor share the process
+        with self.lock:
+            self.activated_pairs.update(registry['activated'])
+            self.terminals.update(registry['terminals'])
+            for entry in registry['workers']:
+                proc = shared.get(entry['pid']) if entry.get('executor') else None
+                proc = proc or adopt(entry)
+                if proc is None:
+                    continue
+                pair_id, worker_id = entry['pair_id'], entry['worker_id']
+                procs = self.processes.setdefault(pair_id, {'master': None, 'children': {}})
+                if worker_id == MASTER_ID:
+                    procs['master'] = proc
+                else:
+                    procs['children'][worker_id] = proc
+                if entry.get('executor'):
+                    shared[proc.pid] = proc
+                    executor = self.executors.setdefault(entry['executor'], {'proc': proc, 'members': {}})
+                    executor['members'][(pair_id, worker_id)] = entry.get('launched_ms', 0)
+                self.launched[(pair_id, worker_id)] = entry.get('launched_ms', 0)
+                self.create_times[proc.pid] = entry['create_time']
+                adopted += 1
+                print(f"[*] Re-adopted {worker_id} for pair {pair_id} (PID: {proc.pid})")
+            self._save_registry()
+        return adopted
+    
+    def stop_all(self):
+        """Stop all processes"""
+        pair_ids = list(self.processes.keys())
+        for pair_id in pair_ids:
+            self.stop_pair(pair_id)
+    
+    def get_status(self):
+        """Get status of all processes"""
+        status = {}
+        
+        # Include all activated pairs
+        for pair_id in self.activated_pairs:
+            if pair_id not in status:
+                status[pair_id] = {
+                    'master': False,
+                    'activated': self.activated_pairs.get(pair_id, False),
+                    'children': {}
+                }
+        
+        # Update with process status
+        for pair_id, procs in self.processes.items():
+            master_running = procs.get('master') and procs['master'].poll() is None
+            children_status = {}
+            for child_id, proc in procs.get('children', {}).items():
+                children_status[child_id] = proc and proc.poll() is None
+            
+            if pair_id not in status:
+                status[pair_id] = {
+                    'master': master_running,
+                    'activated': self.activated_pairs.get(pair_id, False),
+                    'children': children_status
+                }
+            else:
+                status[pair_id]['master'] = master_running
+                status[pair_id]['children'] = children_status
+        
+        # Restart history and time to recovery per worker (changes only when a worker fails
+        # or recovers - load figures are in get_telemetry so the status stays cacheable)
+        for pair_id in status:
+            status[pair_id]['workers'] = self.supervisor.get_status(pair_id)
+        
+        return status
+    
+    def get_telemetry(self):
+        """Per-worker load of running pairs: {pair_id: {worker_id: {'resources', 'copy'}}}
+
+        'resources' is the latest CPU% / loop rate sample (resource governor),
+        'copy' a child's copy latency and last error from the child state segment.
+        These change with every sample, so they are served apart from get_status.
+        """
+        telemetry = {}
+        data_dir = os.path.join(DATA_DIR, 'data')
+        for pair_id, procs in list(self.processes.items()):
+            workers = {}
+            for worker_id, sample in self.governor.get_status(pair_id).items():
+                workers.setdefault(worker_id, {})['resources'] = sample
+            running = procs.get('children', {})
+            for child_id, state in read_child_states(data_dir, pair_id).items():
+                if child_id in running:
+                    workers.setdefault(child_id, {})['copy'] = {
+                        key: state[key] for key in ('copies', 'latency_ms', 'avg_latency_ms', 'max_latency_ms',
+                                                    'last_error', 'error_time')}
+            telemetry[pair_id] = workers
+        return telemetry
+    
+    def is_pair_running(self, pair_id):
+        """Check if a pair is running (master + at least one child)"""
+        if pair_id not in self.processes:
+            return False
+        
+        master_running = self.processes[pair_id].get('master') and self.processes[pair_id]['master'].poll() is None
+        if not master_running:
+            return False
+        
+        # Check if any child is running
+        for proc in self.processes[pair_id].get('children', {}).values():
+            if proc and proc.poll() is None:
+                return True
+        
+        return False
@@ -0,0 +1,119 @@
+"""
+Read Model - live account state for the dashboard from the shared segments
+The master watcher and child executors already write balance, equity and
+positions every loop; the dashboard reads them here instead of switching an
+MT5 connection onto each terminal. Terminal fetches are only needed for
+history, or for accounts whose process is not running.
+
+Segments:
+    data/shared_positions_{pair}.bin  (master watcher)
+        Header (32): timestamp_ms(8) + balance(8) + equity(8) + pos_count(4) + order_count(4)
+        Positions (50 x 48): ticket(8) + type(1) + volume(8) + sl(8) + tp(8) + symbol(15)
+        Orders (20 x 64): ticket(8) + type(1) + volume(8) + price(8) + sl(8) + tp(8) + symbol(15) + pad(8)
+        Position details (50 x 16): price_open(8) + profit(8), same order as positions
+    data/children_{pair}.bin  (child executors, one slot each - see child_state)
+
+Every result carries 'updated' (writer timestamp, ms) and 'age_ms'; 'fresh'
+is False once the writer has not updated for STALE_AFTER seconds. For a
+child 'updated' is its last MT5 poll: it only publishes positions when
+they change, but confirms them with every heartbeat.
+"""
+
+import os
+import time
+import struct
+
+from child_state import read_child_states
+
+STALE_AFTER = 5  # Seconds
+
+MASTER_HEADER = struct.Struct('<QddII')
+MASTER_POSITION = struct.Struct('<QBddd15s')
+MASTER_ORDER = struct.Struct('<QBdddd15s8x')
+POSITION_DETAIL = struct.Struct('<dd')
+MAX_POSITIONS = 50
+MAX_ORDERS = 20
+DETAILS_OFFSET = MASTER_HEADER.size + MAX_POSITIONS * MASTER_POSITION.size + MAX_ORDERS * MASTER_ORDER.size
+
+READ_ATTEMPTS = 3  # Segments are rewritten in place; retry until two reads agree
+
+
+def _read_stable(path):
+    """Read a segment file, retrying while the writer is mid-update"""
+    previous = None
+    for _ in range(READ_ATTEMPTS):
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        if data == previous:
+            return data
+        previous = data
+    return previous
+
+
+def _symbol(raw):
+    return raw.rstrip(b'\x00').decode('utf-8', errors='ignore')
+
+
+def _freshness(timestamp_ms):
+    age_ms = max(0, int(time.time() * 1000) - timestamp_ms)
+    return {'updated': timestamp_ms, 'age_ms': age_ms, 'fresh': timestamp_ms > 0 and age_ms <= STALE_AFTER * 1000}
+
+
+def read_master(data_dir, pair_id):
+    """Master account state from its shared segment, or None if there is no segment"""
+    data = _read_stable(os.path.join(data_dir, f'shared_positions_{pair_id}.bin'))
+    if not data or len(data) < MASTER_HEADER.size:
+        return None
+    timestamp, balance, equity, pos_count, ord_count = MASTER_HEADER.unpack_from(data, 0)
+    has_details = len(data) >= DETAILS_OFFSET + MAX_POSITIONS * POSITION_DETAIL.size
+
+    positions = []
+    for i in range(min(pos_count, MAX_POSITIONS)):
+        offset = MASTER_HEADER.size + i * MASTER_POSITION.size
+        ticket, pos_type, volume, sl, tp, symbol = MASTER_POSITION.unpack_from(data, offset)
+        price_open, profit = POSITION_DETAIL.unpack_from(data, DETAILS_OFFSET + i * POSITION_DETAIL.size) if has_details else (0.0, 0.0)
+        positions.append({
+            'ticket': ticket, 'symbol': _symbol(symbol), 'type': pos_type,
+            'volume': volume, 'sl': sl, 'tp': tp,
+            'price_open': price_open, 'profit': round(profit, 2)
+        })
+
+    orders = []
+    orders_offset = MASTER_HEADER.size + MAX_POSITIONS * MASTER_POSITION.size
+    for i in range(min(ord_count, MAX_ORDERS)):
+        ticket, ord_type, volume, price, sl, tp, symbol = MASTER_ORDER.unpack_from(data, orders_offset + i * MASTER_ORDER.size)
+        orders.append({
+            'ticket': ticket, 'symbol': _symbol(symbol), 'type': ord_type,
+            'volume': volume, 'price': price, 'sl': sl, 'tp': tp
+        })
+
+    return dict(_freshness(timestamp), balance=round(balance, 2), equity=round(equity, 2),
+                positions=positions, orders=orders)
+
+
+def _child_result(state):
+    return dict(_freshness(state['checked']), balance=round(state['balance'], 2), equity=round(state['equity'], 2),
+                positions=state['positions'], orders=[])
+
+
+def read_children(data_dir, pair_id):
+    """{child_id: state} of every child of a pair with a state slot, in one pass over its segment"""
+    return {child_id: _child_result(state) for child_id, state in read_child_states(data_dir, pair_id).items()}
+
+
+def read_child(data_dir, pair_id, child_id):
+    """Child account state from its state slot, or None if it has none"""
+    return read_children(data_dir, pair_id).get(child_id)
+
+
+def read_pair(data_dir, pair):
+    """Master and child state of a pair: {'master': state|None, 'children': {child_id: state|None}}"""
+    pair_id = pair.get('id')
+    children = read_children(data_dir, pair_id)
+    return {
+        'master': read_master(data_dir, pair_id),
+        'children': {c.get('id'): children.get(c.get('id')) for c in pair.get('children', [])}
+    }
@@ -0,0 +1,230 @@
+"""
+Resource Governor - CPU placement, priorities and loop budgets for workers
+With dozens of child executors (each polling every 10 ms) and their MT5
+terminals on one VPS, the workers starve each other and the dashboard
+competes with them, so copy latency spikes for every pair at once. The
+governor, owned by ProcessManager:
+
+- runs masters and children in a higher priority class than the dashboard
+  (Windows: set at process creation and re-applied to the whole process
+  tree; elsewhere a lower nice value, which needs privileges - without them
+  workers stay at the dashboard's priority),
+- sets each worker's CPU affinity from the worker cores (every core except
+  the first reserved_cores, left to the dashboard, terminals and the OS):
+  'spread' pins each worker to the least used worker core, 'shared' lets
+  every worker use all worker cores, 'off' leaves affinity alone,
+- gives each worker its main-loop cap (--max-loop-hz, see worker_status.LoopBudget),
+- samples per-worker CPU% (process tree, so the worker under a onefile
+  bootloader is counted; 100% = one core) and the loop rate the worker
+  publishes, once per SAMPLE_INTERVAL, for the dashboard and node agents
+  (ProcessManager.get_telemetry, kept out of the process status).
+
+Placement is per process: the pair-children of a shared executor (see
+executor_group) are one process, placed once and sampled once.
+
+Settings (config.json "settings"):
+    worker_priority     'above_normal' (default), 'high' or 'normal'
+    worker_affinity     'spread' (default), 'shared' or 'off'
+    reserved_cores      1 (ignored on machines with 2 cores or fewer)
+    master_max_loop_hz  MASTER_LOOP_HZ
+    child_max_loop_hz   CHILD_LOOP_HZ (a child's own max_loop_hz overrides it)
+
+Priority, affinity and sampling need psutil; without it only the loop caps apply.
+"""
+
+import os
+import threading
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+from worker_status import read_worker_status, MASTER_ID, MASTER_LOOP_HZ, CHILD_LOOP_HZ
+
+SAMPLE_INTERVAL = 5.0  # Seconds between CPU / loop rate samples (and placement re-checks)
+DEFAULT_PRIORITY = 'above_normal'
+DEFAULT_AFFINITY = 'spread'
+DEFAULT_RESERVED_CORES = 1
+
+# Windows priority class / POSIX nice value per setting
+if os.name == 'nt' and psutil is not None:
+    PRIORITY_CLASSES = {
+        'normal': psutil.NORMAL_PRIORITY_CLASS,
+        'above_normal': psutil.ABOVE_NORMAL_PRIORITY_CLASS,
+        'high': psutil.HIGH_PRIORITY_CLASS
+    }
+else:
+    PRIORITY_CLASSES = {'normal': 0, 'above_normal': -5, 'high': -10}
+
+
+class ResourceGovernor:
+    def __init__(self, process_manager, data_dir):
+        self.pm = process_manager
+        self.data_dir = data_dir
+        self.cores = {}  # pid -> [cores] assigned by 'spread' / 'shared'
+        self.tracked = {}  # pid -> psutil.Process, kept so cpu_percent measures since the last sample
+        self.samples = {}  # pair_id -> {worker_id: {'cpu', 'rss_mb', 'loop_hz', 'cores'}}
+        self.warned = set()
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        if self.thread is None and psutil is not None:
+            self.thread = threading.Thread(target=self._run, name='governor', daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def _run(self):
+        while not self.stop_event.wait(SAMPLE_INTERVAL):
+            try:
+                self.sample()
+            except Exception as e:
+                print(f"[WARN] Resource sample failed: {e}")
+
+    def _warn_once(self, key, message):
+        if key not in self.warned:
+            self.warned.add(key)
+            print(f"[WARN] {message}")
+
+    def settings(self):
+        return self.pm.load_config().get('settings', {})
+
+    def worker_args(self, worker_id, child_config=None):
+        """Extra worker command line: the main-loop cap from config"""
+        settings = self.settings()
+        if worker_id == MASTER_ID:
+            hz = settings.get('master_max_loop_hz') or MASTER_LOOP_HZ
+        else:
+            hz = (child_config or {}).get('max_loop_hz') or settings.get('child_max_loop_hz') or CHILD_LOOP_HZ
+        return ['--max-loop-hz', str(hz)]
+
+    def creation_flags(self):
+        """Popen creationflags giving a new worker its priority class from the start (Windows only)"""
+        if os.name != 'nt' or psutil is None:
+            return 0
+        return PRIORITY_CLASSES.get(self.settings().get('worker_priority', DEFAULT_PRIORITY), 0)
+
+    def worker_cores(self, settings):
+        """Cores workers may run on: all but the reserved ones (all of them on small machines)"""
+        cores = list(range(psutil.cpu_count() or 1))
+        reserved = int(settings.get('reserved_cores', DEFAULT_RESERVED_CORES))
+        if len(cores) > 2 and 0 < reserved < len(cores):
+            cores = cores[reserved:]
+        return cores
+
+    def _assign(self, key, mode, cores):
+        """Cores for one worker; 'spread' keeps a worker on its core and gives new ones the least used core"""
+        if mode == 'shared':
+            return cores
+        assigned = self.cores.get(key)
+        if assigned and set(assigned) <= set(cores):
+            return assigned
+        load = {core: 0 for core in cores}
+        for other, other_cores in self.cores.items():
+            if other != key and len(other_cores) == 1 and other_cores[0] in load:
+                load[other_cores[0]] += 1
+        return [min(cores, key=lambda core: (load[core], core))]
+
+    def place(self, pair_id, worker_id, proc, settings=None):
+        """Apply priority and affinity to a worker's process tree (idempotent, cheap when already set)"""
+        if psutil is None or proc is None:
+            return
+        settings = settings if settings is not None else self.settings()
+        priority = PRIORITY_CLASSES.get(settings.get('worker_priority', DEFAULT_PRIORITY))
+        mode = settings.get('worker_affinity', DEFAULT_AFFINITY)
+        key = proc.pid
+        with self.lock:
+            if mode in ('spread', 'shared') and hasattr(psutil.Process, 'cpu_affinity'):
+                self.cores[key] = self._assign(key, mode, self.worker_cores(settings))
+            else:
+                self.cores.pop(key, None)
+            cores = self.cores.get(key)
+        for process in self._tree(proc.pid):
+            try:
+                if priority is not None and process.nice() != priority:
+                    process.nice(priority)
+            except psutil.AccessDenied:
+                self._warn_once('priority', "Not permitted to raise worker priority - workers run at normal priority")
+            except psutil.Error:
+                pass
+            try:
+                if cores and sorted(process.cpu_affinity()) != cores:
+                    process.cpu_affinity(cores)
+            except psutil.Error as e:
+                self._warn_once('affinity', f"Could not set worker CPU affinity: {e}")
+
+    def release(self, pair_id, worker_id, proc=None):
+        """Worker stopped: its core counts as free again (once its process exited - executors keep theirs)"""
+        with self.lock:
+            if proc is not None and proc.poll() is not None:
+                self.cores.pop(proc.pid, None)
+            self.samples.get(pair_id, {}).pop(worker_id, None)
+
+    def _tree(self, pid):
+        """The worker process and its children (cached psutil.Process objects)"""
+        process = self.tracked.get(pid)
+        if process is None:
+            try:
+                process = self.tracked[pid] = psutil.Process(pid)
+            except psutil.Error:
+                return []
+        tree = [process]
+        try:
+            for child in process.children(recursive=True):
+                tree.append(self.tracked.setdefault(child.pid, child))
+        except psutil.Error:
+            pass
+        return tree
+
+    def sample(self):
+        """Measure CPU% / memory of every running worker, attach its published loop rate, re-apply placement"""
+        settings = self.settings()
+        with self.pm.lock:
+            workers = []
+            for pair_id, procs in self.pm.processes.items():
+                entries = [(MASTER_ID, procs.get('master'))] + list(procs.get('children', {}).items())
+                workers += [(pair_id, worker_id, proc) for worker_id, proc in entries
+                            if proc and proc.poll() is None]
+        samples = {}
+        seen = set()
+        statuses = {}
+        usage = {}  # pid -> (cpu, rss): an executor is measured once for all of its pair-children
+        for pair_id, worker_id, proc in workers:
+            if proc.pid not in usage:
+                self.place(pair_id, worker_id, proc, settings)
+                cpu = 0.0
+                rss = 0
+                for process in self._tree(proc.pid):
+                    seen.add(process.pid)
+                    try:
+                        cpu += process.cpu_percent(None)  # 0 on the first sample of a process
+                        rss += process.memory_info().rss
+                    except psutil.Error:
+                        pass
+                usage[proc.pid] = (cpu, rss)
+            cpu, rss = usage[proc.pid]
+            if pair_id not in statuses:
+                statuses[pair_id] = read_worker_status(self.data_dir, pair_id)
+            slot = statuses[pair_id].get(worker_id)
+            if slot and slot['started_ms'] < self.pm.launched.get((pair_id, worker_id), 0):
+                slot = None  # Left over from the previous process
+            samples.setdefault(pair_id, {})[worker_id] = {
+                'cpu': round(cpu, 1),
+                'rss_mb': round(rss / 1048576, 1),
+                'loop_hz': slot['loop_hz'] if slot else None,
+                'cores': self.cores.get(proc.pid)
+            }
+        with self.lock:
+            self.samples = samples
+            self.tracked = {pid: p for pid, p in self.tracked.items() if pid in seen}
+            self.cores = {pid: cores for pid, cores in self.cores.items() if pid in usage}
+        return samples
+
+    def get_status(self, pair_id):
+        """{worker_id: latest sample} for a pair"""
+        with self.lock:
+            return dict(self.samples.get(pair_id, {}))
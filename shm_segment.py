@@ -0,0 +1,104 @@
+"""
+Shared Memory Segment - file-backed mmap helpers with seqlock slots
+Used for small fixed-layout segments that one process writes and others read
+without locks (trade counters, prices, status).
+
+A slot starts with an 8-byte sequence counter. The single writer of a slot
+bumps it to odd before changing the payload and back to even afterwards;
+readers retry while the counter is odd or changed during their copy.
+
+Slots are owned by an id stored in the payload. claim_slot picks a slot
+for an owner without taking one another owner still holds (children can be
+reordered or deleted in config, so a config index is only a hint).
+"""
+
+import os
+import mmap
+import time
+import struct
+
+SEQ = struct.Struct('<Q')
+SEQ_SIZE = SEQ.size
+READ_RETRIES = 100
+
+
+def open_segment(path, size, init=None):
+    """
+    Open (creating if needed) a file-backed segment of `size` bytes and map it.
+    `init(mm)` runs once, only in the process that created the file.
+    Returns the mmap (read/write).
+    """
+    created = False
+    try:
+        fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0))
+        created = True
+    except FileExistsError:
+        fd = os.open(path, os.O_RDWR | getattr(os, 'O_BINARY', 0))
+    try:
+        if os.fstat(fd).st_size < size:
+            os.ftruncate(fd, size)
+        mm = mmap.mmap(fd, size)
+    finally:
+        os.close(fd)
+    if created and init:
+        init(mm)
+    return mm
+
+
+def open_segment_readonly(path, size):
+    """Map an existing segment for reading; returns None if missing or too small"""
+    try:
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size < size:
+                return None
+            return mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ)
+    except OSError:
+        return None
+
+
+def claim_slot(owner_of, slots, owner_id, hint, reclaimable=None):
+    """
+    Slot for owner_id among `slots` (a range): the one it already owns, else the
+    hinted slot if empty, else the first empty one, else the first one
+    reclaimable(slot) allows (its owner is gone). owner_of(slot) returns the
+    owner id ('' for an empty slot, None if unreadable). Raises RuntimeError if
+    every slot is taken.
+    """
+    owners = {slot: owner_of(slot) for slot in slots}
+    for slot, owner in owners.items():
+        if owner == owner_id:
+            return slot
+    if owners.get(hint) == '':
+        return hint
+    for slot, owner in owners.items():
+        if owner == '':
+            return slot
+    if reclaimable:
+        for slot in slots:
+            if reclaimable(slot):
+                return slot
+    raise RuntimeError('No free slot')
+
+
+def seqlock_write(mm, offset, payload):
+    """Write payload bytes after the slot's sequence counter (single writer per slot)"""
+    seq = SEQ.unpack_from(mm, offset)[0]
+    if seq & 1:
+        seq += 1  # A previous writer died mid-update
+    SEQ.pack_into(mm, offset, seq + 1)
+    mm[offset + SEQ_SIZE:offset + SEQ_SIZE + len(payload)] = payload
+    SEQ.pack_into(mm, offset, seq + 2)
+
+
+def seqlock_read(mm, offset, size):
+    """Read a consistent copy of a slot payload; returns None if it kept changing"""
+    start = offset + SEQ_SIZE
+    for attempt in range(READ_RETRIES):
+        before = SEQ.unpack_from(mm, offset)[0]
+        if not before & 1:
+            payload = mm[start:start + size]
+            if SEQ.unpack_from(mm, offset)[0] == before:
+                return payload
+        if attempt > 10:
+            time.sleep(0)
+    return None
@@ -0,0 +1,303 @@
+// Dashboard shell: sidebar, theme, notifications, market ticker and the /api/stream live connection
+const themeSwitcher = document.getElementById('themeSwitcher');
+const themeBtn = document.getElementById('themeBtn');
+const themeOptions = document.querySelectorAll('.theme-option');
+const html = document.documentElement;
+const currentTheme = localStorage.getItem('theme') || 'dark';
+html.setAttribute('data-theme', currentTheme);
+updateThemeUI();
+themeBtn.addEventListener('click', (e) => {
+    e.stopPropagation();
+    themeSwitcher.classList.toggle('active');
+});
+themeOptions.forEach(opt => {
+    opt.addEventListener('click', () => {
+        const theme = opt.dataset.theme;
+        html.setAttribute('data-theme', theme);
+        localStorage.setItem('theme', theme);
+        updateThemeUI();
+        themeSwitcher.classList.remove('active');
+    });
+});
+function updateThemeUI() {
+    themeOptions.forEach(opt => {
+        if(opt.dataset.theme === html.getAttribute('data-theme')) {
+            opt.classList.add('active');
+        } else {
+            opt.classList.remove('active');
+        }
+    });
+}
+document.addEventListener('click', () => themeSwitcher.classList.remove('active'));
+const sidebar = document.getElementById('sidebar');
+const sidebarToggle = document.getElementById('sidebarToggle');
+const sidebarPowerBtn = document.getElementById('sidebarPowerBtn');
+const mobileToggle = document.getElementById('mobileToggle');
+if(localStorage.getItem('sidebarCollapsed') === 'true') sidebar.classList.add('collapsed');
+function updateSidebarToggleUI() {
+    const collapsed = sidebar.classList.contains('collapsed');
+    if (sidebarPowerBtn) {
+        const icon = collapsed ? 'fa-angles-right' : 'fa-angles-left';
+        sidebarPowerBtn.innerHTML = '<i class="fas ' + icon + '"></i>';
+        sidebarPowerBtn.classList.toggle('active', !collapsed);
+        sidebarPowerBtn.setAttribute('aria-pressed', (!collapsed).toString());
+        sidebarPowerBtn.setAttribute('title', collapsed ? 'Expand sidebar' : 'Collapse sidebar');
+    }
+}
+function toggleSidebar() {
+    sidebar.classList.toggle('collapsed');
+    localStorage.setItem('sidebarCollapsed', sidebar.classList.contains('collapsed'));
+    updateSidebarToggleUI();
+}
+updateSidebarToggleUI();
+if (sidebarToggle) sidebarToggle.addEventListener('click', toggleSidebar);
+if (sidebarPowerBtn) sidebarPowerBtn.addEventListener('click', toggleSidebar);
+mobileToggle.addEventListener('click', () => sidebar.classList.toggle('mobile-open'));
+document.addEventListener('keydown', e => {
+    if(e.ctrlKey && e.key === 'b') {
+        e.preventDefault();
+        toggleSidebar();
+    }
+});
+function updateClock() {
+    const now = new Date();
+    document.getElementById('liveClock').textContent = now.toLocaleTimeString('en-US', {hour12:false});
+    document.getElementById('liveDate').textContent = now.toLocaleDateString('en-US', {month:'short', day:'numeric'});
+}
+setInterval(updateClock, 1000);
+updateClock();
+const profileDropdown = document.getElementById('profileDropdown');
+profileDropdown.querySelector('.profile-trigger').addEventListener('click', e => {
+    e.stopPropagation();
+    profileDropdown.classList.toggle('active');
+});
+document.addEventListener('click', () => profileDropdown.classList.remove('active'));
+function showToast(type, title, message, duration = 4000) {
+    const container = document.getElementById('toastContainer');
+    const toast = document.createElement('div');
+    toast.className = 'toast ' + type;
+    const icons = {success: 'fa-check', error: 'fa-times', warning: 'fa-exclamation', info: 'fa-info'};
+    toast.innerHTML = '<div class="toast-icon"><i class="fas ' + icons[type] + '"></i></div><div class="toast-content"><div class="toast-title">' + title + '</div><div class="toast-message">' + message + '</div></div><button class="toast-close" onclick="this.parentElement.remove()"><i class="fas fa-times"></i></button>';
+    container.appendChild(toast);
+    requestAnimationFrame(() => toast.classList.add('show'));
+    setTimeout(() => {
+        toast.classList.remove('show');
+        setTimeout(() => toast.remove(), 300);
+    }, duration);
+}
+const modalBackdrop = document.getElementById('modalBackdrop');
+const globalModal = document.getElementById('globalModal');
+document.getElementById('modalClose').addEventListener('click', closeModal);
+modalBackdrop.addEventListener('click', closeModal);
+function openModal(title, content, options = {}) {
+    document.getElementById('modalTitle').textContent = title;
+    document.getElementById('modalBody').innerHTML = content;
+    document.getElementById('modalFooter').style.display = options.hideFooter ? 'none' : 'flex';
+    if(options.onConfirm) document.getElementById('modalConfirm').onclick = options.onConfirm;
+    modalBackdrop.classList.add('show');
+    globalModal.classList.add('show');
+}
+function closeModal() {
+    modalBackdrop.classList.remove('show');
+    globalModal.classList.remove('show');
+}
+document.addEventListener('keydown', e => {
+    if(e.key === 'Escape') closeModal();
+});
+document.getElementById('refreshBtn').addEventListener('click', () => {
+    document.getElementById('refreshBtn').querySelector('i').style.animation = 'spin 1s linear';
+    setTimeout(() => location.reload(), 500);
+});
+function shutdownSystem() {
+    if (confirm('Are you sure you want to shutdown the entire MT5 Copier system?\n\nThis will stop all master watchers and child executors.')) {
+        showToast('info', 'Shutting Down', 'Stopping all processes...');
+        fetch('/api/shutdown', {method: 'POST'})
+            .then(r => r.json())
+            .then(data => {
+                if(data.success) {
+                    showToast('success', 'System Shutdown', 'All processes stopped successfully');
+                    setTimeout(() => window.close(), 2000);
+                } else {
+                    showToast('error', 'Shutdown Failed', data.error || 'Unknown error');
+                }
+            })
+            .catch(e => {
+                showToast('error', 'Shutdown Error', e.message);
+            });
+    }
+}
+window.showToast = showToast;
+window.openModal = openModal;
+window.closeModal = closeModal;
+// Market Data Ticker - Live data from MT5 Market Watch (flicker-free updates)
+let marketPrices = {};
+let marketDailyChanges = {};
+let currentSymbolList = [];
+let tickerInitialized = false;
+function updateTickerValues(symbols) {
+    // Update existing elements in-place without rebuilding DOM
+    symbols.forEach(s => {
+        // Update both instances (for seamless scrolling)
+        for (let i = 1; i <= 2; i++) {
+            const priceEl = document.getElementById(`ticker-price-${s.symbol}-${i}`);
+            const changeEl = document.getElementById(`ticker-change-${s.symbol}-${i}`);
+            if (priceEl && changeEl) {
+                // Update price
+                const newPrice = s.bid.toFixed(s.digits || 5);
+                const oldPrice = marketPrices[s.symbol] || s.bid;
+                priceEl.textContent = newPrice;
+                // Flash effect on price change
+                if (s.bid > oldPrice * 1.000001) {
+                    priceEl.classList.remove('flash-down');
+                    priceEl.classList.add('flash-up');
+                    setTimeout(() => priceEl.classList.remove('flash-up'), 300);
+                } else if (s.bid < oldPrice * 0.999999) {
+                    priceEl.classList.remove('flash-up');
+                    priceEl.classList.add('flash-down');
+                    setTimeout(() => priceEl.classList.remove('flash-down'), 300);
+                }
+                // Update daily change
+                const dailyChange = s.daily_change || 0;
+                const oldDailyChange = marketDailyChanges[s.symbol] || dailyChange;
+                let dailyChangeClass = 'neutral';
+                let dailyChangeIcon = '';
+                if (dailyChange > 0.001) {
+                    dailyChangeClass = 'up';
+                    dailyChangeIcon = '<i class="fas fa-caret-up"></i>';
+                } else if (dailyChange < -0.001) {
+                    dailyChangeClass = 'down';
+                    dailyChangeIcon = '<i class="fas fa-caret-down"></i>';
+                }
+                const dailyChangeText = dailyChange >= 0 ? '+' + dailyChange.toFixed(2) + '%' : dailyChange.toFixed(2) + '%';
+                changeEl.className = 'market-ticker-change ' + dailyChangeClass;
+                changeEl.innerHTML = dailyChangeIcon + ' ' + dailyChangeText;
+                // Flash effect on daily change update
+                if (dailyChange > oldDailyChange + 0.001) {
+                    changeEl.classList.add('flash-change-up');
+                    setTimeout(() => changeEl.classList.remove('flash-change-up'), 300);
+                } else if (dailyChange < oldDailyChange - 0.001) {
+                    changeEl.classList.add('flash-change-down');
+                    setTimeout(() => changeEl.classList.remove('flash-change-down'), 300);
+                }
+            }
+        }
+    });
+    // Update stored prices and daily changes
+    symbols.forEach(s => {
+        marketPrices[s.symbol] = s.bid;
+        marketDailyChanges[s.symbol] = s.daily_change || 0;
+    });
+}
+function buildTickerHTML(symbols) {
+    let html = '';
+    for (let i = 1; i <= 2; i++) {
+        symbols.forEach(s => {
+            const dailyChange = s.daily_change || 0;
+            let dailyChangeClass = 'neutral';
+            let dailyChangeIcon = '';
+            if (dailyChange > 0.001) {
+                dailyChangeClass = 'up';
+                dailyChangeIcon = '<i class="fas fa-caret-up"></i>';
+            } else if (dailyChange < -0.001) {
+                dailyChangeClass = 'down';
+                dailyChangeIcon = '<i class="fas fa-caret-down"></i>';
+            }
+            const dailyChangeText = dailyChange >= 0 ? '+' + dailyChange.toFixed(2) + '%' : dailyChange.toFixed(2) + '%';
+            const formattedBid = s.bid.toFixed(s.digits || 5);
+            // Store initial values
+            marketPrices[s.symbol] = s.bid;
+            marketDailyChanges[s.symbol] = dailyChange;
+            html += `<div class="market-ticker-item">
+                <span class="market-ticker-symbol">${s.symbol}</span>
+                <span class="market-ticker-price" id="ticker-price-${s.symbol}-${i}">${formattedBid}</span>
+                <span class="market-ticker-change ${dailyChangeClass}" id="ticker-change-${s.symbol}-${i}">${dailyChangeIcon} ${dailyChangeText}</span>
+            </div>`;
+            marketPrices[s.symbol] = s.bid;
+        });
+    }
+    return html;
+}
+function symbolListChanged(newSymbols) {
+    if (currentSymbolList.length !== newSymbols.length) return true;
+    for (let i = 0; i < newSymbols.length; i++) {
+        if (currentSymbolList[i] !== newSymbols[i].symbol) return true;
+    }
+    return false;
+}
+async function updateMarketTicker() {
+    try {
+        const resp = await fetch('/api/market-watch');
+        renderMarketTicker(await resp.json());
+    } catch (e) {
+        console.log('Market ticker error:', e);
+    }
+}
+function renderMarketTicker(data) {
+    const tickerEl = document.getElementById('marketTickerContent');
+    if (!tickerEl) return;
+    try {
+        if (!data.success) {
+            if (!tickerInitialized || tickerEl.querySelector('.market-ticker-item') === null) {
+                if (data.error && data.error.includes('No active pairs')) {
+                    tickerEl.innerHTML = `<span class="market-ticker-loading">
+                        <i class="fas fa-chart-line"></i> 
+                        Activate a trading pair to see live MT5 market data
+                        <span style="margin-left: 30px; opacity: 0.6;">•</span>
+                        <span style="margin-left: 30px; opacity: 0.8;"><i class="fas fa-play-circle" style="margin-right: 6px;"></i>Click "Activate" on any pair to start</span>
+                    </span>`;
+                } else {
+                    tickerEl.innerHTML = `<span class="market-ticker-loading">
+                        <i class="fas fa-exclamation-triangle"></i> 
+                        ${data.error || 'Unable to fetch market data'}
+                    </span>`;
+                }
+            }
+            tickerInitialized = false;
+            currentSymbolList = [];
+            return;
+        }
+        const symbols = data.symbols || [];
+        if (symbols.length === 0) {
+            if (!tickerInitialized) {
+                tickerEl.innerHTML = `<span class="market-ticker-loading">
+                    <i class="fas fa-broadcast-tower"></i> 
+                    Connected to MT5 (${data.master_account || 'Master'}) - No symbols in Market Watch
+                </span>`;
+            }
+            return;
+        }
+        // Check if we need to rebuild DOM or just update values
+        if (!tickerInitialized || symbolListChanged(symbols)) {
+            // Rebuild entire ticker
+            tickerEl.innerHTML = buildTickerHTML(symbols);
+            currentSymbolList = symbols.map(s => s.symbol);
+            tickerInitialized = true;
+        } else {
+            // Just update values in-place (no flicker)
+            updateTickerValues(symbols);
+        }
+    } catch (e) {
+        console.log('Market ticker error:', e);
+    }
+}
+// Live push channel (/api/stream). Pages register handlers with
+// liveStream.on(event, fn) and fall back to polling while it is down.
+const liveStream = (function() {
+    const handlers = {};
+    const stream = { connected: false, on: (event, fn) => (handlers[event] = handlers[event] || []).push(fn) };
+    if (!window.EventSource) return stream;
+    const source = new EventSource('/api/stream');
+    const dispatch = (event, e) => {
+        let data;
+        try { data = JSON.parse(e.data); } catch (err) { return; }
+        (handlers[event] || []).forEach(fn => fn(data));
+    };
+    ['status', 'telemetry', 'pair', 'stats', 'logs', 'prices'].forEach(event => source.addEventListener(event, e => dispatch(event, e)));
+    source.onopen = () => { stream.connected = true; (handlers.open || []).forEach(fn => fn()); };
+    source.onerror = () => { stream.connected = false; };
+    return stream;
+})();
+// Market ticker: prices are pushed by the stream; poll every second only while it is down
+liveStream.on('prices', renderMarketTicker);
+updateMarketTicker();
+setInterval(() => { if (!liveStream.connected) updateMarketTicker(); }, 1000);
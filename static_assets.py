@@ -0,0 +1,75 @@
+"""
+Static Assets - fingerprinted URLs and precompressed variants for static/
+Templates reference shared CSS/JS through asset_url('css/base.css'), which
+returns /assets/css/base.<hash>.css. The hash changes whenever the file does,
+so browsers may cache responses for a year and only re-download after an
+update.
+
+Each asset is read once at startup and compressed into gzip and brotli
+variants (brotli only when the brotli package is installed); requests get
+the smallest variant their Accept-Encoding allows.
+"""
+
+import os
+import gzip
+import hashlib
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+FINGERPRINTED = ['css/base.css', 'js/base.js']
+URL_PREFIX = '/assets/'
+CACHE_CONTROL = 'public, max-age=31536000, immutable'
+# Explicit types - the Windows registry can map .js to text/plain
+MIMETYPES = {'.css': 'text/css', '.js': 'application/javascript'}
+
+
+class Asset:
+    def __init__(self, name, data):
+        digest = hashlib.sha1(data).hexdigest()[:10]
+        stem, ext = os.path.splitext(name)
+        self.name = name
+        self.filename = f'{stem}.{digest}{ext}'
+        self.etag = f'"{digest}"'
+        self.mimetype = MIMETYPES.get(ext, 'application/octet-stream')
+        self.variants = {'identity': data, 'gzip': gzip.compress(data, compresslevel=9)}
+        if brotli:
+            self.variants['br'] = brotli.compress(data, quality=11)
+
+    def select(self, accept_encoding):
+        """(encoding, body) of the smallest variant the client accepts"""
+        accepted = [e.split(';')[0].strip() for e in (accept_encoding or '').split(',')]
+        encoding = min((e for e in self.variants if e == 'identity' or e in accepted),
+                       key=lambda e: len(self.variants[e]))
+        return encoding, self.variants[encoding]
+
+
+class AssetManifest:
+    """Logical name -> fingerprinted asset for the files in FINGERPRINTED"""
+
+    def __init__(self, static_dir, names=FINGERPRINTED):
+        self.assets = {}
+        self.by_filename = {}
+        for name in names:
+            try:
+                with open(os.path.join(static_dir, name), 'rb') as f:
+                    asset = Asset(name, f.read())
+            except OSError as e:
+                print(f"[WARN] Static asset {name} not found: {e}")
+                continue
+            self.assets[name] = asset
+            self.by_filename[asset.filename] = asset
+
+    def url(self, name):
+        """Fingerprinted URL for a logical asset name (plain /static/ URL if it is not managed)"""
+        asset = self.assets.get(name)
+        return URL_PREFIX + asset.filename if asset else '/static/' + name
+
+    def get(self, filename):
+        return self.by_filename.get(filename)
+
+    def sizes(self):
+        """Bytes per variant for each asset (for diagnostics)"""
+        return {name: {e: len(body) for e, body in asset.variants.items()} for name, asset in self.assets.items()}
@@ -0,0 +1,176 @@
+"""
+Trade Stats Segment - per-pair shared-memory copy counters
+Replaces the pair_stats.json read-modify-write done by every child after every trade.
+
+data/pair_stats_{pair_id}.bin:
+    Header (16 bytes): magic(4) + version(4) + slot_count(4) + slot_size(4)
+    Slots (144 bytes each): seq(8) + child_id(32) + total(8) + success(8) + failed(8)
+                            + last_latency_ms(8) + last_update_ms(8) + 8 x (retcode(4) + count(4))
+
+Slot 0 holds the baseline carried over from the trade database when the segment
+is created; slots 1.. belong to one child executor each. Every slot has a single
+writer, so updates need no locks (see shm_segment seqlock helpers).
+"""
+
+import os
+import time
+import struct
+
+from shm_segment import open_segment, open_segment_readonly, seqlock_write, seqlock_read, claim_slot, SEQ_SIZE
+
+MAGIC = b'JDST'
+VERSION = 1
+MAX_SLOTS = 33  # Baseline + 32 children
+MAX_REJECT_CODES = 8
+OTHER_RETCODE = 0xFFFFFFFF  # Bucket for retcodes once all reject entries are used
+CHECKPOINT_INTERVAL = 30  # Seconds between flushes of the segment to disk
+
+HEADER = struct.Struct('<4sIII')
+PAYLOAD = struct.Struct('<32sQQQdQ' + 'II' * MAX_REJECT_CODES)
+SLOT_SIZE = SEQ_SIZE + PAYLOAD.size
+SEGMENT_SIZE = HEADER.size + MAX_SLOTS * SLOT_SIZE
+BASELINE_ID = '_baseline'
+
+
+def get_segment_path(data_dir, pair_id):
+    return os.path.join(data_dir, f'pair_stats_{pair_id}.bin')
+
+
+def _slot_offset(slot):
+    return HEADER.size + slot * SLOT_SIZE
+
+
+def _pack(child_id, total, success, failed, latency_ms, updated_ms, rejects):
+    codes = []
+    for retcode, count in list(rejects.items())[:MAX_REJECT_CODES]:
+        codes += [retcode, count]
+    codes += [0, 0] * (MAX_REJECT_CODES - len(codes) // 2)
+    return PAYLOAD.pack(child_id.encode('utf-8')[:32], total, success, failed,
+                        latency_ms, updated_ms, *codes)
+
+
+def _unpack(payload):
+    fields = PAYLOAD.unpack(payload)
+    codes = fields[6:]
+    return {
+        'child_id': fields[0].rstrip(b'\x00').decode('utf-8', errors='ignore'),
+        'total': fields[1],
+        'success': fields[2],
+        'failed': fields[3],
+        'last_latency_ms': round(fields[4], 1),
+        'last_update': fields[5],
+        'rejects': {codes[i]: codes[i + 1] for i in range(0, len(codes), 2) if codes[i + 1]}
+    }
+
+
+class StatsWriter:
+    """Owns one child's slot in a pair's stats segment"""
+
+    def __init__(self, data_dir, pair_id, child_id, slot_hint=0, baseline=None):
+        """
+        slot_hint is the child's position in the pair config; its slot is used unless another child holds it.
+        baseline() returns {'total', 'success', 'failed'} to seed slot 0 when the segment is new.
+        """
+        self.child_id = child_id
+        self.mm = open_segment(get_segment_path(data_dir, pair_id), SEGMENT_SIZE,
+                               lambda mm: self._init_segment(mm, baseline))
+        self.slot = self._claim_slot(slot_hint)
+        current = self._read_slot(self.slot)
+        if current and current['child_id'] == child_id:
+            self.total, self.success, self.failed = current['total'], current['success'], current['failed']
+            self.rejects = dict(current['rejects'])
+            self.latency_ms = current['last_latency_ms']
+        else:
+            self.total = self.success = self.failed = 0
+            self.rejects = {}
+            self.latency_ms = 0.0
+            self._publish()
+        self.last_checkpoint = time.time()
+
+    @staticmethod
+    def _init_segment(mm, baseline):
+        HEADER.pack_into(mm, 0, MAGIC, VERSION, MAX_SLOTS, SLOT_SIZE)
+        base = {}
+        if baseline:
+            try:
+                base = baseline() or {}
+            except Exception as e:
+                print(f"[WARN] Could not load stats baseline: {e}")
+        seqlock_write(mm, _slot_offset(0), _pack(BASELINE_ID, base.get('total', 0), base.get('success', 0),
+                                                 base.get('failed', 0), 0.0, int(time.time() * 1000), {}))
+        mm.flush()
+
+    def _read_slot(self, slot):
+        payload = seqlock_read(self.mm, _slot_offset(slot), PAYLOAD.size)
+        return _unpack(payload) if payload else None
+
+    def _claim_slot(self, slot_hint):
+        # Reuse the slot already holding this child's counters, else the hinted or first empty slot;
+        # a slot with another child's counters is never taken (they are kept for the pair totals)
+        def owner_of(slot):
+            current = self._read_slot(slot)
+            return current['child_id'] if current else None
+        try:
+            return claim_slot(owner_of, range(1, MAX_SLOTS), self.child_id, slot_hint + 1)
+        except RuntimeError:
+            raise RuntimeError('No free stats slot')
+
+    def _publish(self):
+        seqlock_write(self.mm, _slot_offset(self.slot),
+                      _pack(self.child_id, self.total, self.success, self.failed,
+                            self.latency_ms, int(time.time() * 1000), self.rejects))
+
+    def record(self, success, retcode=0, latency_ms=0.0):
+        """Count one copy attempt; failed attempts are also counted per MT5 retcode"""
+        self.total += 1
+        if success:
+            self.success += 1
+        else:
+            self.failed += 1
+            code = retcode & 0xFFFFFFFF
+            if code not in self.rejects and len(self.rejects) >= MAX_REJECT_CODES - 1:
+                code = OTHER_RETCODE
+            self.rejects[code] = self.rejects.get(code, 0) + 1
+        self.latency_ms = latency_ms
+        self._publish()
+        if time.time() - self.last_checkpoint >= CHECKPOINT_INTERVAL:
+            self.checkpoint()
+
+    def checkpoint(self):
+        """Flush the segment to its backing file"""
+        try:
+            self.mm.flush()
+        except Exception as e:
+            print(f"[WARN] Stats checkpoint failed: {e}")
+        self.last_checkpoint = time.time()
+
+
+def read_pair_stats(data_dir, pair_id):
+    """
+    Aggregate all slots of a pair's stats segment in one mapping.
+    Returns {'total', 'success', 'failed', 'rejects', 'children': {child_id: slot}} or None.
+    """
+    mm = open_segment_readonly(get_segment_path(data_dir, pair_id), SEGMENT_SIZE)
+    if mm is None:
+        return None
+    try:
+        magic, version, slots, slot_size = HEADER.unpack_from(mm, 0)
+        if magic != MAGIC or version != VERSION or slot_size != SLOT_SIZE:
+            return None
+        result = {'total': 0, 'success': 0, 'failed': 0, 'rejects': {}, 'children': {}}
+        for slot in range(min(slots, MAX_SLOTS)):
+            payload = seqlock_read(mm, _slot_offset(slot), PAYLOAD.size)
+            if not payload:
+                continue
+            data = _unpack(payload)
+            if not data['child_id']:
+                continue
+            for key in ('total', 'success', 'failed'):
+                result[key] += data[key]
+            for code, count in data['rejects'].items():
+                result['rejects'][code] = result['rejects'].get(code, 0) + count
+            if data['child_id'] != BASELINE_ID:
+                result['children'][data['child_id']] = data
+        return result
+    finally:
+        mm.close()
@@ -5,13 +5,27 @@ Includes symbol mapping, comprehensive logging, and trade history
 
 import os
 import json
+import atexit
+import time
 import sqlite3
+import threading
 from datetime import datetime
 from pathlib import Path
 
 # Application info
 APP_NAME = "JD_MT5_TradeCopier"
 
+# Write-behind batching: queued writes are committed together every
+# FLUSH_INTERVAL_MS or as soon as FLUSH_MAX_ROWS are pending
+FLUSH_INTERVAL_MS = 200
+FLUSH_MAX_ROWS = 500
+STATEMENT_CACHE_SIZE = 128
+EXPORT_BATCH = 1000  # Rows fetched per step when streaming large result sets
+SYSTEM_LOG_DAYS = 7  # Days of system_logs rows kept (older ones are pruned by the flusher)
+LOG_PRUNE_INTERVAL = 3600  # Seconds between prunes
+FLUSH_RETRIES = 5  # Failed flushes (database busy/locked) a batch is requeued for before rows are tried one by one
+READ_FLUSH_TIMEOUT_MS = 100  # Busy wait of the flush before a read; longer locks are left to the flusher
+
 def get_app_data_dir():
     """Get the application data directory in AppData/Local"""
     if os.name == 'nt':  # Windows
@@ -26,16 +40,163 @@ def get_app_data_dir():
     return app_dir
 
 class MT5DataStorage:
-    """Database storage for MT5 real data, logs, and symbol mappings"""
+    """Database storage for MT5 real data, logs, and symbol mappings
+
+    Connections are persistent (one per thread, WAL mode, synchronous=NORMAL).
+    Writes are queued and committed in batches by a background flusher; reads
+    flush the queue first so callers always see their own writes.
+    """
     
-    def __init__(self):
+    def __init__(self, db_path=None):
         self.app_dir = get_app_data_dir()
-        self.db_path = os.path.join(self.app_dir, 'data', 'mt5_data.db')
+        self.db_path = db_path or os.path.join(self.app_dir, 'data', 'mt5_data.db')
+        self._local = threading.local()
+        self._pending = []  # Queued (sql, params) writes
+        self._pending_lock = threading.Lock()
+        self._write_lock = threading.Lock()  # Serializes batch commits
+        self._wakeup = threading.Event()
+        self._flusher = None
+        self._writer = None
+        self._flush_failures = 0  # Consecutive busy/locked flush failures of the requeued batch
         self._init_database()
+        atexit.register(self.close)
+    
+    # === CONNECTIONS ===
+    
+    def _connect(self, check_same_thread=True):
+        conn = sqlite3.connect(self.db_path, timeout=10, cached_statements=STATEMENT_CACHE_SIZE,
+                               check_same_thread=check_same_thread)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+    
+    def _get_conn(self):
+        """Persistent connection for the calling thread (used for reads)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+        return conn
+    
+    def _read(self, query, params=()):
+        """Run a read query after flushing pending writes; returns a cursor
+
+        If another process holds the write lock the writes stay queued for the
+        background flusher - the read still works in WAL mode, it just may not
+        see them yet.
+        """
+        try:
+            self.flush(busy_timeout_ms=READ_FLUSH_TIMEOUT_MS)
+        except sqlite3.OperationalError:
+            pass
+        return self._get_conn().execute(query, params)
+    
+    def _write(self, query, params=()):
+        """Queue a write for the background flusher"""
+        with self._pending_lock:
+            self._pending.append((query, params))
+            pending = len(self._pending)
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._flush_loop, name='storage_db-flusher', daemon=True)
+                self._flusher.start()
+        if pending >= FLUSH_MAX_ROWS:
+            self._wakeup.set()
+    
+    def _flush_loop(self):
+        last_prune = time.time()
+        while True:
+            self._wakeup.wait(FLUSH_INTERVAL_MS / 1000.0)
+            self._wakeup.clear()
+            if time.time() - last_prune >= LOG_PRUNE_INTERVAL:
+                last_prune = time.time()
+                self.clear_old_logs(SYSTEM_LOG_DAYS)
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"[WARN] Database flush failed: {e}")
+    
+    def flush(self, busy_timeout_ms=None):
+        """Commit all queued writes in one transaction
+
+        Raises sqlite3.OperationalError while the database is busy/locked (the
+        batch stays queued). With busy_timeout_ms the lock is waited for only
+        that long and the failure does not count towards FLUSH_RETRIES.
+        """
+        # A busy flusher thread holds the lock while it waits on the database - don't queue behind it
+        if not self._write_lock.acquire(timeout=-1 if busy_timeout_ms is None else busy_timeout_ms / 1000):
+            raise sqlite3.OperationalError('flush in progress')
+        try:
+            with self._pending_lock:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return
+            if self._writer is None:
+                # Shared by the flusher thread and callers of flush(), guarded by _write_lock
+                self._writer = self._connect(check_same_thread=False)
+            conn = self._writer
+            if busy_timeout_ms is not None:
+                conn.execute(f'PRAGMA busy_timeout = {int(busy_timeout_ms)}')
+            try:
+                # Group consecutive identical statements into executemany calls
+                start = 0
+                while start < len(batch):
+                    query = batch[start][0]
+                    end = start + 1
+                    while end < len(batch) and batch[end][0] == query:
+                        end += 1
+                    conn.executemany(query, [params for _, params in batch[start:end]])
+                    start = end
+                conn.commit()
+                self._flush_failures = 0
+            except sqlite3.OperationalError:
+                # Busy/locked: nothing is lost - the batch goes back in front of newer writes
+                conn.rollback()
+                if busy_timeout_ms is None:
+                    self._flush_failures += 1
+                if busy_timeout_ms is not None or self._flush_failures <= FLUSH_RETRIES:
+                    with self._pending_lock:
+                        self._pending[:0] = batch
+                    raise
+                self._flush_failures = 0
+                self._flush_rows(conn, batch)
+            except Exception:
+                # A bad row: keep the others
+                conn.rollback()
+                self._flush_rows(conn, batch)
+            finally:
+                if busy_timeout_ms is not None:
+                    conn.execute('PRAGMA busy_timeout = 10000')  # Back to the connect timeout
+        finally:
+            self._write_lock.release()
+    
+    def _flush_rows(self, conn, batch):
+        """Commit a batch statement by statement, dropping (and reporting) only the ones that fail"""
+        dropped = 0
+        for query, params in batch:
+            try:
+                conn.execute(query, params)
+            except Exception as e:
+                dropped += 1
+                if dropped == 1:
+                    print(f"[WARN] Dropped database write: {e}")
+        conn.commit()
+        if dropped > 1:
+            print(f"[WARN] Dropped {dropped} of {len(batch)} queued database writes")
+    
+    def close(self):
+        """Flush pending writes and close the writer connection"""
+        try:
+            self.flush()
+        except Exception as e:
+            print(f"[WARN] Database flush failed: {e}")
+        with self._write_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
     
     def _init_database(self):
         """Initialize SQLite database with all tables"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         # Table: account_status - Real-time account data from MT5
@@ -128,6 +289,79 @@ class MT5DataStorage:
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_logs_level ON system_logs(level)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_logs_timestamp ON system_logs(timestamp)')
         
+        # Table: trade_stats - Copy counters per pair (replaces pair_stats.json)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS trade_stats (
+                pair_id TEXT PRIMARY KEY,
+                total INTEGER DEFAULT 0,
+                success INTEGER DEFAULT 0,
+                failed INTEGER DEFAULT 0,
+                last_update TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        # Migration: child_id on trade_history (replaces closed_trades_{pair}_{child}.json)
+        columns = [row[1] for row in cursor.execute('PRAGMA table_info(trade_history)')]
+        if 'child_id' not in columns:
+            cursor.execute('ALTER TABLE trade_history ADD COLUMN child_id TEXT')
+        
+        # Date-range queries from the dashboard
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_history_pair_close ON trade_history(pair_id, close_time)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_history_account_close ON trade_history(account_id, close_time)')
+        
+        # Tables: mt5_deals / mt5_orders - Local copy of terminal history, synced incrementally
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS mt5_deals (
+                login INTEGER NOT NULL,
+                ticket INTEGER NOT NULL,
+                order_ticket INTEGER,
+                position_id INTEGER,
+                symbol TEXT,
+                type INTEGER,
+                entry INTEGER,
+                volume REAL,
+                price REAL,
+                profit REAL,
+                commission REAL,
+                swap REAL,
+                fee REAL,
+                time INTEGER,
+                comment TEXT,
+                PRIMARY KEY (login, ticket)
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS mt5_orders (
+                login INTEGER NOT NULL,
+                ticket INTEGER NOT NULL,
+                symbol TEXT,
+                type INTEGER,
+                state INTEGER,
+                volume_initial REAL,
+                volume_current REAL,
+                price_open REAL,
+                price_current REAL,
+                sl REAL,
+                tp REAL,
+                time_setup INTEGER,
+                time_done INTEGER,
+                comment TEXT,
+                PRIMARY KEY (login, ticket)
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS mt5_history_sync (
+                login INTEGER NOT NULL,
+                kind TEXT NOT NULL,
+                covered_from REAL,
+                synced_to REAL,
+                full_sync_at REAL,
+                PRIMARY KEY (login, kind)
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_mt5_deals_time ON mt5_deals(login, time)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_mt5_orders_time ON mt5_orders(login, time_setup)')
+        
         conn.commit()
         conn.close()
     
@@ -136,75 +370,53 @@ class MT5DataStorage:
     def update_account_status(self, account_id, pair_id, account_type, balance, equity, 
                             margin=0, free_margin=0, profit=0, server=''):
         """Update real-time account status from MT5"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
+        self._write('''
             INSERT OR REPLACE INTO account_status 
             (account_id, pair_id, account_type, balance, equity, margin, free_margin, profit, server, last_update)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
         ''', (account_id, pair_id, account_type, balance, equity, margin, free_margin, profit, server))
-        conn.commit()
-        conn.close()
     
     def get_account_status(self, pair_id=None):
         """Get account status for dashboard"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         if pair_id:
-            cursor.execute('SELECT * FROM account_status WHERE pair_id = ? ORDER BY account_type', (pair_id,))
+            cursor = self._read('SELECT * FROM account_status WHERE pair_id = ? ORDER BY account_type', (pair_id,))
         else:
-            cursor.execute('SELECT * FROM account_status ORDER BY pair_id, account_type')
+            cursor = self._read('SELECT * FROM account_status ORDER BY pair_id, account_type')
         
         columns = [desc[0] for desc in cursor.description]
-        results = [dict(zip(columns, row)) for row in cursor.fetchall()]
-        conn.close()
-        return results
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
     
     # === POSITIONS ===
     
     def update_position(self, ticket, pair_id, account_id, account_type, symbol, 
                        pos_type, volume, price_open, sl=0, tp=0, profit=0, open_time=None):
         """Update current position from MT5"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
+        self._write('''
             INSERT OR REPLACE INTO positions 
             (ticket, pair_id, account_id, account_type, symbol, type, volume, price_open, sl, tp, profit, open_time, last_update)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
         ''', (ticket, pair_id, account_id, account_type, symbol, pos_type, volume, price_open, sl, tp, profit, open_time))
-        conn.commit()
-        conn.close()
     
     def remove_position(self, ticket):
         """Remove position when closed"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('DELETE FROM positions WHERE ticket = ?', (ticket,))
-        conn.commit()
-        conn.close()
+        self._write('DELETE FROM positions WHERE ticket = ?', (ticket,))
     
     def get_positions(self, pair_id=None):
         """Get current positions for dashboard"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         if pair_id:
-            cursor.execute('SELECT * FROM positions WHERE pair_id = ? ORDER BY open_time DESC', (pair_id,))
+            cursor = self._read('SELECT * FROM positions WHERE pair_id = ? ORDER BY open_time DESC', (pair_id,))
         else:
-            cursor.execute('SELECT * FROM positions ORDER BY pair_id, open_time DESC')
+            cursor = self._read('SELECT * FROM positions ORDER BY pair_id, open_time DESC')
         
         columns = [desc[0] for desc in cursor.description]
-        results = [dict(zip(columns, row)) for row in cursor.fetchall()]
-        conn.close()
-        return results
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
     
     # === TRADE HISTORY ===
     
     def add_trade_history(self, ticket, pair_id, account_id, account_type, symbol, 
                          trade_type, volume, price_open, price_close, profit, 
-                         open_time, close_time, sl=0, tp=0):
-        """Add closed trade to history"""
+                         open_time, close_time, sl=0, tp=0, child_id=None):
+        """Add closed trade to history (close_time as 'YYYY-MM-DD HH:MM:SS')"""
         duration = None
         if open_time and close_time:
             try:
@@ -214,97 +426,250 @@ class MT5DataStorage:
             except:
                 pass
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
+        self._write('''
             INSERT INTO trade_history 
-            (ticket, pair_id, account_id, account_type, symbol, type, volume, price_open, price_close, sl, tp, profit, open_time, close_time, duration_seconds)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (ticket, pair_id, account_id, account_type, symbol, trade_type, volume, price_open, price_close, sl, tp, profit, open_time, close_time, duration))
-        conn.commit()
-        conn.close()
+            (ticket, pair_id, account_id, account_type, symbol, type, volume, price_open, price_close, sl, tp, profit, open_time, close_time, duration_seconds, child_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (ticket, pair_id, account_id, account_type, symbol, trade_type, volume, price_open, price_close, sl, tp, profit, open_time, close_time, duration, child_id))
     
     def get_trade_history(self, pair_id=None, limit=100):
         """Get trade history for dashboard"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         if pair_id:
-            cursor.execute('SELECT * FROM trade_history WHERE pair_id = ? ORDER BY close_time DESC LIMIT ?', (pair_id, limit))
+            cursor = self._read('SELECT * FROM trade_history WHERE pair_id = ? ORDER BY close_time DESC LIMIT ?', (pair_id, limit))
         else:
-            cursor.execute('SELECT * FROM trade_history ORDER BY close_time DESC LIMIT ?', (limit,))
+            cursor = self._read('SELECT * FROM trade_history ORDER BY close_time DESC LIMIT ?', (limit,))
         
         columns = [desc[0] for desc in cursor.description]
-        results = [dict(zip(columns, row)) for row in cursor.fetchall()]
-        conn.close()
-        return results
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+    
+    def get_closed_trades(self, pair_id, account_type=None, child_id=None, account_id=None,
+                          date_from=None, date_to=None, limit=None):
+        """
+        Get closed trades newest first, filtered by close date (YYYY-MM-DD, inclusive).
+        Uses the (pair_id, close_time) index, or (account_id, close_time) when account_id is given.
+        """
+        cursor = self._read(*self._closed_trades_query(pair_id, account_type, child_id, account_id,
+                                                       date_from, date_to, limit))
+        columns = [desc[0] for desc in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+    
+    def iter_closed_trades(self, pair_id, account_type=None, child_id=None, account_id=None,
+                           date_from=None, date_to=None, limit=None):
+        """Same rows as get_closed_trades, yielded EXPORT_BATCH at a time (for streaming exports)"""
+        # Own connection: the generator may be resumed while this thread runs other queries
+        self.flush()
+        conn = self._connect()
+        try:
+            cursor = conn.execute(*self._closed_trades_query(pair_id, account_type, child_id, account_id,
+                                                             date_from, date_to, limit))
+            columns = [desc[0] for desc in cursor.description]
+            while True:
+                rows = cursor.fetchmany(EXPORT_BATCH)
+                if not rows:
+                    break
+                for row in rows:
+                    yield dict(zip(columns, row))
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def _closed_trades_query(pair_id, account_type, child_id, account_id, date_from, date_to, limit):
+        if account_id is not None:
+            query = 'SELECT * FROM trade_history WHERE account_id = ? AND pair_id = ?'
+            params = [account_id, pair_id]
+        else:
+            query = 'SELECT * FROM trade_history WHERE pair_id = ?'
+            params = [pair_id]
+        
+        if account_type:
+            query += ' AND account_type = ?'
+            params.append(account_type)
+        
+        if child_id:
+            query += ' AND child_id = ?'
+            params.append(child_id)
+        
+        if date_from:
+            query += ' AND close_time >= ?'
+            params.append(date_from)
+        
+        if date_to:
+            query += " AND close_time < date(?, '+1 day')"
+            params.append(date_to)
+        
+        query += ' ORDER BY close_time DESC'
+        if limit:
+            query += ' LIMIT ?'
+            params.append(limit)
+        return query, params
+    
+    def import_closed_trades_file(self, json_file, pair_id, account_id, account_type, child_id=None):
+        """One-time import of a legacy closed_trades_*.json file (renamed to .imported afterwards)"""
+        try:
+            with open(json_file, 'r') as f:
+                trades = json.load(f)
+        except Exception:
+            return 0
+        
+        today = datetime.now().strftime('%Y-%m-%d')
+        for t in reversed(trades):
+            close_time = str(t.get('close_time', ''))
+            if close_time and len(close_time) <= 8:
+                close_time = f"{today} {close_time}"  # Older master files stored time only
+            self.add_trade_history(
+                ticket=t.get('ticket', 0), pair_id=pair_id, account_id=account_id,
+                account_type=account_type, symbol=t.get('symbol', ''), trade_type=t.get('type', 0),
+                volume=t.get('volume', 0.0), price_open=t.get('price_open', 0.0),
+                price_close=t.get('close_price', 0.0), profit=t.get('profit', 0.0),
+                open_time=t.get('open_time', ''), close_time=close_time or None, child_id=child_id
+            )
+        self.flush()
+        os.replace(json_file, json_file + '.imported')
+        return len(trades)
+    
+    # === TRADE STATS ===
+    
+    def increment_trade_stats(self, pair_id, success=True):
+        """Count one copy attempt for a pair (atomic in SQL - safe across child processes)"""
+        ok = 1 if success else 0
+        self._write('''
+            INSERT INTO trade_stats (pair_id, total, success, failed, last_update)
+            VALUES (?, 1, ?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(pair_id) DO UPDATE SET
+                total = total + 1,
+                success = success + excluded.success,
+                failed = failed + excluded.failed,
+                last_update = CURRENT_TIMESTAMP
+        ''', (pair_id, ok, 1 - ok))
+    
+    def set_trade_stats(self, pair_id, total, success, failed):
+        """Store checkpointed copy counters for a pair (from the shared-memory stats segment)"""
+        self._write('''
+            INSERT INTO trade_stats (pair_id, total, success, failed, last_update)
+            VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(pair_id) DO UPDATE SET
+                total = excluded.total,
+                success = excluded.success,
+                failed = excluded.failed,
+                last_update = CURRENT_TIMESTAMP
+        ''', (pair_id, total, success, failed))
+    
+    def get_trade_stats(self):
+        """Get copy counters for all pairs as {pair_id: {'total', 'success', 'failed'}}"""
+        cursor = self._read('SELECT pair_id, total, success, failed FROM trade_stats')
+        return {row[0]: {'total': row[1], 'success': row[2], 'failed': row[3]} for row in cursor.fetchall()}
+    
+    def import_trade_stats(self, stats):
+        """One-time import of legacy pair_stats.json counters (existing rows are kept)"""
+        for pair_id, s in stats.items():
+            self._write('''
+                INSERT OR IGNORE INTO trade_stats (pair_id, total, success, failed)
+                VALUES (?, ?, ?, ?)
+            ''', (pair_id, s.get('total', 0), s.get('success', 0), s.get('failed', 0)))
+        self.flush()
+    
+    # === MT5 HISTORY CACHE ===
+    
+    def upsert_mt5_deals(self, login, deals):
+        """Store deals fetched from a terminal (dicts with MT5 TradeDeal field names)"""
+        for d in deals:
+            self._write('''
+                INSERT OR REPLACE INTO mt5_deals
+                (login, ticket, order_ticket, position_id, symbol, type, entry, volume, price, profit, commission, swap, fee, time, comment)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (login, d['ticket'], d['order'], d.get('position_id', 0), d['symbol'], d['type'], d['entry'],
+                  d['volume'], d['price'], d['profit'], d['commission'], d['swap'], d['fee'], d['time'], d['comment']))
+    
+    def upsert_mt5_orders(self, login, orders):
+        """Store history orders fetched from a terminal (dicts with MT5 TradeOrder field names)"""
+        for o in orders:
+            self._write('''
+                INSERT OR REPLACE INTO mt5_orders
+                (login, ticket, symbol, type, state, volume_initial, volume_current, price_open, price_current, sl, tp, time_setup, time_done, comment)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (login, o['ticket'], o['symbol'], o['type'], o['state'], o['volume_initial'], o['volume_current'],
+                  o['price_open'], o['price_current'], o['sl'], o['tp'], o['time_setup'], o['time_done'], o['comment']))
+    
+    def get_mt5_deals(self, login, time_from, time_to):
+        """Cached deals of an account with time in [time_from, time_to) (epoch seconds), oldest first"""
+        cursor = self._read('''
+            SELECT ticket, order_ticket AS "order", position_id, symbol, type, entry, volume, price,
+                   profit, commission, swap, fee, time, comment
+            FROM mt5_deals WHERE login = ? AND time >= ? AND time < ? ORDER BY time, ticket
+        ''', (login, time_from, time_to))
+        columns = [desc[0] for desc in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+    
+    def get_mt5_orders(self, login, time_from, time_to):
+        """Cached history orders of an account set up in [time_from, time_to) (epoch seconds), oldest first"""
+        cursor = self._read('''
+            SELECT ticket, symbol, type, state, volume_initial, volume_current, price_open, price_current,
+                   sl, tp, time_setup, time_done, comment
+            FROM mt5_orders WHERE login = ? AND time_setup >= ? AND time_setup < ? ORDER BY time_setup, ticket
+        ''', (login, time_from, time_to))
+        columns = [desc[0] for desc in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+    
+    def get_history_sync(self, login, kind):
+        """Sync state of an account's 'deals' or 'orders' cache, or None if never synced"""
+        row = self._read('''
+            SELECT covered_from, synced_to, full_sync_at FROM mt5_history_sync WHERE login = ? AND kind = ?
+        ''', (login, kind)).fetchone()
+        if row is None:
+            return None
+        return {'covered_from': row[0], 'synced_to': row[1], 'full_sync_at': row[2]}
+    
+    def set_history_sync(self, login, kind, covered_from, synced_to, full_sync_at):
+        """Record how far an account's history cache is synced (epoch seconds)"""
+        self._write('''
+            INSERT OR REPLACE INTO mt5_history_sync (login, kind, covered_from, synced_to, full_sync_at)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (login, kind, covered_from, synced_to, full_sync_at))
     
     # === SYMBOL MAPPINGS ===
     
     def add_symbol_mapping(self, pair_id, account_id, master_symbol, child_symbol):
         """Add or update symbol mapping for inter-broker trading"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
+        self._write('''
             INSERT OR REPLACE INTO symbol_mappings (pair_id, account_id, master_symbol, child_symbol)
             VALUES (?, ?, ?, ?)
         ''', (pair_id, account_id, master_symbol, child_symbol))
-        conn.commit()
-        conn.close()
     
     def get_symbol_mapping(self, pair_id, account_id, master_symbol):
         """Get mapped symbol for a child account"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
+        cursor = self._read('''
             SELECT child_symbol FROM symbol_mappings 
             WHERE pair_id = ? AND account_id = ? AND master_symbol = ?
         ''', (pair_id, account_id, master_symbol))
         result = cursor.fetchone()
-        conn.close()
         return result[0] if result else master_symbol  # Return original if no mapping
     
     def get_all_mappings(self, pair_id, account_id):
         """Get all symbol mappings for an account"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
+        cursor = self._read('''
             SELECT master_symbol, child_symbol FROM symbol_mappings 
             WHERE pair_id = ? AND account_id = ?
         ''', (pair_id, account_id))
-        results = {row[0]: row[1] for row in cursor.fetchall()}
-        conn.close()
-        return results
+        return {row[0]: row[1] for row in cursor.fetchall()}
     
     def delete_symbol_mapping(self, pair_id, account_id, master_symbol):
         """Delete a symbol mapping"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
+        self._write('''
             DELETE FROM symbol_mappings 
             WHERE pair_id = ? AND account_id = ? AND master_symbol = ?
         ''', (pair_id, account_id, master_symbol))
-        conn.commit()
-        conn.close()
     
     # === LOGGING ===
     
     def add_log(self, pair_id, component, level, message, account_id=None):
         """Add system log entry"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
+        self._write('''
             INSERT INTO system_logs (pair_id, account_id, component, level, message)
             VALUES (?, ?, ?, ?, ?)
         ''', (pair_id, account_id, component, level, message))
-        conn.commit()
-        conn.close()
     
     def get_logs(self, pair_id=None, level=None, limit=200):
         """Get system logs for dashboard"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         query = 'SELECT * FROM system_logs WHERE 1=1'
         params = []
         
@@ -319,22 +684,16 @@ class MT5DataStorage:
         query += ' ORDER BY timestamp DESC LIMIT ?'
         params.append(limit)
         
-        cursor.execute(query, params)
+        cursor = self._read(query, params)
         columns = [desc[0] for desc in cursor.description]
-        results = [dict(zip(columns, row)) for row in cursor.fetchall()]
-        conn.close()
-        return results
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
     
     def clear_old_logs(self, days=7):
         """Clear logs older than specified days"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
+        self._write('''
             DELETE FROM system_logs 
             WHERE timestamp < datetime('now', ? || ' days')
         ''', (f'-{days}',))
-        conn.commit()
-        conn.close()
 
 # Global database instance
 db = MT5DataStorage()
@@ -0,0 +1,49 @@
+"""
+Stream Export - chunked JSON and CSV bodies for large dashboard responses
+Rows are encoded as they are produced and sent in CHUNK_SIZE pieces, so a
+response holds about one chunk in memory however many rows it carries.
+
+Both generators take any iterable of dicts (database cursors, log readers).
+"""
+
+import io
+import csv
+import json
+
+CHUNK_SIZE = 64 * 1024  # Characters buffered before a chunk is yielded
+
+
+def iter_json(rows, key, extra=None):
+    """
+    Yield {"<key>": [rows...], "total": N, **extra} as text chunks.
+    total defaults to the number of rows streamed; it is written after the array.
+    """
+    parts = ['{' + json.dumps(key) + ':[']
+    size = 0
+    count = 0
+    for row in rows:
+        encoded = json.dumps(row, separators=(',', ':'))
+        parts.append(',' + encoded if count else encoded)
+        size += len(encoded) + 1
+        count += 1
+        if size >= CHUNK_SIZE:
+            yield ''.join(parts)
+            parts = []
+            size = 0
+    trailer = dict({'total': count}, **(extra or {}))
+    parts.append('],' + json.dumps(trailer, separators=(',', ':'))[1:])
+    yield ''.join(parts)
+
+
+def iter_csv(rows, columns):
+    """Yield a CSV document (header row, then one row per dict) as text chunks"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for row in rows:
+        writer.writerow([row.get(column, '') for column in columns])
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
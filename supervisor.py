@@ -0,0 +1,218 @@
+"""
+Worker Supervisor - restarts crashed or stalled master/child workers
+Runs as a thread in the launcher and checks every running pair's worker
+status segment (see worker_status) once per CHECK_INTERVAL. A worker is
+restarted when its process exited, when it reported FAILED/STOPPED (workers
+keep their console open after an error, so the process itself stays alive),
+when it is stuck in STARTING, or when a READY worker's heartbeat is older
+than STALL_TIMEOUT.
+
+Restarts back off exponentially (BACKOFF_BASE, doubling up to BACKOFF_MAX).
+After CRASH_LOOP_RESTARTS restarts within CRASH_LOOP_WINDOW the supervisor
+gives up on that worker until it is started again by hand.
+
+A pair-child in a shared executor (see executor_group) that failed on its
+own is restarted by re-adding it to the executor's membership; the process
+is only terminated when it exited or stalled, which affects all its members.
+
+Per worker it keeps the recent restart events and the mean time to recovery
+(failure detected -> restarted worker READY), shown on the dashboard.
+"""
+
+import time
+import threading
+from collections import deque
+
+from worker_status import read_worker_status, MASTER_ID, STARTING, READY, FAILED, STOPPED
+
+CHECK_INTERVAL = 1.0  # Seconds between checks
+STALL_TIMEOUT = 15  # Seconds without heartbeat before a READY worker counts as hung
+START_TIMEOUT = 90  # Seconds a worker may take to get ready
+BACKOFF_BASE = 2  # Seconds before the first restart
+BACKOFF_MAX = 60
+CRASH_LOOP_RESTARTS = 5  # Restarts within CRASH_LOOP_WINDOW before giving up
+CRASH_LOOP_WINDOW = 600  # Seconds
+EVENT_HISTORY = 20  # Restart events kept per worker
+
+
+class WorkerHealth:
+    """Restart bookkeeping for one worker"""
+
+    def __init__(self):
+        self.recent = deque()  # Restart times within CRASH_LOOP_WINDOW
+        self.restarts = 0
+        self.events = deque(maxlen=EVENT_HISTORY)
+        self.down_since = None  # Failure detected, not recovered yet
+        self.retry_at = None  # Scheduled restart
+        self.recoveries = 0
+        self.recovery_total = 0.0
+        self.gave_up = False
+
+    def event(self, message):
+        self.events.append({'time': int(time.time() * 1000), 'message': message})
+
+    def to_dict(self):
+        return {
+            'restarts': self.restarts,
+            'mttr': round(self.recovery_total / self.recoveries, 1) if self.recoveries else None,
+            'down': self.down_since is not None,
+            'gave_up': self.gave_up,
+            'events': list(self.events)
+        }
+
+
+class Supervisor:
+    def __init__(self, process_manager, data_dir):
+        self.pm = process_manager
+        self.data_dir = data_dir
+        self.health = {}  # (pair_id, worker_id) -> WorkerHealth
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name='supervisor', daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def _run(self):
+        while not self.stop_event.wait(CHECK_INTERVAL):
+            try:
+                self.check()
+            except Exception as e:
+                print(f"[WARN] Supervisor check failed: {e}")
+
+    def reset(self, pair_id, worker_id):
+        """Worker was started by hand: clear backoff and crash-loop state (history is kept)"""
+        with self.lock:
+            health = self.health.get((pair_id, worker_id))
+            if health:
+                health.recent.clear()
+                health.retry_at = None
+                health.down_since = None
+                health.gave_up = False
+
+    def get_status(self, pair_id):
+        """{worker_id: health dict} for a pair"""
+        with self.lock:
+            return {wid: h.to_dict() for (pid, wid), h in self.health.items() if pid == pair_id}
+
+    def check(self):
+        pairs = {p.get('id'): p for p in self.pm.load_config().get('pairs', [])}
+        for pair_id, procs in list(self.pm.processes.items()):
+            pair = pairs.get(pair_id)
+            if not pair or not pair.get('enabled', True):
+                continue
+            status = read_worker_status(self.data_dir, pair_id)
+            if procs.get('master'):
+                self._check_worker(pair, MASTER_ID, procs['master'], status.get(MASTER_ID))
+            children = {c.get('id'): c for c in pair.get('children', [])}
+            for child_id, proc in list(procs.get('children', {}).items()):
+                child = children.get(child_id)
+                if proc and child and child.get('enabled', True):
+                    self._check_worker(pair, child_id, proc, status.get(child_id), child)
+
+    def _check_worker(self, pair, worker_id, proc, slot, child=None):
+        pair_id = pair.get('id')
+        launched = self.pm.launched.get((pair_id, worker_id), 0)
+        if slot and slot['started_ms'] < launched:
+            slot = None  # Left over from the previous process
+        now = time.time()
+
+        with self.lock:
+            health = self.health.setdefault((pair_id, worker_id), WorkerHealth())
+            if health.retry_at is not None:
+                if now >= health.retry_at:
+                    health.retry_at = None
+                    restart = True
+                else:
+                    return
+            else:
+                restart = False
+                reason = self._failure(proc, slot, launched, now)
+                if reason is None:
+                    if health.down_since is not None and slot and slot['state'] == READY:
+                        took = now - health.down_since
+                        health.down_since = None
+                        health.recoveries += 1
+                        health.recovery_total += took
+                        health.event(f"Recovered in {took:.1f}s")
+                    return
+                if health.gave_up:
+                    return
+                self._schedule(health, worker_id, pair_id, reason, now)
+
+        if restart:
+            self._restart(pair, worker_id, child)
+        else:
+            self._terminate(pair_id, worker_id, proc, slot)
+
+    def _failure(self, proc, slot, launched, now):
+        """Why a worker needs a restart, or None if it is healthy (or still starting)"""
+        if proc.poll() is not None:
+            return f"Exited with code {proc.returncode}"
+        if slot is None:
+            if launched and now - launched / 1000 > START_TIMEOUT:
+                return f"No status after {START_TIMEOUT}s"
+            return None
+        if slot['state'] == FAILED:
+            return f"Failed: {slot['message']}"
+        if slot['state'] == STOPPED:
+            return f"Stopped: {slot['message']}"
+        if slot['state'] == STARTING and now - slot['started_ms'] / 1000 > START_TIMEOUT:
+            return f"Not ready after {START_TIMEOUT}s"
+        if slot['state'] == READY:
+            silent = now - slot['heartbeat_ms'] / 1000
+            if silent > STALL_TIMEOUT:
+                return f"No heartbeat for {silent:.0f}s"
+        return None
+
+    def _schedule(self, health, worker_id, pair_id, reason, now):
+        """Record a failure and schedule the restart (or give up on a crash loop); caller holds the lock"""
+        if health.down_since is None:
+            health.down_since = now
+        while health.recent and now - health.recent[0] > CRASH_LOOP_WINDOW:
+            health.recent.popleft()
+        if len(health.recent) >= CRASH_LOOP_RESTARTS:
+            health.gave_up = True
+            health.event(f"{reason} - crash loop ({len(health.recent)} restarts in {CRASH_LOOP_WINDOW}s), not restarting")
+            print(f"[WARN] Supervisor: {pair_id}/{worker_id} is crash-looping, giving up: {reason}")
+            return
+        delay = min(BACKOFF_BASE * 2 ** len(health.recent), BACKOFF_MAX)
+        health.recent.append(now)
+        health.restarts += 1
+        health.retry_at = now + delay
+        health.event(f"{reason} - restarting in {delay}s")
+        print(f"[*] Supervisor: {pair_id}/{worker_id} {reason} - restarting in {delay}s")
+
+    def _terminate(self, pair_id, worker_id, proc, slot):
+        if worker_id != MASTER_ID and self.pm.executor_of(pair_id, worker_id) and slot and slot['state'] != READY:
+            return  # This member failed, the shared executor keeps running for the others
+        if proc.poll() is None:
+            proc.terminate()
+            try:
+                proc.wait(timeout=3)
+            except Exception:
+                proc.kill()
+
+    def _restart(self, pair, worker_id, child):
+        pair_id = pair.get('id')
+        with self.pm.lock:
+            procs = self.pm.processes.get(pair_id)
+            if not procs:
+                return  # Pair was stopped meanwhile
+            if worker_id == MASTER_ID:
+                if not procs.get('master'):
+                    return
+                success, msg = self.pm.start_master(pair_id, pair, manual=False)
+            else:
+                if worker_id not in procs.get('children', {}):
+                    return
+                success, msg = self.pm.start_child(pair_id, worker_id, child, manual=False)
+        if not success:
+            with self.lock:
+                self.health[(pair_id, worker_id)].event(msg)
+            print(f"[WARN] Supervisor: restart of {pair_id}/{worker_id} failed: {msg}")
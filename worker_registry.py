@@ -0,0 +1,171 @@
+"""
+Worker Registry - lets a restarted launcher re-adopt running workers
+ProcessManager keeps its Popen handles in memory only, so restarting the
+dashboard used to orphan every master watcher and child executor (or force
+a full stop/start that logs every terminal in again). The manager now
+mirrors its state to data/workers.json on every start/stop:
+
+    {"activated": {pair_id: bool},
+     "workers": [{"pair_id", "worker_id", "pid", "create_time", "launched_ms", "segments"}],
+     "terminals": {pair_id: [{"pid", "create_time", "path"}]}}
+
+The MT5 terminals activate_pair launches are recorded the same way, so
+deactivate_pair can stop exactly those processes without scanning.
+
+On startup each entry is verified - the pid must still exist with the same
+creation time, so a recycled pid is never adopted - and wrapped in an
+AdoptedProcess, which answers the Popen calls the manager uses (poll, wait,
+terminate, kill). Needs psutil; without it nothing is adopted.
+"""
+
+import os
+import json
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+REGISTRY_FILE = 'workers.json'
+CREATE_TIME_TOLERANCE = 1.0  # Seconds
+
+
+def get_registry_path(data_dir):
+    return os.path.join(data_dir, REGISTRY_FILE)
+
+
+def adoption_available():
+    return psutil is not None
+
+
+def process_create_time(pid):
+    """Creation time of a process (None if unknown), recorded so a reused pid is not mistaken for the worker"""
+    if psutil is None:
+        return None
+    try:
+        return psutil.Process(pid).create_time()
+    except Exception:
+        return None
+
+
+def worker_segments(data_dir, pair_id, worker_id, master_id):
+    """Segment files a worker writes (kept in the registry for diagnostics and cleanup)"""
+    segments = [os.path.join(data_dir, f'workers_{pair_id}.bin')]
+    if worker_id == master_id:
+        segments.append(os.path.join(data_dir, f'shared_positions_{pair_id}.bin'))
+    else:
+        segments.append(os.path.join(data_dir, f'children_{pair_id}.bin'))
+    return segments
+
+
+def save_registry(data_dir, workers, activated, terminals):
+    """Write the registry atomically (workers is a list of entry dicts)"""
+    path = get_registry_path(data_dir)
+    tmp = path + '.tmp'
+    try:
+        with open(tmp, 'w') as f:
+            json.dump({'activated': activated, 'workers': workers, 'terminals': terminals}, f, indent=2)
+        os.replace(tmp, path)
+    except Exception as e:
+        print(f"[WARN] Could not save worker registry: {e}")
+
+
+def load_registry(data_dir):
+    """Registry contents, or an empty registry if there is none"""
+    try:
+        with open(get_registry_path(data_dir)) as f:
+            registry = json.load(f)
+        return {'activated': registry.get('activated', {}), 'workers': registry.get('workers', []),
+                'terminals': registry.get('terminals', {})}
+    except (OSError, ValueError):
+        return {'activated': {}, 'workers': [], 'terminals': {}}
+
+
+class AdoptedProcess:
+    """Popen-like handle for a worker started by an earlier launcher"""
+
+    def __init__(self, process):
+        self.process = process
+        self.pid = process.pid
+        self.returncode = None
+
+    def poll(self):
+        if self.returncode is None:
+            try:
+                if not self.process.is_running() or self.process.status() == psutil.STATUS_ZOMBIE:
+                    self.returncode = -1  # Not our child - the real exit code is not available
+            except psutil.NoSuchProcess:
+                self.returncode = -1
+        return self.returncode
+
+    def wait(self, timeout=None):
+        try:
+            self.process.wait(timeout)
+        except psutil.NoSuchProcess:
+            pass
+        self.returncode = -1
+        return self.returncode
+
+    def _signal(self, kill):
+        # Include children: a onefile build runs the worker under a bootloader process
+        try:
+            targets = self.process.children(recursive=True) + [self.process]
+        except psutil.NoSuchProcess:
+            return
+        for proc in targets:
+            try:
+                proc.kill() if kill else proc.terminate()
+            except psutil.NoSuchProcess:
+                pass
+
+    def terminate(self):
+        self._signal(kill=False)
+
+    def kill(self):
+        self._signal(kill=True)
+
+
+def live_process(entry):
+    """psutil.Process for a {'pid', 'create_time'} entry if that exact process is still alive, else None"""
+    if psutil is None:
+        return None
+    try:
+        process = psutil.Process(entry['pid'])
+        create_time = entry.get('create_time')
+        if create_time is None or abs(process.create_time() - create_time) > CREATE_TIME_TOLERANCE:
+            return None
+        if process.status() == psutil.STATUS_ZOMBIE:
+            return None
+        return process
+    except (psutil.Error, KeyError, TypeError):
+        return None
+
+
+def adopt(entry):
+    """AdoptedProcess for a registry entry whose process is still alive, else None"""
+    process = live_process(entry)
+    return AdoptedProcess(process) if process else None
+
+
+def terminate_processes(processes, timeout):
+    """
+    Terminate processes together and wait at most timeout seconds in total;
+    survivors are killed. Returns the number that were stopped.
+    """
+    processes = list(processes)
+    if not processes:
+        return 0
+    for proc in processes:
+        try:
+            proc.terminate()
+        except psutil.NoSuchProcess:
+            pass
+    gone, alive = psutil.wait_procs(processes, timeout=timeout)
+    for proc in alive:
+        try:
+            proc.kill()
+        except psutil.NoSuchProcess:
+            pass
+    if alive:
+        psutil.wait_procs(alive, timeout=1)
+    return len(processes)
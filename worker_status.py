@@ -0,0 +1,202 @@
+"""
+Worker Status Segment - readiness of a pair's worker processes
+Lets the launcher wait until the master watcher and child executors are
+actually usable (MT5 logged in, shared segment mapped) instead of sleeping
+a fixed time, and report which one failed and why.
+
+data/workers_{pair_id}.bin:
+    Header (16 bytes): magic(4) + version(4) + slot_count(4) + slot_size(4)
+    Slots (160 bytes each): seq(8) + worker_id(32) + pid(4) + state(4) + started_ms(8)
+                            + heartbeat_ms(8) + loop_hz(4) + message(92)
+
+Slot 0 belongs to the master watcher. A child takes slot i + 1 for its index
+i in the pair config unless another child holds it (see
+shm_segment.claim_slot); slots of workers that stopped, failed or stopped
+heart-beating STALE_SLOT_AFTER ago are reused. Each worker is the only
+writer of its slot; the launcher only reads.
+
+Workers call heartbeat() every main-loop pass; it refreshes heartbeat_ms at
+most once per HEARTBEAT_INTERVAL, which lets the launcher's supervisor tell
+a hung worker from a busy one. It also counts the passes and publishes the
+main-loop rate with each heartbeat (loop_hz, shown with the worker's CPU%
+by the resource governor).
+
+LoopBudget caps a main loop at the rate the launcher passes with
+--max-loop-hz (MASTER_LOOP_HZ / CHILD_LOOP_HZ when run without it).
+"""
+
+import os
+import time
+import struct
+
+from shm_segment import open_segment, open_segment_readonly, seqlock_write, seqlock_read, claim_slot, SEQ_SIZE
+
+MAGIC = b'JDWK'
+VERSION = 2  # 2: loop_hz taken from the message field
+MAX_SLOTS = 33  # Master + 32 children
+MASTER_ID = 'master'
+HEARTBEAT_INTERVAL = 1.0  # Seconds between published heartbeats
+MASTER_LOOP_HZ = 10  # Default main-loop cap of a master watcher
+CHILD_LOOP_HZ = 100  # Default main-loop cap of a child executor
+STALE_SLOT_AFTER = 300  # Seconds without heartbeat before another child may take a slot
+
+STARTING = 1
+READY = 2
+FAILED = 3
+STOPPED = 4
+STATE_NAMES = {0: 'unknown', STARTING: 'starting', READY: 'ready', FAILED: 'failed', STOPPED: 'stopped'}
+
+HEADER = struct.Struct('<4sIII')
+PAYLOAD = struct.Struct('<32sIIQQf92s')
+SLOT_SIZE = SEQ_SIZE + PAYLOAD.size
+SEGMENT_SIZE = HEADER.size + MAX_SLOTS * SLOT_SIZE
+
+
+def get_segment_path(data_dir, pair_id):
+    return os.path.join(data_dir, f'workers_{pair_id}.bin')
+
+
+def _slot_offset(slot):
+    return HEADER.size + slot * SLOT_SIZE
+
+
+def _init_segment(mm):
+    HEADER.pack_into(mm, 0, MAGIC, VERSION, MAX_SLOTS, SLOT_SIZE)
+
+
+class WorkerStatusWriter:
+    """Worker side: publishes its own state in its slot"""
+
+    def __init__(self, data_dir, pair_id, worker_id, slot_hint):
+        self.mm = open_segment(get_segment_path(data_dir, pair_id), SEGMENT_SIZE, _init_segment)
+        if HEADER.unpack_from(self.mm, 0) != (MAGIC, VERSION, MAX_SLOTS, SLOT_SIZE):
+            _init_segment(self.mm)  # Segment left by an older version (same size, every writer agrees)
+        self.worker_id = worker_id
+        self.slot = 0 if worker_id == MASTER_ID else self._claim_slot(slot_hint)
+        self.started_ms = int(time.time() * 1000)
+        self.state = STARTING
+        self.message = ''
+        self.last_error = ''
+        self.last_publish = 0.0
+        self.loops = 0  # Main-loop passes since the last publish
+        self.loop_hz = 0.0
+        self._publish()
+
+    def _read_slot(self, slot):
+        payload = seqlock_read(self.mm, _slot_offset(slot), PAYLOAD.size)
+        return PAYLOAD.unpack(payload) if payload else None
+
+    def _claim_slot(self, slot_hint):
+        def owner_of(slot):
+            current = self._read_slot(slot)
+            return current[0].rstrip(b'\x00').decode('utf-8', errors='ignore') if current else None
+
+        def reclaimable(slot):
+            current = self._read_slot(slot)
+            return current is not None and (current[2] in (FAILED, STOPPED) or
+                                            time.time() * 1000 - max(current[3], current[4]) > STALE_SLOT_AFTER * 1000)
+
+        return claim_slot(owner_of, range(1, MAX_SLOTS), self.worker_id, slot_hint, reclaimable)
+
+    def _publish(self):
+        now = time.time()
+        if self.loops and self.last_publish:
+            self.loop_hz = self.loops / (now - self.last_publish)
+        self.loops = 0
+        self.last_publish = now
+        seqlock_write(self.mm, _slot_offset(self.slot),
+                      PAYLOAD.pack(self.worker_id.encode('utf-8')[:32], os.getpid(), self.state,
+                                   self.started_ms, int(now * 1000), self.loop_hz,
+                                   self.message.encode('utf-8')[:92]))
+
+    def ready(self, message=''):
+        """MT5 is logged in and the worker's segments are mapped"""
+        self.state, self.message = READY, message
+        self._publish()
+
+    def heartbeat(self):
+        """Main loop is alive; call once per pass (the passes give loop_hz) - cheap enough for every pass"""
+        self.loops += 1
+        if time.time() - self.last_publish >= HEARTBEAT_INTERVAL:
+            self._publish()
+
+    def note_error(self, message):
+        """Remember the latest error; reported as the failure reason if the worker never gets ready"""
+        self.last_error = message
+
+    def close(self):
+        """Worker is exiting: FAILED if it never got ready, else STOPPED (either with the last error)"""
+        if self.state == STARTING:
+            self.state, self.message = FAILED, self.last_error or 'Exited before ready'
+        else:
+            self.state, self.message = STOPPED, self.last_error or 'Exited'
+        try:
+            self._publish()
+            self.mm.close()
+        except Exception:
+            pass
+
+
+class LoopBudget:
+    """Caps a main loop at max_hz: pace() at the end of a pass sleeps whatever is left of the period"""
+
+    def __init__(self, max_hz):
+        self.period = 1.0 / max_hz
+        self.last = time.perf_counter()
+
+    def pace(self):
+        delay = self.period - (time.perf_counter() - self.last)
+        if delay > 0:
+            time.sleep(delay)
+        self.last = time.perf_counter()
+
+
+def loop_budget(max_hz, default_hz):
+    """LoopBudget for the --max-loop-hz argument (default_hz if missing or invalid)"""
+    try:
+        hz = float(max_hz) if max_hz else default_hz
+    except ValueError:
+        hz = default_hz
+    return LoopBudget(hz if hz > 0 else default_hz)
+
+
+def open_worker_status(data_dir, pair_id, worker_id, slot_hint):
+    """WorkerStatusWriter, or None (with a warning) if the segment cannot be opened or is full"""
+    try:
+        return WorkerStatusWriter(data_dir, pair_id, worker_id, slot_hint)
+    except Exception as e:
+        print(f"[WARN] Worker status segment unavailable: {e}")
+        return None
+
+
+def read_worker_status(data_dir, pair_id):
+    """
+    All published worker states of a pair.
+    Returns {worker_id: {'pid', 'state', 'started_ms', 'heartbeat_ms', 'loop_hz', 'message'}} ({} if no segment).
+    """
+    mm = open_segment_readonly(get_segment_path(data_dir, pair_id), SEGMENT_SIZE)
+    if mm is None:
+        return {}
+    try:
+        magic, version, slots, slot_size = HEADER.unpack_from(mm, 0)
+        if magic != MAGIC or version != VERSION or slot_size != SLOT_SIZE:
+            return {}
+        workers = {}
+        for slot in range(min(slots, MAX_SLOTS)):
+            payload = seqlock_read(mm, _slot_offset(slot), PAYLOAD.size)
+            if not payload:
+                continue
+            worker_id, pid, state, started_ms, heartbeat_ms, loop_hz, message = PAYLOAD.unpack(payload)
+            worker_id = worker_id.rstrip(b'\x00').decode('utf-8', errors='ignore')
+            if worker_id and started_ms >= workers.get(worker_id, {}).get('started_ms', 0):
+                workers[worker_id] = {  # A slot left by a reordered config loses to the newer one
+                    'pid': pid,
+                    'state': state,
+                    'started_ms': started_ms,
+                    'heartbeat_ms': heartbeat_ms,
+                    'loop_hz': round(loop_hz, 1),
+                    'message': message.rstrip(b'\x00').decode('utf-8', errors='ignore')
+                }
+        return workers
+    finally:
+        mm.close()